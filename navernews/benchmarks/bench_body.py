@@ -0,0 +1,90 @@
+"""
+기사 본문 상용구 제거 속도 비교 벤치마크
+이전 방식(줄을 돌면서 list.index + del로 지우고 split/join)과 tools.BodyNormalizer를
+fixtures 폴더의 기사 본문(수십 줄)과 줄 수가 많은 본문으로 비교한다.
+
+    cd navernews
+    python benchmarks/bench_body.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navernews.extractor import ArticleExtractor  # noqa: E402
+from navernews.tools import BodyNormalizer  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SENTENCES = ["\n정부는 24일 신종 코로나바이러스 감염증 확산 방지를 위해 사회적 거리두기를 강화한다고 밝혔다.",
+             "\n\t이번 조치는 다음달 5일까지 적용되며 종교시설과 실내 체육시설 등의 운영 중단을 권고한다.  ",
+             "\n관계자는 \"국민 여러분의 적극적인 협조를 부탁드린다\"고 말했다.",
+             "\n전문가들은 당분간 해외 유입 사례에 대한 관리가 중요하다고 강조했다."]
+BOILERPLATE = ["\nⓒ 연합뉴스, 무단전재 및 재배포 금지", "\n<저작권자 ⓒ 뉴스1코리아, 무단 전재 및 재배포 금지>"]
+
+
+def legacy(content_tmp):
+    content_tmp = list(content_tmp)
+    for line in content_tmp:  # 저작권 라인 제거
+        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
+            inx = content_tmp.index(line)
+            del content_tmp[inx]
+    return " ".join((" ".join(content_tmp)).split())
+
+
+def make_body(size, ratio):
+    random.seed(size)
+    return [random.choice(BOILERPLATE) if random.random() < ratio else random.choice(SENTENCES) for _ in range(size)]
+
+
+def article_bodies():
+    # 추출기가 fixtures의 기사 페이지에서 BodyNormalizer에 넘기는 본문 줄 목록
+    bodies = []
+    extractor = ArticleExtractor(normalizer=lambda lines: bodies.append(list(lines)) or "")
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.startswith('article_'):
+            with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+                count = len(bodies)
+                extractor.extract_html('https://news.naver.com/main/read.nhn?oid=001&aid=0000000001', f.read())
+                lines = next((lines for lines in bodies[count:] if lines), [])
+                del bodies[count:]
+                bodies.append((name, lines))
+    return bodies
+
+
+def measure(func, lines, seconds=0.5, repeat=5):
+    # 다른 프로세스의 영향을 줄이려고 seconds를 repeat번으로 나눠서 재고 가장 빠른 값을 쓴다.
+    best = None
+    for _ in range(repeat):
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds / repeat:
+            func(lines)
+            count += 1
+        elapsed = (time.perf_counter() - started) / count * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='본문 상용구 제거 속도 비교')
+    parser.add_argument('--ratio', type=float, default=0.05, help='상용구 줄의 비율')
+    args = parser.parse_args()
+
+    normalizer = BodyNormalizer()
+    for name, lines in article_bodies():
+        assert legacy(lines) == normalizer(lines)
+        old_ms, new_ms = measure(legacy, lines), measure(normalizer, lines)
+        print(f"{name:22} {len(lines):3}줄  이전 {old_ms:7.3f}ms    BodyNormalizer {new_ms:7.3f}ms    "
+              f"{old_ms / new_ms:.1f}배")
+    for size in (50, 1000, 10000, 50000):
+        lines = make_body(size, args.ratio)
+        old, new = legacy(lines), normalizer(lines)
+        # 이전 방식은 지운 줄 바로 다음 줄을 검사하지 못해서 상용구가 남을 수 있다.
+        left = old.count('ⓒ')
+        old_ms, new_ms = measure(legacy, lines), measure(normalizer, lines)
+        print(f"{size:6}줄  이전 {old_ms:9.3f}ms (남은 상용구 {left})    BodyNormalizer {new_ms:8.3f}ms "
+              f"(남은 상용구 {new.count('ⓒ')})    {old_ms / new_ms:.1f}배")
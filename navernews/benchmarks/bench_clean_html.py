@@ -0,0 +1,81 @@
+"""
+본문 HTML 정리 속도 비교 벤치마크
+tools.clean_html (w3lib 정규식을 문자열에 여러번 적용)과 tools.clean_element (파싱된 트리에서 한번에 텍스트 추출)를 비교한다.
+먼저 fixtures의 기사 본문과 아래 CASES로 두 함수의 결과가 완전히 같은지 확인한다.
+
+    cd navernews
+    python benchmarks/bench_clean_html.py [-n 3000]
+"""
+import argparse
+import os
+import sys
+import time
+
+from lxml import etree
+from parsel import Selector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navernews.tools import clean_html, clean_element  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BODIES = [('article_general.html', 'articleBodyContents'), ('article_entertain.html', 'articeBody'),
+          ('article_sports.html', 'newsEndContents')]
+
+# 엔티티, 태그처럼 보이는 글자, 주석, 대소문자 등 clean_html의 동작이 까다로운 경우
+CASES = [
+    'a&nbsp;b &amp;lt;x&amp;gt; c',
+    '<img alt="a > b">x',
+    '<img alt="&lt;사진&gt;">y',
+    '<h4>t<a href="#">l</a></h4>tail',
+    '<!-- c <a>x</a> -->z',
+    '&#150; &#x41; &copy &amp;amp;',
+    '<script>var a="</a>";</script>after',
+    '<span>&lt;a href=x&gt;link&lt;/a&gt; rest</span>',
+    '<A HREF=x>U</A>v',
+    '<p>one</p><p>two</p>',
+    '<br/>x<br>y',
+    '&lt;!-- hidden --&gt;shown',
+    '<style>.a{}</style>s',
+    'AT&amp;T &lt;b&gt;bold&lt;/b&gt;',
+    '<em>ⓒ</em> &quot;q&quot; &#39;s&#39;',
+    '<!-- 본문 내용 --><script type="text/javascript">function _flash_removeCallback() {}</script>본문<br><br>끝',
+]
+
+
+def corpus():
+    elements = []
+    for name, body_id in BODIES:
+        with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+            elements.append((name, Selector(text=f.read()).root.xpath(f'id("{body_id}")')[0]))
+    for i, case in enumerate(CASES):
+        root = Selector(text=f'<html><body><div id="case">{case}</div></body></html>').root
+        elements.append((f'case {i}', root.xpath('id("case")')[0]))
+    return elements
+
+
+def w3lib_version(element):
+    return clean_html(etree.tostring(element, method='html', encoding='unicode', with_tail=False))
+
+
+def measure(func, elements, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        for element in elements:
+            func(element)
+    return (time.perf_counter() - started) / (n * len(elements)) * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='본문 HTML 정리 속도 비교')
+    parser.add_argument('-n', type=int, default=3000, help='반복 횟수')
+    args = parser.parse_args()
+
+    elements = corpus()
+    for name, element in elements:
+        assert clean_element(element) == w3lib_version(element), name
+    print(f"{len(elements)}개 본문의 결과가 같습니다.")
+
+    for name, element in elements[:len(BODIES)]:
+        old, new = measure(w3lib_version, [element], args.n), measure(clean_element, [element], args.n)
+        print(f"{name:24} clean_html {old:8.1f}us    clean_element {new:8.1f}us    {old / new:.1f}배")
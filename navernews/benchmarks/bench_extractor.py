@@ -0,0 +1,174 @@
+"""
+기사 페이지 추출 속도 비교 벤치마크
+이전 parse_article 방식(필드마다 문서 처음부터 response.xpath)과 navernews/extractor.py의 ArticleExtractor를
+fixtures 폴더의 저장된 기사 페이지(일반 / TV연예 / 스포츠)로 비교한다.
+
+    cd navernews
+    python benchmarks/bench_extractor.py [-n 2000]
+
+parse    : 매번 새 응답 객체를 만들어 HTML 파싱부터 추출까지 (실제 크롤링과 같은 조건)
+extract  : 이미 파싱된 응답에서 추출만
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from urllib.parse import urlparse, parse_qs
+
+from scrapy.http import HtmlResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navernews.extractor import ArticleExtractor  # noqa: E402
+from navernews.tools import clean_html, KST  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGES = [
+    ('article_general.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid=0011494587'),
+    ('article_entertain.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=112&aid=0003283512'),
+    ('article_sports.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=109&aid=0004188437'),
+]
+
+
+def legacy_date(date, prefix=None):
+    try:
+        if prefix is not None:
+            date = date.replace(prefix, "")
+        date = date.replace("오전", "AM")
+        date = date.replace("오후", "PM")
+        return datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
+    except AttributeError:
+        return date
+
+
+def legacy_content(response, paths):
+    join_content = ""
+    for path in paths:
+        content_tmp = response.xpath(path).extract()
+        for line in content_tmp:  # 저작권 라인 제거
+            if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
+                inx = content_tmp.index(line)
+                del content_tmp[inx]
+        join_content = " ".join((" ".join(content_tmp)).split())
+        if join_content != "":
+            break
+    return join_content
+
+
+def legacy_url(ori_url, check_url):
+    if not check_url:
+        return ori_url
+    try:
+        if 'http://' in ori_url or 'https://' in ori_url:
+            return ori_url
+        return ""
+    except TypeError:
+        return ""
+
+
+def legacy_parse(response, body='text', check_url=False):
+    # 이전 News_manual.parse_article / News_manual_mongo.parse_article 추출 부분 (출력 제외)
+    article_type = response.xpath('/html/head/meta[@property="me:feed:serviceId"]/@content').extract_first()
+    items = dict()
+    url_query = parse_qs(urlparse(response.url).query)
+    items['news_id'] = url_query['aid'][0]
+    items['news_media_code'] = url_query['oid'][0]
+    items['news_title'] = response.xpath('/html/head/meta[@property="og:title"]/@content').extract_first()
+    items['news_naver_url'] = response.url
+
+    if article_type is None:
+        article_type = response.xpath('/html/head/meta[@name="twitter:site"]/@content').extract_first()
+        items['news_site'] = response.xpath('/html/head/meta[@name="twitter:creator"]/@content').extract_first()
+
+        if article_type == "네이버 TV연예":
+            items['news_category'] = "TV연예"
+            items['news_date'] = legacy_date(response.xpath(
+                '//*[@id="content"]/div[@class="end_ct"]/div/'
+                'div[@class="article_info"]/span[@class="author"]/em/text()').extract_first())
+            items['news_original_url'] = legacy_url(response.xpath(
+                '//*[@id="content"]/div[@class="end_ct"]/div/'
+                'div[@class="article_info"]/a/@href').extract_first(), check_url)
+            if body == 'html':
+                items['news_content'] = clean_html(response.xpath('//*[@id="articeBody"]').extract_first())
+            else:
+                items['news_content'] = legacy_content(response, ['//*[@id="articeBody"]/div/text()',
+                                                                  '//*[@id="articeBody"]/text()'])
+        else:
+            items['news_category'] = response.xpath(
+                '/html/head/meta[@property="me2:category2"]/@content').extract_first()
+            if items['news_category'] is None or items['news_category'] == "속보":
+                items['news_category'] = response.xpath(
+                    '//*[@id="articleBody"]/div[@class="guide_categorization"]/a/em/text()').extract_first()
+            items['news_date'] = legacy_date(response.xpath(
+                '//*[@id="main_content"]/div[@class="article_header"]/div[@class="article_info"]'
+                '/div/span[@class="t11"][1]/text()').extract_first())
+            items['news_original_url'] = legacy_url(response.xpath(
+                '//*[@id="main_content"]/div[@class="article_header"]'
+                '/div[@class="article_info"]/div/a[1]/@href').extract_first(), check_url)
+            if body == 'html':
+                items['news_content'] = clean_html(response.xpath('//*[@id="articleBodyContents"]').extract_first())
+            else:
+                items['news_content'] = legacy_content(response, ['//*[@id="articleBodyContents"]/div/text()',
+                                                                  '//*[@id="articleBodyContents"]/text()',
+                                                                  '//*[@id="articleBodyContents"]/div/span/text()'])
+    else:
+        site_tmp = response.xpath('/html/head/meta[@property="og:article:author"]/@content').extract_first()
+        items['news_site'] = site_tmp.replace("네이버 스포츠 | ", "")
+        items['news_category'] = "스포츠"
+        items['news_date'] = legacy_date(response.xpath(
+            '//*[@id="content"]/div/div[@class="content"]/'
+            'div/div[@class="news_headline"]/div[@class="info"]/span[1]/text()').extract_first(), prefix="기사입력 ")
+        items['news_original_url'] = legacy_url(response.xpath(
+            '//*[@id="content"]/div/div[@class="content"]/'
+            'div/div[@class="news_headline"]/div[@class="info"]/a/@href').extract_first(), check_url)
+        if body == 'html':
+            items['news_content'] = clean_html(response.xpath('//*[@id="newsEndContents"]').extract_first())
+        else:
+            items['news_content'] = legacy_content(response, ['//*[@id="newsEndContents"]/div/text()',
+                                                              '//*[@id="newsEndContents"]/text()'])
+    items['news_author'] = ""
+    return items
+
+
+def load_pages():
+    pages = []
+    for name, url in PAGES:
+        with open(os.path.join(FIXTURES, name), 'rb') as f:
+            pages.append((name, url, f.read()))
+    return pages
+
+
+def measure(func, pages, n, reparse):
+    responses = [HtmlResponse(url, body=body, encoding='utf-8') for _, url, body in pages]
+    for response in responses:
+        response.selector  # extract 측정에서는 파싱을 미리 해둔다.
+    started = time.perf_counter()
+    for _ in range(n):
+        for i, (_, url, body) in enumerate(pages):
+            response = HtmlResponse(url, body=body, encoding='utf-8') if reparse else responses[i]
+            func(response)
+    return n * len(pages) / (time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='기사 페이지 추출 속도 비교')
+    parser.add_argument('-n', type=int, default=2000, help='페이지마다 반복 횟수')
+    args = parser.parse_args()
+
+    pages = load_pages()
+    for body, check_url in (('text', False), ('html', True)):
+        extractor = ArticleExtractor(body=body, check_url=check_url)
+
+        # 두 방식의 결과가 같은지 먼저 확인한다. (이전 방식의 시간은 시간대가 없는 datetime)
+        for name, url, html in pages:
+            response = HtmlResponse(url, body=html, encoding='utf-8')
+            legacy = legacy_parse(response, body, check_url)
+            legacy['news_date'] = legacy['news_date'].replace(tzinfo=KST)
+            assert extractor.extract_response(response)[1] == legacy, name
+
+        print(f"[body={body}]")
+        for mode, reparse in (('parse', True), ('extract', False)):
+            old = measure(lambda r: legacy_parse(r, body, check_url), pages, args.n, reparse)
+            new = measure(extractor.extract_response, pages, args.n, reparse)
+            print(f"  {mode:8} 이전 {old:9.1f} 건/초    extractor {new:9.1f} 건/초    {new / old:.2f}배")
@@ -0,0 +1,82 @@
+"""
+기사 아이템 메모리 / 생성 비용 벤치마크
+이전 아이템(allcrawler.items.NewsItem, 필드 9개짜리 scrapy.Item)과 navernews/items.py의 NewsItem(__slots__ dataclass)을
+fixtures 기사 필드로 비교한다. 필드 값(문자열)은 모든 아이템이 같은 객체를 공유하므로 메모리는 아이템 자체의 크기이다.
+
+    cd navernews
+    python benchmarks/bench_items.py [-n 100000]
+
+메모리    : 아이템 n개를 리스트에 담아둘 때 늘어난 메모리(tracemalloc) / n
+생성      : NewsItem(**fields)
+읽기      : 파이프라인처럼 ItemAdapter(item)으로 NEWS_COLUMNS 값을 모두 읽기
+"""
+import argparse
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+import scrapy
+from itemadapter import ItemAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navernews.extractor import ArticleExtractor  # noqa: E402
+from navernews.items import NewsItem  # noqa: E402
+from navernews.pipelines import NEWS_COLUMNS  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class LegacyNewsItem(scrapy.Item):
+    # 이전 allcrawler.items.NewsItem
+    news_id = scrapy.Field()
+    news_media_code = scrapy.Field()
+    news_title = scrapy.Field()
+    news_content = scrapy.Field()
+    news_author = scrapy.Field()
+    news_date = scrapy.Field()
+    news_category = scrapy.Field()
+    news_original_url = scrapy.Field()
+    news_site = scrapy.Field()
+    news_naver_url = scrapy.Field()
+
+
+def memory_per_item(cls, fields, n):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [cls(**fields) for _ in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / n
+
+
+def read_all(item):
+    adapter = ItemAdapter(item)
+    return tuple(adapter.get(col) for col in NEWS_COLUMNS)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='기사 아이템 메모리 / 생성 비용 벤치마크')
+    parser.add_argument('-n', type=int, default=100000, help='아이템 수')
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, 'article_general.html'), encoding='utf-8') as f:
+        _, fields = ArticleExtractor().extract_html(
+            'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid=0011494587', f.read())
+
+    results = dict()
+    for name, cls in (('scrapy.Item', LegacyNewsItem), ('slots dataclass', NewsItem)):
+        item = cls(**fields)
+        results[name] = (memory_per_item(cls, fields, args.n),
+                         min(timeit.repeat(lambda: cls(**fields), number=args.n, repeat=3)) / args.n,
+                         min(timeit.repeat(lambda: read_all(item), number=args.n, repeat=3)) / args.n)
+
+    print(f'{"":16} {"메모리":>10} {"생성":>10} {"읽기":>10}')
+    for name, (memory, create, read) in results.items():
+        print(f'{name:16} {memory:8.0f} B {create * 1e6:8.2f}us {read * 1e6:8.2f}us')
+    (old_memory, old_create, old_read), (memory, create, read) = results.values()
+    print(f'{"비율":16} {memory / old_memory:9.2f}x {create / old_create:9.2f}x {read / old_read:9.2f}x')
@@ -0,0 +1,89 @@
+"""
+거의 같은 기사 인덱스(navernews/near_dup.py) 조회 속도 벤치마크
+무작위 서명 --docs개로 인덱스를 채운 뒤, 인덱스에 있는 기사와 비슷한 서명(--changed칸만 다름)과
+관계없는 서명을 --queries개씩 조회해서 조회 시간의 p50 / p99와 찾은 비율, 인덱스 파일 크기를 출력한다.
+본문에서 서명을 만드는 시간은 fixtures 기사 본문 길이(단어 500개)로 따로 잰다.
+
+    cd navernews
+    python benchmarks/bench_near_dup.py --docs 1000000 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from navernews.near_dup import NearDupIndex, SLOTS, signature  # noqa: E402
+
+
+def random_signature(rng):
+    return array('I', (rng.getrandbits(32) for _ in range(SLOTS)))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def timed_lookups(index, signatures):
+    times, found = [], 0
+    for sig in signatures:
+        started = time.perf_counter()
+        found += index.lookup(sig, 0.8) is not None
+        times.append(time.perf_counter() - started)
+    return times, found
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='거의 같은 기사 인덱스 조회 속도 벤치마크')
+    parser.add_argument('--docs', type=int, default=1000000, help='인덱스에 넣을 기사 수')
+    parser.add_argument('--queries', type=int, default=2000, help='조회 횟수 (비슷한 기사 / 관계없는 기사 각각)')
+    parser.add_argument('--changed', type=int, default=6, help='비슷한 기사 서명에서 바꿀 칸 수 (64칸 중)')
+    parser.add_argument('--path', help='인덱스 파일 경로 (기본 임시 파일, 이미 있으면 그대로 사용)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    path = args.path or os.path.join(tempfile.mkdtemp(), 'near_dup.sqlite3')
+    index = NearDupIndex(path)
+    existing = index.status()['docs']
+    started = time.perf_counter()
+    samples = []
+    for n in range(existing, args.docs):
+        sig = random_signature(rng)
+        index.add('000', str(n), None, sig, 3000)
+        if len(samples) < args.queries and rng.random() < args.queries * 2 / args.docs:
+            samples.append(sig)
+        if index.pending >= 10000:
+            index.commit()
+    index.commit()
+    if args.docs > existing:
+        print(f'인덱스 생성 : {args.docs - existing}개, {time.perf_counter() - started:.1f}초')
+    print(f'인덱스 파일 : {os.path.getsize(path) / 1024 ** 2:.1f}MB (기사 {index.status()["docs"]}개)')
+
+    if not samples:
+        samples = [array('I', row[0]) for row in index.conn.execute(
+            'SELECT signature FROM docs ORDER BY random() LIMIT ?', (args.queries,))]
+    similar = []
+    for sig in samples:
+        sig = array('I', sig)
+        for slot in rng.sample(range(SLOTS), args.changed):
+            sig[slot] = rng.getrandbits(32)
+        similar.append(sig)
+    unrelated = [random_signature(rng) for _ in range(len(similar))]
+
+    for name, signatures in (('비슷한 기사', similar), ('관계없는 기사', unrelated)):
+        times, found = timed_lookups(index, signatures)
+        print(f'{name:8} 조회 p50 {percentile(times, 0.5) * 1e6:7.1f}us  p99 {percentile(times, 0.99) * 1e6:7.1f}us  '
+              f'찾음 {found}/{len(signatures)}')
+    index.close()
+
+    text = ' '.join(''.join(rng.choice('가나다라마바사아자차카타파하') for _ in range(rng.randint(1, 4)))
+                    for _ in range(500))
+    started = time.perf_counter()
+    for _ in range(200):
+        signature(text)
+    print(f'서명 만들기 (단어 500개) : {(time.perf_counter() - started) / 200 * 1000:.2f}ms')
@@ -0,0 +1,160 @@
+"""
+기사 추출 작업 프로세스(navernews/parse_pool.py) 부하 벤치마크
+로컬 HTTP 서버가 fixtures 기사 페이지를 지연(--latency)을 두고 돌려주고, News_manual_mongo로 기사 --pages개를
+CONCURRENT_REQUESTS=32로 크롤링하면서 NAVER_PARSE_WORKERS별로 초당 처리한 응답 수와 리액터 지연을 비교한다.
+리액터 지연은 10ms마다 실행되도록 예약한 작업이 실제로 얼마나 늦게 실행됐는지이다. (추출이 리액터를 막고 있던 시간)
+
+리액터는 한 프로세스에서 한번만 실행할 수 있으므로 설정마다 이 스크립트를 자식 프로세스로 다시 실행한다.
+
+    cd navernews
+    python benchmarks/bench_parse_pool.py --pages 2000 --latency 20 --workers 0,2,4
+"""
+import argparse
+import contextlib
+import http.server
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+FIXTURES = [os.path.join(BENCH_DIR, 'fixtures', name)
+            for name in ('article_general.html', 'article_entertain.html', 'article_sports.html')]
+
+
+def serve(port_queue, latency):
+    # 기사 페이지를 aid에 따라 돌아가면서 돌려주는 서버 (요청마다 스레드)
+    pages = []
+    for path in FIXTURES:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = pages[int(self.path.rsplit('aid=', 1)[1]) % len(pages)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def crawl(port, pages, workers):
+    # 자식 프로세스에서 실행된다.
+    from scrapy import signals
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.http import Request
+    from twisted.internet import task
+    from navernews.spiders.NewsSpider import News_manual_mongo
+
+    class LoadSpider(News_manual_mongo):
+        name = 'bench_parse_pool'
+        custom_settings = dict(News_manual_mongo.custom_settings, DOWNLOADER_MIDDLEWARES={}, ITEM_PIPELINES={},
+                               DOWNLOAD_DELAY=0, RANDOMIZE_DOWNLOAD_DELAY=False, LOG_LEVEL='ERROR',
+                               TELNETCONSOLE_ENABLED=False, NAVER_PARSE_WORKERS=workers)
+
+        def start_requests(self):
+            for aid in range(pages):
+                yield Request(f'http://127.0.0.1:{port}/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid={aid:010d}',
+                              callback=self.article_callback)
+
+    lags = []
+    tick = 0.01
+    state = {'last': None}
+
+    def measure():
+        now = time.perf_counter()
+        if state['last'] is not None:
+            lags.append(max(0.0, now - state['last'] - tick))
+        state['last'] = now
+
+    looping = task.LoopingCall(measure)
+    process = CrawlerProcess()
+    crawler = process.create_crawler(LoadSpider)
+    times = dict()
+
+    def opened():
+        times['start'] = time.perf_counter()
+
+    def closed():
+        times['end'] = time.perf_counter()
+
+    # 시그널은 약한 참조로 연결되므로 함수를 변수로 잡아둔다.
+    crawler.signals.connect(opened, signal=signals.spider_opened)
+    crawler.signals.connect(closed, signal=signals.spider_closed)
+    looping.start(tick)
+    process.crawl(crawler, category='001', start='20200324', end='20200324')
+    process.start()
+
+    elapsed = times['end'] - times['start']
+    stats = crawler.stats.get_stats()
+    lags.sort()
+    return {
+        'workers': workers,
+        'responses': stats.get('response_received_count', 0),
+        'items': stats.get('item_scraped_count', 0),
+        'errors': stats.get('spider_exceptions/count', 0),
+        'elapsed': round(elapsed, 3),
+        'responses_per_sec': round(stats.get('response_received_count', 0) / elapsed, 2),
+        'reactor_lag_p99_ms': round(lags[int(len(lags) * 0.99)] * 1000, 2) if lags else 0,
+        'reactor_lag_max_ms': round(lags[-1] * 1000, 2) if lags else 0,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='기사 추출 작업 프로세스 부하 벤치마크')
+    parser.add_argument('--pages', type=int, default=2000, help='크롤링할 기사 수')
+    parser.add_argument('--latency', type=float, default=20, help='서버 응답 지연(ms)')
+    parser.add_argument('--workers', default='0,2,4', help='비교할 NAVER_PARSE_WORKERS 값, 쉼표로 구분 (0은 사용하지 않음)')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        # 스파이더의 print 출력은 버리고 결과만 출력한다.
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = crawl(args.port, args.pages, args.child)
+        print(json.dumps(result))
+        sys.exit(0)
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue, args.latency / 1000), daemon=True)
+    server.start()
+    port = port_queue.get()
+
+    results = []
+    try:
+        for workers in [int(w) for w in args.workers.split(',')]:
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', str(workers),
+                                              '--port', str(port), '--pages', str(args.pages)],
+                                             cwd=os.path.dirname(BENCH_DIR))
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            results.append(result)
+            print(f"workers={workers:<3} {result['responses_per_sec']:10.1f} responses/s  "
+                  f"리액터 지연 p99 {result['reactor_lag_p99_ms']:7.2f}ms, 최대 {result['reactor_lag_max_ms']:7.2f}ms  "
+                  f"(아이템 {result['items']}, 에러 {result['errors']})")
+    finally:
+        server.terminate()
+
+    base = results[0]['responses_per_sec'] if results else 0
+    for result in results[1:]:
+        print(f"workers={result['workers']} : workers={results[0]['workers']} 대비 "
+              f"{result['responses_per_sec'] / base:.2f}배")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'pages': args.pages, 'latency_ms': args.latency, 'results': results}, f, indent=2)
@@ -0,0 +1,297 @@
+"""
+오프라인 벤치마크 모음
+네트워크나 DB 없이 fixtures 폴더의 저장된 페이지와 로컬 DB 대용품으로 크롤링의 주요 구간을 측정하고,
+결과를 JSON으로 저장해서 리비전끼리 비교할 수 있게 한다.
+
+측정 항목
+    parse/list_page             News_manual_mongo.parse_link (목록 페이지 1장 -> 기사 요청, 다음 페이지 요청)
+    parse/<레이아웃>/text       News_manual.parse_article (일반 / TV연예 / 스포츠)
+    parse/<레이아웃>/html       News_manual_mongo.parse_article
+    clean/clean_html            tools.clean_html (w3lib)
+    clean/clean_element         tools.clean_element
+    pipeline/NewsPipeline       아이템마다 연결 + INSERT + commit
+    pipeline/NewsBatchPipeline  MYSQL_BATCH_SIZE개씩 executemany
+    pipeline/MongodbPipeline    mongomock 클라이언트로 insert_many (mongomock이 없으면 건너뜀)
+
+MySQL은 쿼리를 실행하지 않고 기록만 하는 가짜 연결을 사용한다. --db-latency로 쿼리/commit마다 지연을 줄 수 있다.
+
+    cd navernews
+    python benchmarks/run_benchmarks.py --output bench-new.json
+    python benchmarks/run_benchmarks.py --output bench-new.json --compare bench-old.json
+"""
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from navernews import pipelines  # noqa: E402
+from navernews.spiders import NewsSpider  # noqa: E402
+from navernews.tools import clean_element  # noqa: E402
+from bench_clean_html import corpus, w3lib_version, BODIES  # noqa: E402
+
+FIXTURES = os.path.join(BENCH_DIR, 'fixtures')
+ARTICLES = [
+    ('general', 'article_general.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid=0011494587'),
+    ('entertain', 'article_entertain.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=112&aid=0003283512'),
+    ('sports', 'article_sports.html', 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=109&aid=0004188437'),
+]
+
+
+class FakeCursor(object):
+    # pymysql 커서 대용품, 실행한 행만 기록한다.
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def execute(self, sql, args=None):
+        self.conn.wait()
+        self.conn.rows += 1
+        return 1
+
+    def executemany(self, sql, rows):
+        self.conn.wait()
+        self.conn.rows += len(rows)
+        return len(rows)
+
+    def fetchone(self):
+        return (0,)
+
+    def fetchmany(self, size=None):
+        # SeenIndex.refresh가 SSCursor로 나눠 읽는 (inx, news_id), 저장된 기사가 없는 것으로 본다.
+        return []
+
+    def fetchall(self):
+        return [{'flag': 1}]
+
+
+class FakeConnection(object):
+    # pymysql 연결 대용품, latency초만큼 쿼리와 commit마다 기다린다.
+    latency = 0.0
+    open = True
+
+    def __init__(self):
+        self.rows = 0
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.wait()
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=True):
+        pass
+
+    def close(self):
+        pass
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def make_spider(cls, **kwargs):
+    crawler = get_crawler(cls)
+    return cls.from_crawler(crawler, category='001', start='20200324', end='20200324', **kwargs)
+
+
+def timed(func, number, repeat):
+    # repeat번 측정해서 가장 빠른 결과를 초당 처리 수로 돌려준다.
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(number)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return number / best
+
+
+def bench_list_page(spider):
+    body = load('list.html')
+    url = 'https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec&listType=summary&oid=001&date={}&page=1'
+    dates = itertools.count()
+
+    def run(n):
+        for _ in range(n):
+            # 날짜를 매번 바꿔서 같은 페이지 반복(page_signatures)으로 처리되지 않게 한다.
+            date = f'2020{next(dates):08d}'
+            request = Request(url.format(date), meta={'oid': '001', 'date': date, 'page': 1})
+            spider.open_dates[('001', date)] = 1
+            spider.open_per_oid['001'] += 1
+            for _ in spider.parse_link(HtmlResponse(request.url, body=body, encoding='utf-8', request=request)):
+                pass
+    return run
+
+
+def bench_article(spider, body, url):
+    def run(n):
+        for _ in range(n):
+            for _ in spider.parse_article(HtmlResponse(url, body=body, encoding='utf-8', request=Request(url))):
+                pass
+    return run
+
+
+def bench_clean(func, elements):
+    def run(n):
+        for i in range(n):
+            func(elements[i % len(elements)])
+    return run
+
+
+def make_items(count):
+    # fixtures 기사 3개의 필드로 news_id만 바꾼 아이템을 만든다.
+    spider = make_spider(NewsSpider.News_manual_mongo)
+    samples = []
+    for _, name, url in ARTICLES:
+        _, fields = spider.extractor.extract_html(url, load(name).decode('utf-8'))
+        samples.append(fields)
+    items = []
+    for i in range(count):
+        fields = dict(samples[i % len(samples)])
+        fields['news_id'] = f"{int(fields['news_id']) + i:010d}"
+        items.append(NewsSpider.NewsItem(**fields))
+    return items
+
+
+def bench_pipeline(make_pipeline, items, spider):
+    def run(n):
+        pipeline = make_pipeline()
+        if hasattr(pipeline, 'open_spider'):
+            pipeline.open_spider(spider)
+        for item in items[:n]:
+            pipeline.process_item(item, spider)
+        if hasattr(pipeline, 'close_spider'):
+            pipeline.close_spider(spider)
+    return run
+
+
+def run_all(args):
+    results = dict()
+
+    def record(name, unit, func, number):
+        ops = timed(func, number, args.repeat)
+        results[name] = {'ops_per_sec': round(ops, 2), 'unit': unit, 'number': number, 'repeat': args.repeat}
+        print(f'{name:32} {ops:12.1f} {unit}', file=sys.__stdout__)
+
+    FakeConnection.latency = args.db_latency / 1000
+    NewsSpider.connection_db = FakeConnection
+    pipelines.connection_db = FakeConnection
+
+    with tempfile.TemporaryDirectory() as seen_dir:
+        text_spider = make_spider(NewsSpider.News_manual, seen_dir=seen_dir)
+        html_spider = make_spider(NewsSpider.News_manual_mongo)
+
+        record('parse/list_page', 'pages/s', bench_list_page(html_spider), args.number)
+        for layout, name, url in ARTICLES:
+            body = load(name)
+            record(f'parse/{layout}/text', 'pages/s', bench_article(text_spider, body, url), args.number)
+            record(f'parse/{layout}/html', 'pages/s', bench_article(html_spider, body, url), args.number)
+
+        elements = [element for _, element in corpus()[:len(BODIES)]]
+        record('clean/clean_html', 'bodies/s', bench_clean(w3lib_version, elements), args.number)
+        record('clean/clean_element', 'bodies/s', bench_clean(clean_element, elements), args.number)
+
+        items = make_items(args.items)
+        stats = html_spider.crawler.stats
+        record('pipeline/NewsPipeline', 'items/s',
+               bench_pipeline(pipelines.NewsPipeline, items, text_spider), args.items)
+        record('pipeline/NewsBatchPipeline', 'items/s',
+               bench_pipeline(lambda: pipelines.NewsBatchPipeline(stats, flush_interval=0), items, text_spider),
+               args.items)
+        try:
+            import mongomock
+        except ImportError:
+            print('mongomock이 없어서 pipeline/MongodbPipeline은 건너뜁니다.', file=sys.__stdout__)
+        else:
+            def mongo_pipeline():
+                return pipelines.MongodbPipeline(stats, client_factory=mongomock.MongoClient, flush_interval=0)
+            record('pipeline/MongodbPipeline', 'items/s', bench_pipeline(mongo_pipeline, items, html_spider), args.items)
+
+        text_spider.closed('finished')
+        html_spider.closed('finished')
+    return results
+
+
+def revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, path, threshold):
+    # 이전 결과와 비교해서 threshold 이상 느려진 항목을 돌려준다.
+    with open(path, encoding='utf-8') as f:
+        old = json.load(f)
+    print(f"\n[{old.get('revision')}] 대비", file=sys.__stdout__)
+    regressions = []
+    for name, result in results.items():
+        if name not in old['results']:
+            continue
+        ratio = result['ops_per_sec'] / old['results'][name]['ops_per_sec']
+        mark = ''
+        if ratio < 1 - threshold:
+            mark = '  <- 느려짐'
+            regressions.append(name)
+        print(f'{name:32} {ratio:6.2f}배{mark}', file=sys.__stdout__)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 뉴스 크롤러 오프라인 벤치마크')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    parser.add_argument('--threshold', type=float, default=0.1, help='이 비율 이상 느려지면 종료 코드 1 (기본 0.1)')
+    parser.add_argument('--number', type=int, default=300, help='parse/clean 항목의 반복 횟수')
+    parser.add_argument('--items', type=int, default=3000, help='pipeline 항목의 아이템 수')
+    parser.add_argument('--repeat', type=int, default=3, help='항목마다 측정 횟수 (가장 빠른 결과를 사용)')
+    parser.add_argument('--db-latency', type=float, default=0.0, help='가짜 MySQL 쿼리/commit마다 지연(ms)')
+    args = parser.parse_args()
+
+    # 스파이더와 파이프라인의 print 출력은 측정하는 동안 버린다.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = run_all(args)
+
+    report = {
+        'revision': revision(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'number': args.number, 'items': args.items, 'repeat': args.repeat, 'db_latency_ms': args.db_latency},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n결과를 [{args.output}] 에 저장했습니다.')
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,363 @@
+"""
+네이버 뉴스 원본 응답 보관 (WARC 형식, zstd 압축, 세그먼트 파일 순환)
+크롤링에서 추출한 필드만 저장하면 HTML은 남지 않기 때문에, 기사/목록 페이지 응답을 그대로 보관해두는 다운로더 미들웨어이다.
+
+세그먼트 파일 (<NAVER_ARCHIVE_DIR>/navernews-<시작 시각>-<번호>.warc.zst)
+    - 레코드(WARC response 레코드 하나)마다 독립된 zstd frame으로 압축해서 이어붙인다.
+      파일 전체를 zstd -d로 풀면 그대로 .warc 파일이 되고, 레코드 하나만 필요하면 offset부터 length만큼 읽어서 풀면 된다.
+    - 실행마다 새 세그먼트를 만들고 이어쓰기만 한다. NAVER_ARCHIVE_SEGMENT_SIZE(압축 후 바이트)를 넘으면 다음 세그먼트로 넘어간다.
+    - WARC 헤더에 URL, 받은 시각(WARC-Date)과 함께 WARC-Naver-Kind / WARC-Naver-Oid / WARC-Naver-Aid를 기록한다.
+    - 종류와 키는 httpcache.cache_key와 같다. 기사 URL의 리다이렉트(3xx) 응답은 같은 oid/aid의 기사 페이지와 섞이지 않도록
+      'redirect' 종류로 보관한다.
+인덱스 (<NAVER_ARCHIVE_DIR>/index.sqlite3)
+    - 레코드마다 (종류, 키, oid, aid, url, 세그먼트, offset, length, 받은 시각)를 저장해서 aid로 바로 찾아 읽을 수 있다.
+
+압축과 파일 쓰기는 쓰기 전용 스레드 하나에서 순서대로 하고, 리액터 스레드는 큐에 넣기만 한다.
+큐가 가득 차면(NAVER_ARCHIVE_QUEUE_SIZE) 그 응답은 별도 스레드에서 자리가 날 때까지 기다렸다가 넘겨주므로,
+리액터는 멈추지 않고 응답도 버리지 않는다. (쓰기가 밀리는 동안은 다운로드가 그만큼 늦어진다.)
+
+    NAVER_ARCHIVE_ENABLED = True
+    DOWNLOADER_MIDDLEWARES = {'navernews.archive.ArchiveMiddleware': 950}
+
+settings.py의 DOWNLOADER_MIDDLEWARES는 스파이더의 custom_settings 목록과 합쳐진다. (NewsSpider.update_component_settings)
+
+저장된 기사 읽기 / 상태 확인
+    python -m navernews.archive archive get 001/0011494587
+    python -m navernews.archive archive status
+"""
+import argparse
+import datetime
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from twisted.internet import threads
+from twisted.python.threadpool import ThreadPool
+from twisted.web.http import RESPONSES
+
+from navernews.httpcache import cache_key
+
+AID_KINDS = ('article', 'redirect')  # 키가 <oid>/<aid>인 종류
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS records (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        oid TEXT,
+        aid TEXT,
+        url TEXT NOT NULL,
+        segment TEXT NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        fetched REAL NOT NULL);
+    CREATE INDEX IF NOT EXISTS records_aid ON records (aid);
+    CREATE INDEX IF NOT EXISTS records_key ON records (kind, key);
+'''
+
+
+def _warc_date(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def build_record(url, status, headers, body, fetched, kind, key):
+    '''
+    WARC/1.1 response 레코드를 만든다.
+    :param headers: [(이름 bytes, 값 bytes), ...]
+    '''
+    oid, _, rest = key.partition('/')
+    http = [f'HTTP/1.1 {status} {RESPONSES.get(status, b"").decode("latin1")}'.encode('latin1')]
+    http.extend(name + b': ' + value for name, value in headers)
+    block = b'\r\n'.join(http) + b'\r\n\r\n' + body
+
+    warc = [
+        'WARC/1.1',
+        'WARC-Type: response',
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        f'WARC-Date: {_warc_date(fetched)}',
+        f'WARC-Target-URI: {url}',
+        f'WARC-Naver-Kind: {kind}',
+        f'WARC-Naver-Oid: {oid}',
+    ]
+    if kind in AID_KINDS:
+        warc.append(f'WARC-Naver-Aid: {rest}')
+    warc.append('Content-Type: application/http; msgtype=response')
+    warc.append(f'Content-Length: {len(block)}')
+    return '\r\n'.join(warc).encode('utf-8') + b'\r\n\r\n' + block + b'\r\n\r\n'
+
+
+def parse_record(data):
+    '''
+    build_record로 만든 레코드를 (WARC 헤더 dict, 상태 코드, Headers, 본문) 으로 되돌린다.
+    '''
+    warc_head, _, rest = data.partition(b'\r\n\r\n')
+    warc = dict(line.split(': ', 1) for line in warc_head.decode('utf-8').split('\r\n')[1:])
+    block = rest[:int(warc['Content-Length'])]
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    lines = http_head.split(b'\r\n')
+    status = int(lines[0].split(b' ')[1])
+    headers = Headers()
+    for line in lines[1:]:
+        name, _, value = line.partition(b': ')
+        headers.appendlist(name, value)
+    return warc, status, headers, body
+
+
+class ArchiveWriter(object):
+    """
+    세그먼트 파일과 인덱스에 레코드를 쓰는 스레드
+    write()는 큐에 넣기만 하고, 압축과 파일 쓰기, 인덱스 저장은 모두 이 스레드에서 순서대로 한다.
+    """
+
+    def __init__(self, directory, segment_size=1024 ** 3, level=3, queue_size=1000, buffer_size=1024 ** 2,
+                 commit_records=500, flush_interval=5.0, stats=None):
+        import zstandard
+        self.directory = directory
+        self.segment_size = segment_size
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.buffer_size = buffer_size
+        self.commit_records = commit_records
+        self.flush_interval = flush_interval
+        self.stats = stats
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.prefix = f"navernews-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        self.segment_no = -1
+        self.segment = None
+        self.file = None
+        self.offset = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='navernews-archive', daemon=True)
+        # 큐가 가득 찼을 때 리액터 대신 자리가 날 때까지 기다리는 스레드
+        self.waiters = ThreadPool(minthreads=1, maxthreads=1, name='navernews-archive-wait')
+
+    def start(self):
+        self.thread.start()
+        self.waiters.start()
+
+    def write(self, url, status, headers, body, fetched, kind, key):
+        '''
+        :return: 큐에 바로 넣었으면 None, 큐가 가득 찼으면 큐에 넣은 다음에 발생하는 Deferred
+        '''
+        item = (url, status, headers, body, fetched, kind, key)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # 쓰기가 밀린 경우 응답을 버리지 않고, 리액터 스레드를 멈추지 않도록 다른 스레드에서 자리가 날 때까지 기다린다.
+            from twisted.internet import reactor
+            self._inc('archive/queue_full')
+            return threads.deferToThreadPool(reactor, self.waiters, self.queue.put, item)
+        return None
+
+    def close(self):
+        # 기다리는 중인 응답을 모두 큐에 넣은 다음에 끝낸다.
+        self.waiters.stop()
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _inc(self, key, count=1):
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    def _open_segment(self):
+        if self.file is not None:
+            self.file.close()
+        self.segment_no += 1
+        self.segment = f'{self.prefix}-{self.segment_no:05d}.warc.zst'
+        self.file = open(os.path.join(self.directory, self.segment), 'ab', buffering=self.buffer_size)
+        self.offset = self.file.tell()
+        self._inc('archive/segments')
+
+    def _run(self):
+        conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'))
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        pending = 0
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    # 응답이 뜸할 때는 기다리는 동안 저장해둔다.
+                    if pending:
+                        self.file.flush()
+                        conn.commit()
+                        pending = 0
+                    continue
+                if item is None:
+                    break
+                url, status, headers, body, fetched, kind, key = item
+                frame = self.compressor.compress(build_record(url, status, headers, body, fetched, kind, key))
+                if self.file is None or (self.offset > 0 and self.offset + len(frame) > self.segment_size):
+                    self._open_segment()
+                self.file.write(frame)
+
+                oid, _, rest = key.partition('/')
+                conn.execute('INSERT INTO records (kind, key, oid, aid, url, segment, offset, length, fetched) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             (kind, key, oid, rest if kind in AID_KINDS else None, url,
+                              self.segment, self.offset, len(frame), fetched))
+                self.offset += len(frame)
+                self._inc('archive/records')
+                self._inc('archive/bytes', len(frame))
+                self._inc('archive/raw_bytes', len(body))
+
+                pending += 1
+                # 인덱스가 파일에 아직 쓰이지 않은 레코드를 가리키지 않도록 파일을 먼저 flush 한다.
+                if pending >= self.commit_records:
+                    self.file.flush()
+                    conn.commit()
+                    pending = 0
+        except Exception as e:
+            self.error = e
+            # 스파이더 쪽에서 기다리지 않도록 남은 큐는 비운다.
+            while self.queue.get() is not None:
+                pass
+        finally:
+            if self.file is not None:
+                self.file.close()
+            conn.commit()
+            conn.close()
+
+
+class ArchiveMiddleware(object):
+    """
+    다운로더 미들웨어, 네이버에서 받은 기사/목록 페이지 응답을 ArchiveWriter로 넘긴다.
+    HTTP 캐시(HttpCacheMiddleware)에서 나온 응답은 다시 저장하지 않는다.
+
+    settings
+        NAVER_ARCHIVE_ENABLED       : True이면 사용
+        NAVER_ARCHIVE_DIR           : 보관 폴더, 기본값 <프로젝트 데이터 폴더>/archive
+        NAVER_ARCHIVE_KINDS         : 보관할 페이지 종류, 기본값 ['article', 'list'] (list는 오늘 날짜 목록도 포함)
+        NAVER_ARCHIVE_SEGMENT_SIZE  : 세그먼트 최대 크기(압축 후 바이트), 기본값 1GB
+        NAVER_ARCHIVE_ZSTD_LEVEL    : zstd 압축 레벨 (기본 3)
+        NAVER_ARCHIVE_QUEUE_SIZE    : 쓰기를 기다리는 응답을 최대 몇 개까지 쌓아둘지 (기본 1000)
+    """
+
+    def __init__(self, writer, kinds, stats):
+        self.writer = writer
+        self.kinds = set(kinds)
+        if 'list' in self.kinds:
+            self.kinds.add('list_today')
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('NAVER_ARCHIVE_ENABLED'):
+            raise NotConfigured
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise NotConfigured('ArchiveMiddleware를 사용하려면 zstandard 패키지가 필요합니다. (pip install zstandard)')
+        directory = settings.get('NAVER_ARCHIVE_DIR') or data_path('archive', createdir=True)
+        os.makedirs(directory, exist_ok=True)
+        writer = ArchiveWriter(directory,
+                               segment_size=settings.getint('NAVER_ARCHIVE_SEGMENT_SIZE', 1024 ** 3),
+                               level=settings.getint('NAVER_ARCHIVE_ZSTD_LEVEL', 3),
+                               queue_size=settings.getint('NAVER_ARCHIVE_QUEUE_SIZE', 1000),
+                               stats=crawler.stats)
+        middleware = cls(writer, settings.getlist('NAVER_ARCHIVE_KINDS', ['article', 'list']), crawler.stats)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.writer.start()
+        spider.logger.info(f'응답을 [{self.writer.directory}] 에 보관합니다.')
+
+    def spider_closed(self, spider):
+        self.writer.close()
+        spider.logger.info(f'응답 보관 완료 : {self.stats.get_value("archive/records", 0)}개, '
+                           f'{self.stats.get_value("archive/segments", 0)}개 세그먼트')
+
+    def process_response(self, request, response, spider):
+        if 'cached' in response.flags:
+            return response
+        key = cache_key(response.url)
+        if key is None or key[0] not in self.kinds:
+            return response
+        kind, key = key
+        if kind == 'article' and 300 <= response.status < 400:
+            # get_article로 찾을 때 이동할 주소의 기사 페이지 대신 리다이렉트가 나오지 않도록 종류를 나눈다.
+            kind = 'redirect'
+        headers = [(name, value) for name, values in response.headers.items() for value in values]
+        waiting = self.writer.write(response.url, response.status, headers, response.body, time.time(), kind, key)
+        if waiting is not None:
+            # 보관 큐가 가득 찬 경우, 큐에 들어간 다음에 응답을 넘긴다.
+            return waiting.addCallback(lambda _: response)
+        return response
+
+
+class ArchiveReader(object):
+    """
+    보관된 응답을 인덱스로 찾아서 읽는다.
+
+        reader = ArchiveReader('archive')
+        response = reader.get_article('001', '0011494587')
+    """
+
+    def __init__(self, directory):
+        import zstandard
+        self.directory = directory
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite3'))
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def close(self):
+        self.conn.close()
+
+    def read(self, segment, offset, length):
+        with open(os.path.join(self.directory, segment), 'rb') as f:
+            f.seek(offset)
+            return parse_record(self.decompressor.decompress(f.read(length)))
+
+    def get(self, kind, key):
+        # 같은 페이지가 여러 번 보관된 경우 가장 최근에 받은 것
+        row = self.conn.execute('SELECT segment, offset, length FROM records WHERE kind = ? AND key = ? '
+                                'ORDER BY fetched DESC LIMIT 1', (kind, key)).fetchone()
+        if row is None and kind == 'list':
+            return self.get('list_today', key)
+        if row is None:
+            return None
+        warc, status, headers, body = self.read(*row)
+        url = warc['WARC-Target-URI']
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def get_article(self, oid, aid):
+        return self.get('article', f'{oid}/{aid}')
+
+    def status(self):
+        kinds = self.conn.execute('SELECT kind, COUNT(*) FROM records GROUP BY kind').fetchall()
+        segments, size = self.conn.execute('SELECT COUNT(DISTINCT segment), COALESCE(SUM(length), 0) '
+                                           'FROM records').fetchone()
+        return {'records': dict(kinds), 'segments': segments, 'compressed_bytes': size}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 뉴스 원본 응답 보관 폴더 관리')
+    parser.add_argument('directory', help='보관 폴더 (NAVER_ARCHIVE_DIR)')
+    parser.add_argument('command', choices=('status', 'get'))
+    parser.add_argument('key', nargs='?', help='get : 기사는 <oid>/<aid>, 목록은 list:<oid>/<date>/<page>')
+    args = parser.parse_args()
+
+    reader = ArchiveReader(args.directory)
+    if args.command == 'status':
+        print(reader.status())
+    else:
+        kind, _, key = args.key.rpartition(':')
+        response = reader.get(kind or 'article', key)
+        if response is None:
+            print(f'{args.key} 는 보관되어 있지 않습니다.')
+        else:
+            print(f'{response.status} {response.url}')
+            print(response.text)
+    reader.close()
@@ -0,0 +1,198 @@
+"""
+언론사별 테이블(news.<언론사 코드>)을 news_date로 파티션한 news.articles 테이블 하나로 옮기는 도구 (db_schema.py)
+옮기는 동안에도 기존 테이블은 그대로 두므로, 확인(verify)이 끝난 뒤 NEWS_TABLE_LAYOUT = 'articles'로 바꾸고 직접 지운다.
+
+    python -m navernews.articles create --from-year 1990
+    python -m navernews.articles migrate [--oid 001,003] [--batch 5000]
+    python -m navernews.articles verify
+    python -m navernews.articles partitions --to-year 2030
+
+migrate는 언론사 테이블의 inx 구간(--batch)마다 INSERT ... SELECT 한번 + commit 한번으로 DB 서버 안에서 복사하고,
+어디까지 옮겼는지 news.articles_migration 테이블에 기록하므로 중간에 멈춰도 다시 실행하면 이어서 옮긴다.
+이미 있는 기사(같은 media_code, news_id, news_date)는 건너뛰므로 크롤링을 멈추지 않고 옮긴 뒤 한번 더 실행하면 된다.
+날짜가 없는 기사는 UNKNOWN_DATE로 옮기므로, 같은 기사가 날짜와 함께 있으면(크롤러가 먼저 저장한 경우 등) UNKNOWN_DATE 행을 지운다.
+기존 news_date(TIMESTAMP)는 세션 시간대 기준으로 읽어서 DATETIME으로 저장되므로, 크롤러와 같은 시간대 설정에서 실행한다.
+"""
+import argparse
+import datetime
+import time
+
+import pymysql
+
+from navernews.db_auth import connection_db
+from navernews.db_schema import ARTICLES_TABLE, UNKNOWN_DATE, ensure_duplicate_column, partition_clauses, \
+    prepare_articles_table
+from navernews.tools import parse_categories
+
+MIGRATION_TABLE = 'articles_migration'
+COPY_COLUMNS = ('news_id', 'news_title', 'news_content', 'news_author', 'news_category',
+                'news_original_url', 'news_site', 'news_naver_url', 'news_duplicate_of')
+
+
+def outlet_tables(db_connect):
+    # 언론사 코드(숫자 3자리) 이름의 테이블 목록
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SELECT TABLE_NAME FROM information_schema.tables "
+                       "WHERE table_schema = 'news' AND TABLE_NAME REGEXP '^[0-9]{3}$' ORDER BY TABLE_NAME")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def prepare_migration_table(db_connect):
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS news.`{MIGRATION_TABLE}` (
+                `media_code` CHAR(3) NOT NULL,
+                `last_inx` BIGINT NOT NULL DEFAULT 0,
+                `copied` BIGINT NOT NULL DEFAULT 0,
+                `updated_at` DATETIME NOT NULL,
+                PRIMARY KEY (`media_code`)
+            )
+            ENGINE=InnoDB
+            ''')
+    db_connect.commit()
+
+
+def migration_state(db_connect, oid):
+    # (옮긴 마지막 inx, 옮긴 기사 수)
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(f'SELECT last_inx, copied FROM news.`{MIGRATION_TABLE}` WHERE media_code = %s', (oid,))
+        row = cursor.fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+def migrate_table(db_connect, oid, batch=5000):
+    """
+    news.<oid> 테이블을 inx 구간마다 news.articles로 복사한다.
+    구간 복사와 진행 기록은 같은 트랜잭션으로 commit하므로, 중간에 멈춰도 기록된 곳부터 다시 시작한다.
+    :return: 이번에 새로 추가된 기사 수
+    """
+    ensure_duplicate_column(db_connect, oid)
+    last_inx, copied = migration_state(db_connect, oid)
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute(f'SELECT MAX(inx) FROM news.`{oid}`')
+        max_inx = cursor.fetchone()[0] or 0
+    if last_inx >= max_inx:
+        print(f'[{oid}] 옮길 기사가 없습니다. (inx {last_inx}까지 완료)')
+        drop_undated_duplicates(db_connect, oid)
+        return 0
+
+    # news_date가 NULL인 기사는 파티션 키를 비울 수 없으므로 UNKNOWN_DATE(p_unknown)로 옮긴다.
+    # news_id는 언론사 테이블과 articles 테이블에 모두 있으므로 UPDATE 절에서 테이블을 붙이지 않으면 1052(ambiguous) 에러가 난다.
+    sql = f"INSERT INTO news.`{ARTICLES_TABLE}` (media_code, {', '.join(COPY_COLUMNS)}, news_date) " \
+          f"SELECT %s, {', '.join(COPY_COLUMNS)}, COALESCE(news_date, %s) FROM news.`{oid}` " \
+          f"WHERE inx > %s AND inx <= %s " \
+          f"ON DUPLICATE KEY UPDATE news.`{ARTICLES_TABLE}`.news_id = news.`{ARTICLES_TABLE}`.news_id"
+    progress_sql = f"INSERT INTO news.`{MIGRATION_TABLE}` (media_code, last_inx, copied, updated_at) " \
+                   f"VALUES (%s, %s, %s, NOW()) " \
+                   f"ON DUPLICATE KEY UPDATE last_inx = VALUES(last_inx), copied = VALUES(copied), updated_at = NOW()"
+
+    added = 0
+    started = time.perf_counter()
+    while last_inx < max_inx:
+        upper = min(last_inx + batch, max_inx)
+        try:
+            with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+                # ON DUPLICATE KEY UPDATE로 바뀌는 값이 없으므로 rowcount에는 새로 추가된 행만 잡힌다.
+                inserted = cursor.execute(sql, (oid, UNKNOWN_DATE, last_inx, upper))
+                cursor.execute(progress_sql, (oid, upper, copied + inserted))
+            db_connect.commit()
+        except pymysql.MySQLError:
+            db_connect.rollback()
+            print(f'[{oid}] inx {last_inx} ~ {upper} 구간을 옮기지 못했습니다. 다시 실행하면 이 구간부터 이어서 옮깁니다.')
+            raise
+        last_inx = upper
+        copied += inserted
+        added += inserted
+        elapsed = time.perf_counter() - started
+        print(f'[{oid}] inx {last_inx}/{max_inx} ({last_inx / max_inx:.1%}) 추가 {added}개, '
+              f'{added / elapsed if elapsed else 0:.0f} rows/sec')
+    drop_undated_duplicates(db_connect, oid)
+    return added
+
+
+def drop_undated_duplicates(db_connect, oid):
+    """
+    같은 기사(media_code, news_id)가 날짜와 함께 저장되어 있으면 UNKNOWN_DATE(p_unknown) 행을 지운다.
+    파티션 키(news_date)가 빠진 유니크 키는 만들 수 없으므로 옮긴 다음에 정리한다. (pipelines.resolve_undated 참고)
+    :return: 지운 행 수
+    """
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        deleted = cursor.execute(f"DELETE undated FROM news.`{ARTICLES_TABLE}` AS undated "
+                                 f"JOIN news.`{ARTICLES_TABLE}` AS dated "
+                                 f"ON dated.media_code = undated.media_code AND dated.news_id = undated.news_id "
+                                 f"AND dated.news_date <> undated.news_date "
+                                 f"WHERE undated.media_code = %s AND undated.news_date = %s", (oid, UNKNOWN_DATE))
+    db_connect.commit()
+    if deleted:
+        print(f'[{oid}] 날짜와 함께 저장된 기사의 날짜 없는 행 {deleted}개를 지웠습니다.')
+    return deleted
+
+
+def verify(db_connect, oids):
+    # 언론사별 기존 테이블과 articles 테이블의 기사 수 비교
+    ok = True
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        for oid in oids:
+            cursor.execute(f'SELECT COUNT(*) FROM news.`{oid}`')
+            source = cursor.fetchone()[0]
+            cursor.execute(f'SELECT COUNT(*) FROM news.`{ARTICLES_TABLE}` WHERE media_code = %s', (oid,))
+            target = cursor.fetchone()[0]
+            # 다시 크롤링해서 articles에만 저장된 기사가 있을 수 있으므로 적은 경우만 문제로 본다.
+            ok = ok and target >= source
+            print(f"[{oid}] 기존 {source}개 / articles {target}개 {'' if target >= source else '<- 덜 옮겨짐'}")
+    return ok
+
+
+def add_year_partitions(db_connect, to_year):
+    """
+    p_future 파티션을 나눠서 to_year까지 연도 파티션을 추가한다.
+    p_future에 이미 들어간 기사는 REORGANIZE 중에 새 연도 파티션으로 옮겨진다.
+    :return: 추가한 파티션 수
+    """
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SELECT PARTITION_NAME FROM information_schema.partitions "
+                       "WHERE table_schema = 'news' AND table_name = %s", (ARTICLES_TABLE,))
+        years = [int(row[0][1:]) for row in cursor.fetchall() if row[0][1:].isdigit()]
+        from_year = max(years) + 1 if years else datetime.date.today().year
+        if from_year > to_year:
+            return 0
+        partitions = ',\n'.join(partition_clauses(from_year, to_year)[1:])
+        cursor.execute(f'ALTER TABLE news.`{ARTICLES_TABLE}` REORGANIZE PARTITION p_future INTO ({partitions})')
+    return to_year - from_year + 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='언론사별 테이블을 news.articles 테이블로 옮기기')
+    sub = parser.add_subparsers(dest='command', required=True)
+    create_parser = sub.add_parser('create', help='news.articles 테이블 생성')
+    create_parser.add_argument('--from-year', type=int, default=1990, help='첫 연도 파티션')
+    create_parser.add_argument('--to-year', type=int, help='마지막 연도 파티션 (기본 올해 + 1)')
+    migrate_parser = sub.add_parser('migrate', help='언론사별 테이블의 기사를 news.articles로 복사')
+    migrate_parser.add_argument('--oid', help='언론사 코드, 여러 언론사는 쉼표로 구분 (기본 모든 언론사 테이블)')
+    migrate_parser.add_argument('--batch', type=int, default=5000, help='한번에 복사할 inx 구간 크기')
+    verify_parser = sub.add_parser('verify', help='언론사별 기사 수 비교')
+    verify_parser.add_argument('--oid', help='언론사 코드, 여러 언론사는 쉼표로 구분 (기본 모든 언론사 테이블)')
+    partitions_parser = sub.add_parser('partitions', help='연도 파티션 추가')
+    partitions_parser.add_argument('--to-year', type=int, default=datetime.date.today().year + 1,
+                                   help='마지막 연도 파티션')
+    args = parser.parse_args()
+
+    db_connect = connection_db()
+    try:
+        if args.command == 'create':
+            if not prepare_articles_table(db_connect, args.from_year, args.to_year):
+                print(f'{ARTICLES_TABLE} 테이블이 이미 있습니다.')
+        elif args.command == 'migrate':
+            prepare_articles_table(db_connect)
+            prepare_migration_table(db_connect)
+            oids = parse_categories(args.oid) if args.oid else outlet_tables(db_connect)
+            total = sum(migrate_table(db_connect, oid, args.batch) for oid in oids)
+            print(f'언론사 테이블 {len(oids)}개에서 기사 {total}개를 {ARTICLES_TABLE} 테이블로 옮겼습니다.')
+        elif args.command == 'verify':
+            oids = parse_categories(args.oid) if args.oid else outlet_tables(db_connect)
+            if not verify(db_connect, oids):
+                raise SystemExit(1)
+        elif args.command == 'partitions':
+            print(f'연도 파티션 {add_year_partitions(db_connect, args.to_year)}개를 추가했습니다.')
+    finally:
+        db_connect.close()
@@ -0,0 +1,103 @@
+"""
+기간 크롤링 체크포인트
+오래 걸리는 기간 크롤링이 중간에 죽었을 때, 다시 실행하면 끝난 작업은 건너뛰고 남은 요청만 다시 보내기 위해 사용한다.
+
+기록하는 내용 (SQLite 파일 하나)
+    list_pages  : 요청한 목록 페이지 (언론사, 날짜, 페이지)와 처리가 끝났는지 여부
+    dates       : 모든 목록 페이지 처리가 끝난 (언론사, 날짜)
+    articles    : 요청은 했지만 아직 아이템이 나오지 않은 기사 (언론사, aid)
+
+요청마다 바로 쓰지 않고 메모리에 모아뒀다가 flush_ops개가 쌓이거나 flush_interval초가 지나면
+트랜잭션 하나로 기록하므로, 동시 요청이 많아도 부담이 적다.
+새 기록이 없으면 _add가 불리지 않으므로 스파이더가 flush_interval초마다 flush()를 불러서,
+요청이 멈추고 기사 저장(items_stored)만 기다리는 동안에도 모아둔 기록이 파일에 남도록 한다.
+죽기 직전 flush_interval초 동안의 기록은 잃어버릴 수 있는데, 그 부분은 다시 실행할 때 한번 더 크롤링된다.
+조회할 때는 아직 기록하지 않은 내용도 보이도록 먼저 기록한다.
+기사 완료(article_done)는 스파이더가 저장 파이프라인의 commit(items_stored 시그널)을 받은 다음에 기록한다.
+"""
+import json
+import sqlite3
+import time
+
+
+class Checkpoint(object):
+
+    def __init__(self, path, flush_ops=500, flush_interval=1.0):
+        self.flush_ops = flush_ops
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS list_pages (
+                oid TEXT NOT NULL, date TEXT NOT NULL, page INTEGER NOT NULL,
+                meta TEXT, done INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (oid, date, page));
+            CREATE TABLE IF NOT EXISTS dates (
+                oid TEXT NOT NULL, date TEXT NOT NULL,
+                PRIMARY KEY (oid, date));
+            CREATE TABLE IF NOT EXISTS articles (
+                oid TEXT NOT NULL, aid TEXT NOT NULL, date TEXT, url TEXT NOT NULL,
+                PRIMARY KEY (oid, aid));
+        ''')
+        self.ops = []  # 아직 기록하지 않은 (sql, 파라미터)
+        self.last_flush = time.time()
+
+    def _add(self, sql, params):
+        self.ops.append((sql, params))
+        if len(self.ops) >= self.flush_ops or time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.ops:
+            with self.conn:
+                for sql, params in self.ops:
+                    self.conn.execute(sql, params)
+            self.ops = []
+        self.last_flush = time.time()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # 기록
+    def list_requested(self, oid, date, page, meta=None):
+        self._add('INSERT OR IGNORE INTO list_pages (oid, date, page, meta) VALUES (?, ?, ?, ?)',
+                  (oid, date, page, json.dumps(meta or {})))
+
+    def list_done(self, oid, date, page):
+        self._add('UPDATE list_pages SET done = 1 WHERE oid = ? AND date = ? AND page = ?', (oid, date, page))
+
+    def date_done(self, oid, date):
+        self._add('INSERT OR IGNORE INTO dates (oid, date) VALUES (?, ?)', (oid, date))
+        self._add('DELETE FROM list_pages WHERE oid = ? AND date = ?', (oid, date))
+
+    def article_requested(self, oid, aid, date, url):
+        self._add('INSERT OR IGNORE INTO articles (oid, aid, date, url) VALUES (?, ?, ?, ?)', (oid, aid, date, url))
+
+    def article_done(self, oid, aid):
+        self._add('DELETE FROM articles WHERE oid = ? AND aid = ?', (oid, aid))
+
+    # 다시 시작할 때 조회
+    def done_dates(self):
+        self.flush()
+        return set(self.conn.execute('SELECT oid, date FROM dates').fetchall())
+
+    def unfinished_pages(self, oid, date):
+        """
+        요청은 했지만 처리가 끝나지 않은 목록 페이지
+        :return: [(페이지, meta), ...], 이 날짜를 시작한 적이 없으면 빈 리스트
+        """
+        self.flush()
+        rows = self.conn.execute('SELECT page, meta FROM list_pages WHERE oid = ? AND date = ? AND done = 0 '
+                                 'ORDER BY page', (oid, date)).fetchall()
+        return [(page, json.loads(meta)) for page, meta in rows]
+
+    def started(self, oid, date):
+        self.flush()
+        return self.conn.execute('SELECT 1 FROM list_pages WHERE oid = ? AND date = ? LIMIT 1',
+                                 (oid, date)).fetchone() is not None
+
+    def pending_articles(self):
+        self.flush()
+        return self.conn.execute('SELECT oid, aid, url FROM articles').fetchall()
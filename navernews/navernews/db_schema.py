@@ -0,0 +1,150 @@
+"""
+뉴스 테이블 생성 관련 함수
+기본(NEWS_TABLE_LAYOUT = 'per_outlet')은 언론사 코드별로 news.<언론사 코드> 테이블을 사용한다.
+NEWS_TABLE_LAYOUT = 'articles'이면 모든 언론사의 기사를 news_date로 파티션을 나눈 news.articles 테이블 하나에 저장한다.
+기존 언론사별 테이블은 python -m navernews.articles migrate로 옮긴다. (navernews/articles.py)
+"""
+import datetime
+
+import pymysql
+
+from navernews.info import naver_news_code
+
+TABLE_LAYOUTS = ('per_outlet', 'articles')
+ARTICLES_TABLE = 'articles'
+
+# articles 테이블의 news_date는 파티션 키이므로 NULL일 수 없다. 날짜를 읽지 못한 기사는 이 날짜로 저장한다. (p_unknown 파티션)
+UNKNOWN_DATE = datetime.datetime(1970, 1, 1)
+
+# 거의 같은 기사(near_dup.py)의 원본 '언론사 코드/aid', 이 컬럼이 생기기 전에 만든 테이블에는 나중에 추가한다.
+DUPLICATE_COLUMN = "`news_duplicate_of` VARCHAR(40) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci'"
+
+
+def prepare_news_table(db_connect, news_category):
+    '''
+    news.<언론사 코드> 테이블이 있는지 확인하고, 없으면 생성한다.
+    :param db_connect: pymysql 연결
+    :param news_category: 언론사 코드
+    :return: 테이블을 새로 만들었으면 True
+    '''
+    created = False
+    with db_connect.cursor(pymysql.cursors.DictCursor) as cursor:
+        print("데이터베이스에 테이블이 있는지 확인합니다.")
+        sql = f"SELECT EXISTS(SELECT 1 FROM Information_schema.tables " \
+              "WHERE table_schema = 'news' AND TABLE_NAME = %s) AS flag"
+
+        try:
+            cursor.execute(sql, (news_category))
+            result = cursor.fetchall()
+
+            if result[0]['flag'] == 0:
+                print(f"[{naver_news_code[news_category]}]의 {news_category} 테이블이 없습니다. 생성합니다.")
+                sql = f'''
+                        CREATE TABLE if not exists news.`{news_category}` (
+                            `inx` INT(11) NOT NULL AUTO_INCREMENT,
+                            `news_id` VARCHAR(255) NOT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_title` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_content` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_author` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_date` TIMESTAMP NULL DEFAULT NULL,
+                            `news_category` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_original_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_site` VARCHAR(30) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            `news_naver_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                            {DUPLICATE_COLUMN},
+                            PRIMARY KEY (`inx`),
+                            UNIQUE INDEX `inx` (`inx`),
+                            UNIQUE INDEX `naver_news_id_uindex` (`news_id`)
+                        )
+                        COLLATE='utf8mb4_unicode_ci'
+                        ENGINE=InnoDB
+                        '''
+                cursor.execute(sql)
+                created = True
+
+            else:
+                print(f"[{naver_news_code[news_category]}]의 {news_category} 테이블이 이미 있습니다.")
+                ensure_duplicate_column(db_connect, news_category)
+                print(f"데이터를 {news_category} 테이블에 저장합니다.")
+
+        except pymysql.err.InternalError:
+            pass
+        except pymysql.err.IntegrityError:
+            pass
+
+    return created
+
+
+def ensure_duplicate_column(db_connect, table):
+    '''
+    news_duplicate_of 컬럼이 없는 예전 테이블이면 컬럼을 추가한다.
+    :return: 컬럼을 추가했으면 True
+    '''
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.columns "
+                       "WHERE table_schema = 'news' AND table_name = %s AND column_name = 'news_duplicate_of'",
+                       (table,))
+        if cursor.fetchone()[0]:
+            return False
+        print(f"{table} 테이블에 news_duplicate_of 컬럼을 추가합니다.")
+        cursor.execute(f"ALTER TABLE news.`{table}` ADD COLUMN {DUPLICATE_COLUMN}")
+    return True
+
+
+def partition_clauses(from_year, to_year):
+    '''
+    연도별 RANGE COLUMNS 파티션 정의, 날짜를 읽지 못한 기사(UNKNOWN_DATE)와 to_year 이후 기사는 따로 모인다.
+    '''
+    partitions = [f"PARTITION p_unknown VALUES LESS THAN ('{UNKNOWN_DATE.year + 1}-01-01')"]
+    partitions += [f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')" for year in range(from_year, to_year + 1)]
+    partitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    return partitions
+
+
+def prepare_articles_table(db_connect, from_year=1990, to_year=None):
+    '''
+    news.articles 테이블이 없으면 생성한다.
+    MySQL은 파티션 키(news_date)가 모든 유니크 키에 들어가야 하므로 기본 키는 (media_code, news_id, news_date)이다.
+    기사의 news_date는 바뀌지 않으므로 다시 크롤링한 기사는 같은 키로 중복 처리된다.
+    날짜를 읽지 못한 기사(UNKNOWN_DATE)만은 키가 달라지므로, 저장할 때(pipelines.resolve_undated)와
+    옮길 때(articles.drop_undated_duplicates) 날짜가 있는 행을 남기고 UNKNOWN_DATE 행을 지운다.
+    :param from_year: 첫 연도 파티션, 그 이전 기사는 p{from_year}에 들어간다.
+    :param to_year: 마지막 연도 파티션 (기본 올해 + 1), 이후 기사는 p_future에 들어가므로 python -m navernews.articles partitions로 늘린다.
+    :return: 테이블을 새로 만들었으면 True
+    '''
+    to_year = to_year or datetime.date.today().year + 1
+    with db_connect.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'news' AND table_name = %s",
+                       (ARTICLES_TABLE,))
+        if cursor.fetchone()[0]:
+            ensure_duplicate_column(db_connect, ARTICLES_TABLE)
+            return False
+
+        print(f"{ARTICLES_TABLE} 테이블이 없습니다. {from_year} ~ {to_year}년 파티션으로 생성합니다.")
+        partitions = ',\n    '.join(partition_clauses(from_year, to_year))
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS news.`{ARTICLES_TABLE}` (
+                `inx` BIGINT NOT NULL AUTO_INCREMENT,
+                `media_code` CHAR(3) NOT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_id` VARCHAR(32) NOT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_title` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_content` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_author` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_date` DATETIME NOT NULL,
+                `news_category` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_original_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_site` VARCHAR(30) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                `news_naver_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
+                {DUPLICATE_COLUMN},
+                PRIMARY KEY (`media_code`, `news_id`, `news_date`),
+                INDEX `media_code_date` (`media_code`, `news_date`),
+                INDEX `media_code_inx` (`media_code`, `inx`),
+                INDEX `inx` (`inx`)
+            )
+            COLLATE='utf8mb4_unicode_ci'
+            ENGINE=InnoDB
+            PARTITION BY RANGE COLUMNS (`news_date`) (
+                {partitions}
+            )
+            ''')
+    return True
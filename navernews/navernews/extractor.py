@@ -0,0 +1,221 @@
+"""
+네이버 뉴스 기사 페이지 추출기
+parse_article에서 필드마다 response.xpath('//*[@id=...]/...')를 문서 처음부터 다시 찾던 것을,
+1. 미리 컴파일한 XPath로
+2. head의 meta 태그를 한번만 읽어서 레이아웃(일반 / TV연예 / 스포츠)을 판단하고
+3. 본문에 필요한 id 영역들을 id 테이블에서 한번에 모두 찾은 다음
+4. 각 필드는 찾아둔 영역 안에서만 짧은 상대경로로 가져오도록 바꾼 것이다.
+
+News, News_manual (body='text'), News_manual_mongo (body='html') 모두 이 추출기를 사용한다.
+"""
+import logging
+from urllib.parse import urlparse, parse_qs
+
+from lxml import etree
+from parsel import Selector
+from scrapy import signals
+
+from navernews.tools import clean_element, parse_naver_time, BodyNormalizer, BOILERPLATE_PATTERNS
+
+logger = logging.getLogger(__name__)
+
+# 레이아웃 이름 (통계 키 등에 사용)
+GENERAL = 'general'
+ENTERTAIN = 'entertain'
+SPORTS = 'sports'
+
+# 필요한 영역을 한번에 모두 찾는다.
+# id()는 파서가 만들어둔 id 테이블에서 찾기 때문에 //*[@id=...]처럼 문서 전체를 훑지 않는다.
+CONTAINERS = etree.XPath('id("main_content content articleBody articleBodyContents articeBody newsEndContents")')
+HEAD_META = etree.XPath('/html/head/meta')
+
+# 일반기사 (main_content, articleBody, articleBodyContents 기준)
+GENERAL_INFO = etree.XPath('div[@class="article_header"]/div[@class="article_info"]/div')
+GENERAL_DATE = etree.XPath('span[@class="t11"][1]/text()')
+GENERAL_URL = etree.XPath('a[1]/@href')
+GENERAL_CATEGORY = etree.XPath('div[@class="guide_categorization"]/a/em/text()')
+
+# 연예기사 (content, articeBody 기준)
+ENTERTAIN_INFO = etree.XPath('div[@class="end_ct"]/div/div[@class="article_info"]')
+ENTERTAIN_DATE = etree.XPath('span[@class="author"]/em/text()')
+ENTERTAIN_URL = etree.XPath('a/@href')
+
+# 스포츠기사 (content, newsEndContents 기준)
+SPORTS_INFO = etree.XPath('div/div[@class="content"]/div/div[@class="news_headline"]/div[@class="info"]')
+SPORTS_DATE = etree.XPath('span[1]/text()')
+SPORTS_URL = etree.XPath('a/@href')
+
+# 본문 영역 안에서 텍스트를 가져오는 순서 (앞에서 빈 값이면 다음 경로를 사용)
+BODY_TEXT = {
+    ENTERTAIN: (etree.XPath('div/text()'), etree.XPath('text()')),
+    GENERAL: (etree.XPath('div/text()'), etree.XPath('text()'), etree.XPath('div/span/text()')),
+    SPORTS: (etree.XPath('div/text()'), etree.XPath('text()')),
+}
+BODY_ID = {ENTERTAIN: 'articeBody', GENERAL: 'articleBodyContents', SPORTS: 'newsEndContents'}
+
+
+def _first(results):
+    return str(results[0]) if results else None
+
+
+class WorkerStats(object):
+    """
+    작업 프로세스에는 크롤러 stats가 없으므로 추출기가 센 값(news/date/missing 등)을 모아두는 stats 대용품
+    pop_counts()로 꺼낸 값을 결과와 함께 돌려주면 받는 쪽에서 크롤러 stats에 더한다. (parse_pool.py, reparse.py)
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def inc_value(self, key, count=1, start=0):
+        self.counts[key] = self.counts.get(key, start) + count
+
+    def pop_counts(self):
+        counts, self.counts = self.counts, {}
+        return counts
+
+
+class ArticleExtractor(object):
+    """
+    :param body: 'text' - 본문 영역의 텍스트 노드를 이어붙인다. (News, News_manual)
+                 'html' - 본문 영역의 HTML을 clean_html과 같은 결과로 정리한다. (News_manual_mongo, tools.clean_element)
+    :param check_url: True이면 http(s)로 시작하지 않는 언론사 원본 URL은 ""로 저장한다.
+    :param normalizer: body='text'에서 본문 줄을 합치는 BodyNormalizer (tools.py)
+    :param stats: 기사 시간을 찾지 못했거나 읽지 못한 경우를 기록할 크롤러 stats (news/date/missing, news/date/unparsed)
+    """
+
+    def __init__(self, body='text', check_url=False, normalizer=None, stats=None):
+        self.body = body
+        self.check_url = check_url
+        self.normalizer = normalizer if normalizer is not None else BodyNormalizer()
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler, **kwargs):
+        # 스파이더의 from_crawler에서 settings.BODY_BOILERPLATE_PATTERNS와 stats를 반영해서 만든다.
+        patterns = crawler.settings.getlist('BODY_BOILERPLATE_PATTERNS', BOILERPLATE_PATTERNS)
+        extractor = cls(normalizer=BodyNormalizer(patterns), stats=crawler.stats, **kwargs)
+        # 스파이더를 만들 때는 아직 crawler.stats가 없으므로 스파이더가 열릴 때 다시 가져온다.
+        crawler.signals.connect(extractor.spider_opened, signal=signals.spider_opened)
+        return extractor
+
+    def spider_opened(self, spider):
+        self.stats = spider.crawler.stats
+
+    def extract_response(self, response):
+        # 스크래피가 이미 파싱해둔 트리를 그대로 사용한다.
+        return self.extract(response.url, response.selector.root)
+
+    def extract_html(self, url, html):
+        # 저장해둔 HTML에서 추출할 때 사용한다. 스크래피 응답과 같은 방식으로 파싱한다.
+        return self.extract(url, Selector(text=html).root)
+
+    def extract(self, url, root):
+        """
+        :param url: 기사의 네이버 뉴스 URL (oid, aid가 들어있는 URL)
+        :param root: lxml로 파싱된 문서
+        :return: (레이아웃, 아이템 필드 dict), 레이아웃은 GENERAL / ENTERTAIN / SPORTS 중 하나
+        """
+        meta = dict()
+        for tag in HEAD_META(root):
+            key = tag.get('property') or tag.get('name')
+            if key is not None and key not in meta:
+                meta[key] = tag.get('content')
+
+        containers = dict()
+        for element in CONTAINERS(root):
+            containers.setdefault(element.get('id'), element)
+
+        url_query = parse_qs(urlparse(url).query)
+        fields = {
+            # 네이버 뉴스에서의 고유의 뉴스기사 ID값 - 일반, 스포츠, 연예 모두 동일
+            'news_id': url_query['aid'][0],
+            'news_media_code': url_query['oid'][0],  # 뉴스 언론사 코드
+            'news_title': meta.get('og:title'),
+            'news_naver_url': url,
+            'news_author': "",
+        }
+
+        if meta.get('me:feed:serviceId') is not None:
+            layout = SPORTS
+            site_tmp = meta.get('og:article:author')
+            fields['news_site'] = site_tmp.replace("네이버 스포츠 | ", "") if site_tmp is not None else None
+            fields['news_category'] = "스포츠"
+            info = self._child(containers.get('content'), SPORTS_INFO)
+            fields['news_date'] = self._date(self._value(info, SPORTS_DATE), url)
+            fields['news_original_url'] = self._url(self._value(info, SPORTS_URL))
+
+        elif meta.get('twitter:site') == "네이버 TV연예":
+            layout = ENTERTAIN
+            fields['news_site'] = meta.get('twitter:creator')
+            fields['news_category'] = "TV연예"
+            info = self._child(containers.get('content'), ENTERTAIN_INFO)
+            fields['news_date'] = self._date(self._value(info, ENTERTAIN_DATE), url)
+            fields['news_original_url'] = self._url(self._value(info, ENTERTAIN_URL))
+
+        else:
+            layout = GENERAL
+            fields['news_site'] = meta.get('twitter:creator')
+            # 만약 카테고리가 속보인 경우 원본 기사에서 지정한 카테고리로 설정한다.
+            category = meta.get('me2:category2')
+            if category is None or category == "속보":
+                category = self._value(containers.get('articleBody'), GENERAL_CATEGORY)
+            fields['news_category'] = category
+            info = GENERAL_INFO(containers['main_content']) if 'main_content' in containers else []
+            fields['news_date'] = self._date(self._first_of(info, GENERAL_DATE), url)
+            fields['news_original_url'] = self._url(self._first_of(info, GENERAL_URL))
+
+        fields['news_content'] = self._content(containers.get(BODY_ID[layout]), layout)
+        return layout, fields
+
+    @staticmethod
+    def _child(element, path):
+        if element is None:
+            return None
+        found = path(element)
+        return found[0] if found else None
+
+    @staticmethod
+    def _value(element, path):
+        if element is None:
+            return None
+        return _first(path(element))
+
+    @staticmethod
+    def _first_of(elements, path):
+        # 여러 영역 중 처음으로 값이 나오는 것 (response.xpath(...).extract_first()와 같은 동작)
+        for element in elements:
+            found = path(element)
+            if found:
+                return str(found[0])
+        return None
+
+    def _date(self, text, url):
+        # 시간을 읽지 못하면 문자열을 그대로 저장하지 않고 None으로 저장하고 stats에 기록한다.
+        date = parse_naver_time(text)
+        if date is None:
+            key = 'news/date/missing' if text is None else 'news/date/unparsed'
+            if self.stats is not None:
+                self.stats.inc_value(key)
+            logger.warning(f"기사 시간을 읽을 수 없습니다. ({key}) : {text!r} [{url}]")
+        return date
+
+    def _url(self, url):
+        if not self.check_url:
+            return url
+        if url is not None and ('http://' in url or 'https://' in url):
+            return url
+        return ""
+
+    def _content(self, element, layout):
+        if self.body == 'html':
+            return clean_element(element)
+
+        join_content = ""
+        if element is None:
+            return join_content
+        for path in BODY_TEXT[layout]:
+            join_content = self.normalizer(path(element))
+            if join_content != "":
+                break
+        return join_content
@@ -0,0 +1,137 @@
+"""
+다른 팀에 넘겨줄 압축 JSON Lines 파일 (아이템 파이프라인)
+JsonItemExporter는 파일 전체가 JSON 배열 하나라서 닫기 전에는 읽을 수 없고, 크롤링이 길어지면 파일 하나가 끝없이 커진다.
+이 파이프라인은 아이템을 한 줄씩 gzip / zstd 스트림으로 압축하면서 쓰고, 파일 크기나 시간(매 정시)에 따라 다음 파일로 넘어간다.
+아이템은 바로 압축기로 넘어가므로 크롤링 길이와 상관없이 메모리 사용량이 일정하다.
+
+파일 (<JSONL_DIR>/navernews-<YYYYmmdd-HH>-<pid>-<번호>.jl.gz 또는 .jl.zst)
+    - 쓰는 중에는 .tmp 이름으로 두고, 다 쓰면 이름을 바꾸므로 .jl.gz / .jl.zst 파일은 항상 완성된 파일이다.
+    - 시간은 파일을 연 시각(한 시간 단위)이고, 정시가 지나면 다음 아이템부터 새 파일에 쓴다.
+    - 비정상 종료로 남은 .tmp 파일도 압축 프레임 단위까지는 읽을 수 있다. (zcat, zstdcat)
+
+    ITEM_PIPELINES = {'navernews.feed.JsonLinesFeedPipeline': 400}
+"""
+import datetime
+import gzip
+import os
+import time
+
+from scrapy.exceptions import NotConfigured
+from scrapy.exporters import JsonLinesItemExporter
+
+EXTENSIONS = {'gzip': '.jl.gz', 'zstd': '.jl.zst', 'none': '.jl'}
+
+
+class NewsJsonLinesExporter(JsonLinesItemExporter):
+    """
+    news_date 같은 datetime을 isoformat으로 문자열로 바꾸는 JsonLinesItemExporter
+    ScrapyJSONEncoder는 datetime마다 strftime을 호출하고 시간대를 버리는데, isoformat은 3배 정도 빠르고
+    시간대도 남긴다. ('2020-03-24 15:05:00+09:00') 한글은 \\uXXXX로 바꾸지 않고 UTF-8 그대로 쓴다.
+    """
+
+    def __init__(self, file, **kwargs):
+        kwargs.setdefault('encoding', 'utf-8')
+        super().__init__(file, **kwargs)
+
+    def serialize_field(self, field, name, value):
+        if isinstance(value, datetime.datetime):
+            return value.isoformat(' ', 'seconds')
+        return super().serialize_field(field, name, value)
+
+
+class JsonLinesFeedPipeline(object):
+    """
+    settings
+        JSONL_DIR             : 저장 폴더 (기본 feed)
+        JSONL_COMPRESSION     : gzip, zstd, none (기본 gzip, zstd는 zstandard 패키지 필요)
+        JSONL_COMPRESS_LEVEL  : 압축 레벨 (기본 gzip 6, zstd 3)
+        JSONL_MAX_FILE_SIZE   : 압축 후 크기가 이만큼(바이트) 넘으면 다음 파일로 넘어간다. 0이면 크기로 나누지 않는다. (기본 256MB)
+                                압축기 안에 쌓여 있는 만큼(수십 KB) 넘을 수 있다.
+        JSONL_ROTATE_HOURLY   : 매 정시에 다음 파일로 넘어갈지 (기본 True)
+    """
+
+    def __init__(self, stats, directory='feed', compression='gzip', level=None, max_file_size=256 * 1024 ** 2,
+                 rotate_hourly=True):
+        if compression not in EXTENSIONS:
+            raise NotConfigured(f'JSONL_COMPRESSION은 {", ".join(EXTENSIONS)} 중 하나여야 합니다. ({compression})')
+        if compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise NotConfigured('zstd로 압축하려면 zstandard 패키지가 필요합니다. (pip install zstandard)')
+            self.compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        self.stats = stats
+        self.directory = directory
+        self.compression = compression
+        self.level = 6 if level is None else level
+        self.max_file_size = max_file_size
+        self.rotate_hourly = rotate_hourly
+        self.file_no = 0
+        self.raw = None  # 실제 파일 (압축된 바이트 수는 raw.tell())
+        self.stream = None  # 압축 스트림
+        self.exporter = None
+        self.paths = None  # (임시 경로, 경로)
+        self.rotate_at = None  # 다음 정시 (time.time())
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        level = settings.get('JSONL_COMPRESS_LEVEL')
+        return cls(crawler.stats,
+                   directory=settings.get('JSONL_DIR', 'feed'),
+                   compression=settings.get('JSONL_COMPRESSION', 'gzip'),
+                   level=None if level is None else int(level),
+                   max_file_size=settings.getint('JSONL_MAX_FILE_SIZE', 256 * 1024 ** 2),
+                   rotate_hourly=settings.getbool('JSONL_ROTATE_HOURLY', True))
+
+    def open_spider(self, spider):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def close_spider(self, spider):
+        self.close_file()
+        spider.logger.info(f'JSON Lines 저장 완료 : {self.stats.get_value("jsonl/items", 0)}개, '
+                           f'{self.stats.get_value("jsonl/files", 0)}개 파일, '
+                           f'{self.stats.get_value("jsonl/bytes", 0)} bytes')
+
+    def process_item(self, item, spider):
+        if self.exporter is not None and (
+                (self.rotate_at is not None and time.time() >= self.rotate_at)
+                or (self.max_file_size and self.raw.tell() >= self.max_file_size)):
+            self.close_file()
+        if self.exporter is None:
+            self.open_file()
+        self.exporter.export_item(item)
+        self.stats.inc_value('jsonl/items')
+        return item
+
+    def open_file(self):
+        now = datetime.datetime.now()
+        if self.rotate_hourly:
+            hour = now.replace(minute=0, second=0, microsecond=0)
+            self.rotate_at = (hour + datetime.timedelta(hours=1)).timestamp()
+        self.file_no += 1
+        path = os.path.join(self.directory, f'navernews-{now:%Y%m%d-%H}-{os.getpid()}-{self.file_no:04d}'
+                                            f'{EXTENSIONS[self.compression]}')
+        self.paths = (f'{path}.tmp', path)
+        self.raw = open(self.paths[0], 'wb')
+        if self.compression == 'gzip':
+            self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, compresslevel=self.level)
+        elif self.compression == 'zstd':
+            self.stream = self.compressor.stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = self.raw
+        self.exporter = NewsJsonLinesExporter(self.stream)
+        self.exporter.start_exporting()
+
+    def close_file(self):
+        if self.exporter is None:
+            return
+        self.exporter.finish_exporting()
+        if self.stream is not self.raw:
+            self.stream.close()  # 압축 스트림의 끝을 쓴다. (raw 파일은 닫지 않는다.)
+        self.raw.close()
+        tmp_path, path = self.paths
+        os.replace(tmp_path, path)
+        self.stats.inc_value('jsonl/files')
+        self.stats.inc_value('jsonl/bytes', os.path.getsize(path))
+        self.exporter = self.stream = self.raw = self.paths = None
@@ -0,0 +1,60 @@
+"""
+언론사별로 지금까지 저장한 가장 최신 기사(news_id, news_date)를 기록하는 파일
+증분 크롤링(incremental)에서 어디까지 크롤링하면 되는지 확인하는 용도로 사용한다.
+
+{"001": {"news_id": "0011234567", "news_date": "2020-03-24 15:05"}, ...}
+"""
+import datetime
+import json
+import os
+
+
+class HighWaterMark(object):
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = dict()  # 이번 실행을 시작할 때의 기록, 크롤링을 어디서 멈출지는 이 기록으로 판단한다.
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.previous = json.load(f)
+        self.marks = dict(self.previous)  # 이번 실행에서 갱신되는 기록
+        self.held = set()  # 저장하지 못한 기사가 있어서 기록을 갱신하지 않을 언론사
+
+    def news_id(self, oid):
+        # 지난번까지 저장된 가장 큰 aid, 기록이 없으면 None
+        mark = self.previous.get(oid)
+        return int(mark['news_id']) if mark else None
+
+    def date(self, oid):
+        # 지난번까지 저장된 가장 최신 기사의 날짜(20200324 형식), 기록이 없으면 None
+        mark = self.previous.get(oid)
+        if not mark or not mark.get('news_date'):
+            return None
+        return mark['news_date'][:10].replace('-', '')
+
+    def update(self, oid, news_id, news_date):
+        mark = self.marks.get(oid)
+        if mark and int(news_id) <= int(mark['news_id']):
+            return
+        if isinstance(news_date, datetime.datetime):
+            news_date = news_date.strftime('%Y-%m-%d %H:%M')
+        else:
+            # 날짜를 알 수 없으면 이전 기록의 날짜를 유지한다.
+            news_date = self.marks.get(oid, {}).get('news_date')
+        self.marks[oid] = {'news_id': str(news_id), 'news_date': news_date}
+
+    def hold(self, oid):
+        # 이번 실행에서 저장하지 못한 기사가 있으면, 그보다 최신 기사가 저장되었더라도 다음 실행에서 건너뛰지 않도록
+        # 그 언론사는 이전 기록을 그대로 저장한다.
+        self.held.add(oid)
+
+    def save(self):
+        marks = {oid: mark for oid, mark in self.marks.items() if oid not in self.held}
+        marks.update((oid, self.previous[oid]) for oid in self.held if oid in self.previous)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(marks, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,216 @@
+"""
+네이버 뉴스용 HTTP 캐시 저장소 (HTTPCACHE_STORAGE)
+스크래피 기본 FilesystemCacheStorage는 요청마다 폴더를 만들어서 기사 수백만 개를 저장하기 어렵기 때문에,
+SQLite 파일 하나에 zstd로 압축해서 저장한다.
+
+키
+    기사 페이지 (read.nhn)  : ('article', '<oid>/<aid>')
+    목록 페이지 (list.nhn)  : ('list', '<oid>/<date>/<page>'), 저장할 때 오늘(또는 미래) 날짜이면 'list_today'
+                              date가 없는 목록 페이지(News 스파이더의 시작 URL 등)는 오늘 목록이므로 오늘 날짜로 본다.
+    그 외                   : ('other', 요청 fingerprint)
+기사 키는 oid/aid만 보므로, read.nhn의 리다이렉트(3xx)를 기사 키로 저장하면 같은 oid/aid를 가진 이동할 주소(스포츠/연예 기사)의
+요청에도 그 리다이렉트가 돌아와서 REDIRECT_MAX_TIMES까지 반복된다. 그래서 기사 키로는 리다이렉트 응답을 저장하지 않고,
+리다이렉트를 따라가서 받은 기사 페이지만 저장한다. (다음 실행에서는 read.nhn 요청에도 그 기사 페이지가 돌아간다.)
+본문은 내용의 sha1으로 따로 저장하므로, 마지막 페이지를 넘는 목록 페이지 요청처럼 같은 내용이 여러 번 와도 한번만 저장된다.
+
+만료 시간(초, 0이면 만료되지 않음)은 종류별로 NAVER_HTTPCACHE_EXPIRATION에서 설정한다.
+오늘 날짜의 목록 페이지는 기사가 계속 추가되므로 짧게, 지난 날짜의 목록 페이지와 기사는 만료되지 않게 두는 것이 기본값이다.
+
+    HTTPCACHE_ENABLED = True
+    HTTPCACHE_STORAGE = 'navernews.httpcache.NaverCacheStorage'
+
+상태 확인 / 만료된 페이지 정리
+    python -m navernews.httpcache httpcache/navernews.sqlite3 status
+    python -m navernews.httpcache httpcache/navernews.sqlite3 prune
+
+저장된 기사 페이지를 요청 없이 다시 파싱하는 것은 reparse.py를 사용한다.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlparse, parse_qs
+
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+from navernews.tools import KST
+
+DEFAULT_EXPIRATION = {'article': 0, 'list': 0, 'list_today': 600, 'other': 0}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS pages (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status INTEGER NOT NULL,
+        headers TEXT NOT NULL,
+        digest BLOB NOT NULL,
+        stored REAL NOT NULL,
+        PRIMARY KEY (kind, key));
+    CREATE TABLE IF NOT EXISTS bodies (
+        digest BLOB PRIMARY KEY,
+        body BLOB NOT NULL);
+'''
+
+
+def cache_key(url, today=None):
+    '''
+    요청 URL로 캐시 키를 만든다.
+    :param today: 오늘 날짜(20200324 형식), None이면 현재 한국 날짜
+    :return: (종류, 키), 네이버 기사/목록 페이지가 아니면 None
+    '''
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    if 'aid' in query and 'oid' in query:
+        return 'article', f"{query['oid'][0]}/{query['aid'][0]}"
+    if parsed.path.endswith('list.nhn') and 'oid' in query:
+        if today is None:
+            today = datetime.datetime.now(KST).strftime('%Y%m%d')
+        date = query.get('date', [today])[0]
+        kind = 'list_today' if date >= today else 'list'
+        return kind, f"{query['oid'][0]}/{date}/{query.get('page', ['1'])[0]}"
+    return None
+
+
+class NaverCacheStorage(object):
+    """
+    settings
+        NAVER_HTTPCACHE_FILE        : 캐시 파일 경로, 기본값 <HTTPCACHE_DIR>/navernews.sqlite3
+        NAVER_HTTPCACHE_EXPIRATION  : 종류별 만료 시간(초) dict, DEFAULT_EXPIRATION에 덮어쓴다.
+        NAVER_HTTPCACHE_ZSTD_LEVEL  : zstd 압축 레벨 (기본 3)
+        NAVER_HTTPCACHE_COMMIT_OPS  : 몇 번 저장할 때마다 commit 할지 (기본 200, 종료할 때도 commit 한다)
+    """
+
+    def __init__(self, settings):
+        try:
+            import zstandard
+        except ImportError:
+            raise NotConfigured('NaverCacheStorage를 사용하려면 zstandard 패키지가 필요합니다. (pip install zstandard)')
+        self.path = settings.get('NAVER_HTTPCACHE_FILE') or os.path.join(
+            data_path(settings['HTTPCACHE_DIR'], createdir=True), 'navernews.sqlite3')
+        self.expiration = dict(DEFAULT_EXPIRATION, **settings.getdict('NAVER_HTTPCACHE_EXPIRATION'))
+        self.compressor = zstandard.ZstdCompressor(level=settings.getint('NAVER_HTTPCACHE_ZSTD_LEVEL', 3))
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.commit_ops = settings.getint('NAVER_HTTPCACHE_COMMIT_OPS', 200)
+        self.conn = None
+        self.pending = 0  # commit 하지 않은 저장 수
+        self._fingerprinter = None
+
+    def open_spider(self, spider):
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        spider.logger.info(f'HTTP 캐시 파일 [{self.path}] 을 사용합니다.')
+
+    def close_spider(self, spider):
+        self.conn.commit()
+        self.conn.close()
+
+    def _key(self, request):
+        key = cache_key(request.url)
+        if key is None:
+            key = ('other', self._fingerprinter.fingerprint(request).hex())
+        return key
+
+    def retrieve_response(self, spider, request):
+        kind, key = self._key(request)
+        row = self.conn.execute('SELECT pages.url, status, headers, stored, body FROM pages '
+                                'JOIN bodies ON bodies.digest = pages.digest '
+                                'WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+        if row is None and kind == 'list':
+            # 오늘 날짜였을 때 저장된 목록 페이지 (만료되지 않았으면 그대로 사용)
+            kind = 'list_today'
+            row = self.conn.execute('SELECT pages.url, status, headers, stored, body FROM pages '
+                                    'JOIN bodies ON bodies.digest = pages.digest '
+                                    'WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+        if row is None:
+            return None
+        url, status, headers, stored, body = row
+        expiration = self.expiration.get(kind, 0)
+        if 0 < expiration < time.time() - stored:
+            return None
+
+        headers = Headers({name: values for name, values in json.loads(headers).items()})
+        body = self.decompressor.decompress(body)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        kind, key = self._key(request)
+        if kind == 'article' and 300 <= response.status < 400:
+            return
+        digest = hashlib.sha1(response.body).digest()
+        headers = json.dumps({name.decode('latin1'): [value.decode('latin1') for value in values]
+                              for name, values in response.headers.items()})
+        if self.conn.execute('SELECT 1 FROM bodies WHERE digest = ?', (digest,)).fetchone() is None:
+            self.conn.execute('INSERT INTO bodies (digest, body) VALUES (?, ?)',
+                              (digest, self.compressor.compress(response.body)))
+        if kind == 'list':
+            # 지난 날짜가 된 목록 페이지를 다시 받은 경우, 오늘 날짜일 때 저장된 것은 지운다.
+            self.conn.execute("DELETE FROM pages WHERE kind = 'list_today' AND key = ?", (key,))
+        self.conn.execute('INSERT OR REPLACE INTO pages (kind, key, url, status, headers, digest, stored) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (kind, key, response.url, response.status, headers, digest, time.time()))
+        self.pending += 1
+        if self.pending >= self.commit_ops:
+            self.conn.commit()
+            self.pending = 0
+
+
+def status(conn):
+    pages = conn.execute('SELECT kind, COUNT(*) FROM pages GROUP BY kind').fetchall()
+    bodies, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM bodies').fetchone()
+    return {'pages': dict(pages), 'bodies': bodies, 'compressed_bytes': size}
+
+
+def iter_articles(conn, oids=None, batch_size=500):
+    '''
+    저장된 기사 페이지를 (url, headers json, zstd로 압축된 본문) 으로 하나씩 돌려준다.
+    본문은 압축을 풀지 않은 그대로이므로 받는 쪽(reparse.py의 작업 프로세스)에서 푼다.
+    :param oids: 언론사 코드 목록, None이면 전체
+    '''
+    sql = ('SELECT pages.url, headers, body FROM pages JOIN bodies ON bodies.digest = pages.digest '
+           "WHERE kind = 'article' AND status = 200")
+    if oids:
+        sql += ' AND (' + ' OR '.join(['key LIKE ?'] * len(oids)) + ')'
+    cursor = conn.execute(sql, [f'{oid}/%' for oid in oids or ()])
+    for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+        yield from rows
+
+
+def prune(conn, expiration=None):
+    '''
+    만료된 페이지와 어떤 페이지에서도 쓰지 않는 본문을 지운다.
+    :return: (지운 페이지 수, 지운 본문 수)
+    '''
+    expiration = dict(DEFAULT_EXPIRATION, **(expiration or {}))
+    now = time.time()
+    with conn:
+        pages = 0
+        for kind, seconds in expiration.items():
+            if seconds > 0:
+                pages += conn.execute('DELETE FROM pages WHERE kind = ? AND stored < ?', (kind, now - seconds)).rowcount
+        bodies = conn.execute('DELETE FROM bodies WHERE digest NOT IN (SELECT digest FROM pages)').rowcount
+    return pages, bodies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 뉴스 HTTP 캐시 파일 관리')
+    parser.add_argument('path', help='캐시 파일 경로')
+    parser.add_argument('command', choices=('status', 'prune'))
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.path)
+    if args.command == 'prune':
+        removed_pages, removed_bodies = prune(conn)
+        print(f'만료된 페이지 {removed_pages}개, 사용하지 않는 본문 {removed_bodies}개를 지웠습니다.')
+    print(status(conn))
+    conn.close()
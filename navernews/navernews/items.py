@@ -3,6 +3,11 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+import dataclasses
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
 import scrapy
 
 
@@ -10,3 +15,40 @@ class NavernewsItem(scrapy.Item):
     # define the fields for your item here like:
     # name = scrapy.Field()
     pass
+
+
+def slotted(cls):
+    """
+    dataclass에 __slots__를 붙인 클래스를 다시 만든다. (@dataclass(slots=True)와 같은 처리)
+    slots=True는 Python 3.10부터 있으므로, 서버의 Python 3.8에서도 동작하도록 직접 만든다.
+    필드 기본값은 dataclass가 만든 __init__에 들어있으므로 클래스 변수에서는 지운다.
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@slotted
+@dataclass
+class NewsItem(object):
+    """
+    기사 아이템
+    scrapy.Item은 필드 값을 인스턴스마다 dict에 담기 때문에, 파이프라인 버퍼에 수천 개씩 쌓이면 그만큼 메모리를 차지한다.
+    __slots__ dataclass는 dict 없이 필드 자리만 가지므로 아이템 하나가 작고 만드는 것도 빠르다.
+    (benchmarks/bench_items.py)
+    itemadapter가 dataclass를 지원하므로 파이프라인과 exporter에서는 ItemAdapter(item)['news_id']처럼 쓰고,
+    스파이더처럼 NewsItem인 줄 아는 곳에서는 item.news_id로 읽는다. 없는 필드를 넣으면 KeyError이다.
+    """
+    news_id: str
+    news_media_code: str  # 언론사 코드 (info.naver_news_code)
+    news_title: Optional[str] = None
+    news_content: Optional[str] = None
+    news_author: Optional[str] = None
+    news_date: Optional[datetime.datetime] = None  # tzinfo=KST, 읽을 수 없으면 None
+    news_category: Optional[str] = None
+    news_original_url: Optional[str] = None
+    news_site: Optional[str] = None
+    news_naver_url: Optional[str] = None
+    news_duplicate_of: Optional[str] = None  # 거의 같은 원본 기사 '언론사 코드/aid' (near_dup.py)
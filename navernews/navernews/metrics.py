@@ -0,0 +1,245 @@
+"""
+구간별 시간 측정과 Prometheus 형식 내보내기 (익스텐션)
+기사마다 출력하던 print 대신 NAVER_PROGRESS_INTERVAL초마다 진행 상황을 한 줄로 출력하고,
+다운로드 / 파싱 / DB 저장 시간의 히스토그램과 언론사, 레이아웃(일반/연예/스포츠)별 아이템 수를 모은다.
+
+측정 항목
+    navernews_download_seconds{endpoint}      다운로드 시간 (request.meta['download_latency']), endpoint는 list / article / other
+    navernews_parse_seconds{layout}           기사 추출 시간 (스파이더가 response.meta['parse_time']에 기록)
+    navernews_db_seconds{backend}             파이프라인의 배치 저장 시간 (db_flushed 시그널)
+    navernews_db_rows_total{backend}          배치 저장한 행 수
+    navernews_items_total{oid, layout}        아이템 수
+    navernews_responses_total{endpoint, status}
+
+내보내기
+    NAVER_METRICS_FILE = 'metrics/navernews.prom'   # node_exporter textfile collector용 파일, 주기마다 원자적으로 바꿔쓴다.
+    NAVER_METRICS_PORT = 9410                       # http://127.0.0.1:9410/metrics
+"""
+import bisect
+import os
+import time
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import reactor, task
+from twisted.web import resource, server
+
+from navernews.extractor import GENERAL, ENTERTAIN, SPORTS
+from navernews.httpcache import cache_key
+from navernews.signals import db_flushed
+
+LAYOUT_NAMES = {GENERAL: '일반', ENTERTAIN: '연예', SPORTS: '스포츠'}
+
+DOWNLOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+DB_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram(object):
+    # Prometheus 히스토그램과 같은 고정 구간 히스토그램
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        # 구간의 상한으로 근사한다. (마지막 구간이면 가장 큰 상한)
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Family(object):
+    # 라벨 값별 히스토그램 모음
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.children = dict()
+
+    def observe(self, label_values, value):
+        histogram = self.children.get(label_values)
+        if histogram is None:
+            histogram = self.children[label_values] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def merged(self):
+        # 라벨을 모두 합친 히스토그램 (진행 상황 출력용)
+        total = Histogram(self.buckets)
+        for histogram in self.children.values():
+            total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+            total.count += histogram.count
+            total.sum += histogram.sum
+        return total
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, histogram in sorted(self.children.items()):
+            labels = ','.join(f'{name}="{value}"' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {histogram.count}')
+        return lines
+
+
+def render_counter(name, help_text, labels, values):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+    for label_values, value in sorted(values.items()):
+        label_text = ','.join(f'{label}="{value}"' for label, value in zip(labels, label_values))
+        lines.append(f'{name}{{{label_text}}} {value}')
+    return lines
+
+
+class MetricsResource(resource.Resource):
+    isLeaf = True
+
+    def __init__(self, metrics):
+        super().__init__()
+        self.metrics = metrics
+
+    def render_GET(self, request):
+        request.setHeader(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+        return self.metrics.render().encode('utf-8')
+
+
+class NaverMetrics(object):
+    """
+    settings
+        NAVER_METRICS_ENABLED     : False이면 사용하지 않음 (기본 True)
+        NAVER_PROGRESS_INTERVAL   : 진행 상황을 몇 초마다 출력할지, 0이면 출력하지 않음 (기본 10)
+        NAVER_METRICS_FILE        : Prometheus textfile 경로 (기본 없음)
+        NAVER_METRICS_PORT        : 측정값을 보여줄 로컬 HTTP 포트 (기본 없음)
+    """
+
+    def __init__(self, progress_interval=10.0, path=None, port=None):
+        self.progress_interval = progress_interval
+        self.path = path
+        self.port = port
+        self.download = Family('navernews_download_seconds', '다운로드 시간', ('endpoint',), DOWNLOAD_BUCKETS)
+        self.parse = Family('navernews_parse_seconds', '기사 추출 시간', ('layout',), PARSE_BUCKETS)
+        self.db = Family('navernews_db_seconds', '배치 저장 시간', ('backend',), DB_BUCKETS)
+        self.db_rows = dict()  # {(backend,): 행 수}
+        self.items = dict()  # {(oid, layout): 아이템 수}
+        self.responses = dict()  # {(endpoint, status): 응답 수}
+        self.started = None
+        self.last = (None, 0)  # 지난번 출력 (시각, 아이템 수)
+        self.task = None
+        self.listener = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('NAVER_METRICS_ENABLED', True):
+            raise NotConfigured
+        metrics = cls(progress_interval=settings.getfloat('NAVER_PROGRESS_INTERVAL', 10.0),
+                      path=settings.get('NAVER_METRICS_FILE'),
+                      port=settings.getint('NAVER_METRICS_PORT') or None)
+        crawler.signals.connect(metrics.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(metrics.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(metrics.response_received, signal=signals.response_received)
+        crawler.signals.connect(metrics.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(metrics.db_flushed, signal=db_flushed)
+        return metrics
+
+    def spider_opened(self, spider):
+        self.started = time.time()
+        self.last = (self.started, 0)
+        interval = self.progress_interval if self.progress_interval > 0 else 10.0
+        if self.progress_interval > 0 or self.path:
+            self.task = task.LoopingCall(self.tick)
+            self.task.start(interval, now=False)
+        if self.port:
+            self.listener = reactor.listenTCP(self.port, server.Site(MetricsResource(self)), interface='127.0.0.1')
+            spider.logger.info(f'측정값을 http://127.0.0.1:{self.port}/metrics 에서 볼 수 있습니다.')
+
+    def spider_closed(self, spider):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        if self.listener is not None:
+            self.listener.stopListening()
+        self.tick()
+
+    def response_received(self, response, request, spider):
+        if 'cached' in response.flags:
+            return
+        key = cache_key(request.url)
+        endpoint = 'other' if key is None else ('list' if key[0] == 'list_today' else key[0])
+        self.responses[(endpoint, response.status)] = self.responses.get((endpoint, response.status), 0) + 1
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            self.download.observe((endpoint,), latency)
+
+    def item_scraped(self, item, response, spider):
+        meta = response.meta if response is not None else {}
+        layout = meta.get('layout', 'unknown')
+        key = (ItemAdapter(item).get('news_media_code'), layout)
+        self.items[key] = self.items.get(key, 0) + 1
+        if 'parse_time' in meta:
+            self.parse.observe((layout,), meta['parse_time'])
+
+    def db_flushed(self, backend, rows, seconds):
+        self.db.observe((backend,), seconds)
+        self.db_rows[(backend,)] = self.db_rows.get((backend,), 0) + rows
+
+    def tick(self):
+        if self.progress_interval > 0:
+            print(self.progress_line())
+        if self.path:
+            self.write_textfile()
+
+    def progress_line(self):
+        now = time.time()
+        total = sum(self.items.values())
+        last_time, last_total = self.last
+        self.last = (now, total)
+        rate = (total - last_total) / (now - last_time) if now > last_time else 0.0
+        per_layout = dict()
+        for (_, layout), count in self.items.items():
+            per_layout[layout] = per_layout.get(layout, 0) + count
+        layouts = ' '.join(f'{LAYOUT_NAMES.get(layout, layout)} {count}' for layout, count in sorted(per_layout.items()))
+
+        def ms(histogram, q):
+            value = histogram.quantile(q)
+            return '-' if value is None else f'{value * 1000:g}ms'
+
+        download, parse, db = self.download.merged(), self.parse.merged(), self.db.merged()
+        return (f'[진행] 아이템 {total}개 ({rate:.1f} items/sec) | {layouts or "-"} | '
+                f'다운로드 p50 {ms(download, 0.5)} p95 {ms(download, 0.95)} | '
+                f'추출 p50 {ms(parse, 0.5)} | DB p50 {ms(db, 0.5)}')
+
+    def render(self):
+        lines = []
+        for family in (self.download, self.parse, self.db):
+            lines.extend(family.render())
+        lines.extend(render_counter('navernews_db_rows_total', '배치 저장한 행 수', ('backend',), self.db_rows))
+        lines.extend(render_counter('navernews_items_total', '아이템 수', ('oid', 'layout'), self.items))
+        lines.extend(render_counter('navernews_responses_total', '응답 수', ('endpoint', 'status'), self.responses))
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,307 @@
+"""
+언론사 사이의 거의 같은 기사(통신사 기사 전재) 찾기 (아이템 파이프라인)
+연합뉴스 / 뉴시스 / 뉴스1 기사를 여러 언론사가 바이라인 정도만 바꿔서 그대로 싣기 때문에 같은 본문을 수십 번 저장하게 된다.
+NearDuplicatePipeline은 news_content의 MinHash 서명을 구해서 영구 LSH 인덱스에서 비슷한(Jaccard 유사도가
+NEAR_DUP_THRESHOLD 이상인) 기사를 찾고, 있으면 먼저 저장된 기사(원본)를 가리키도록 표시하거나 본문을 비우거나 버린다.
+언론사, 날짜와 상관없이 찾는다.
+
+MinHash 서명 (one permutation hashing)
+    본문을 단어(\\w+) 3개씩 묶은 shingle로 나누고, shingle마다 64bit 해시(blake2b)를 한번만 구한다.
+    해시의 위 6bit로 64칸 중 한 칸을 정하고, 칸마다 아래 32bit의 최솟값을 남긴다. (빈 칸은 오른쪽 칸의 값을 빌린다.)
+    해시 함수 64개로 최솟값을 구하는 것과 같은 효과를 shingle당 해시 한번으로 얻는다.
+    두 서명에서 같은 칸의 비율이 두 shingle 집합의 Jaccard 유사도의 추정값이다.
+    (SimHash 64bit는 바이라인과 몇 단어만 달라도 5 ~ 10bit가 바뀌어서 통신사 전재 기사를 대부분 놓쳤다.)
+LSH 인덱스 (<NEAR_DUP_INDEX>, SQLite)
+    서명 앞 60칸을 5칸씩 12개 밴드로 나누고, 밴드마다 (밴드 번호, 5칸 값)의 해시를 버킷 키로 저장한다.
+    밴드 하나라도 같은 기사만 후보로 꺼내서 서명을 비교한다. 유사도 0.8이면 99%, 0.5면 32%가 후보가 되고,
+    관계없는 기사는 32bit 값 5개가 모두 같을 일이 없으므로 후보가 되지 않는다.
+    기사 수와 상관없이 조회는 인덱스 탐색 한번과 후보 몇 개 비교이다. (benchmarks/bench_near_dup.py)
+    원본 기사만 버킷에 넣고, 중복 기사는 docs 테이블에 원본 번호만 기록한다.
+    원본 기사는 저장 파이프라인이 저장한 것을 확인한 다음에 인덱스에 넣는다. (배치 저장 파이프라인이면 items_stored,
+    아니면 item_scraped 시그널) 저장되지 않은 기사를 원본으로 삼아 다른 기사의 본문을 비우는 일이 없도록 하기 위해서이다.
+    그래서 같은 배치 안에서 처음 나온 통신사 기사의 전재본들은 원본으로 저장된다.
+
+저장 공간 보고
+    stats의 near_dup/bytes_total, near_dup/bytes_duplicate와 종료 로그, 또는 인덱스 전체 기준으로
+    python -m navernews.near_dup near_dup.sqlite3 status
+
+    # settings.py의 ITEM_PIPELINES는 스파이더의 저장 파이프라인(300)과 합쳐진다. (NewsSpider.update_component_settings)
+    ITEM_PIPELINES = {'navernews.near_dup.NearDuplicatePipeline': 250}  # 저장 파이프라인보다 앞에 둔다.
+"""
+import argparse
+import hashlib
+import re
+import sqlite3
+from array import array
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import data_path
+
+from navernews.signals import items_stored
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS docs (
+        doc INTEGER PRIMARY KEY,
+        oid TEXT NOT NULL,
+        aid TEXT NOT NULL,
+        news_date TEXT,
+        signature BLOB NOT NULL,
+        length INTEGER NOT NULL,
+        duplicate_of INTEGER,
+        UNIQUE (oid, aid));
+    CREATE TABLE IF NOT EXISTS buckets (
+        bucket INTEGER NOT NULL,
+        doc INTEGER NOT NULL,
+        PRIMARY KEY (bucket, doc)) WITHOUT ROWID;
+'''
+
+MODES = ('tag', 'collapse', 'drop')
+WORD = re.compile(r'\w+')
+
+SLOTS = 64  # 서명 칸 수 (해시의 위 6bit)
+BANDS = 12
+ROWS = 5  # 밴드당 칸 수
+
+
+def signature(text, shingle_size=3):
+    '''
+    :return: 32bit 값 SLOTS개의 array('I'), shingle이 없으면 None
+    '''
+    words = WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        return None
+    slots = [None] * SLOTS
+    for i in range(len(words) - shingle_size + 1):
+        h = int.from_bytes(hashlib.blake2b(' '.join(words[i:i + shingle_size]).encode('utf-8'),
+                                           digest_size=8).digest(), 'little')
+        slot, value = h >> 58, h & 0xFFFFFFFF
+        if slots[slot] is None or value < slots[slot]:
+            slots[slot] = value
+
+    # 빈 칸은 오른쪽으로 가장 가까운 칸의 값을 쓴다. (같은 shingle 집합이면 같은 칸이 비므로 비교 결과는 바뀌지 않는다.)
+    filled = next(value for value in reversed(slots) if value is not None)
+    for slot in range(SLOTS - 1, -1, -1):
+        if slots[slot] is None:
+            slots[slot] = filled
+        else:
+            filled = slots[slot]
+    return array('I', slots)
+
+
+def similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / SLOTS
+
+
+def band_keys(sig):
+    keys = []
+    for band in range(BANDS):
+        data = bytes([band]) + sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True))
+    return keys
+
+
+class NearDupIndex(object):
+    # MinHash LSH 인덱스
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.pending = 0
+
+    def lookup(self, sig, threshold, oid=None, aid=None):
+        '''
+        :return: 가장 비슷한 원본 기사 (doc, oid, aid, 유사도), threshold 이상인 기사가 없으면 None
+        '''
+        keys = band_keys(sig)
+        rows = self.conn.execute(
+            f'SELECT d.doc, d.oid, d.aid, d.signature FROM docs d WHERE d.doc IN '
+            f'(SELECT doc FROM buckets WHERE bucket IN ({", ".join("?" * len(keys))}))', keys)
+        best = None
+        for doc, doc_oid, doc_aid, doc_sig in rows:
+            if (doc_oid, doc_aid) == (oid, aid):
+                continue
+            score = similarity(sig, array('I', doc_sig))
+            if score >= threshold and (best is None or score > best[3]):
+                best = (doc, doc_oid, doc_aid, score)
+        return best
+
+    def get(self, oid, aid):
+        '''
+        :return: 이미 넣은 기사면 (원본 oid, 원본 aid), 원본이면 (None, None), 처음 보는 기사면 None
+        '''
+        return self.conn.execute('SELECT o.oid, o.aid FROM docs d LEFT JOIN docs o ON o.doc = d.duplicate_of '
+                                 'WHERE d.oid = ? AND d.aid = ?', (oid, aid)).fetchone()
+
+    def add(self, oid, aid, news_date, sig, length, duplicate_of=None):
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO docs (oid, aid, news_date, signature, length, duplicate_of) VALUES (?, ?, ?, ?, ?, ?)',
+            (oid, aid, news_date, sig.tobytes(), length, duplicate_of))
+        if cursor.rowcount and duplicate_of is None:
+            self.conn.executemany('INSERT OR IGNORE INTO buckets (bucket, doc) VALUES (?, ?)',
+                                  [(key, cursor.lastrowid) for key in band_keys(sig)])
+        self.pending += 1
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def status(self):
+        docs, total, duplicates, duplicate_bytes = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(length), 0), COUNT(duplicate_of), '
+            'COALESCE(SUM(CASE WHEN duplicate_of IS NOT NULL THEN length END), 0) FROM docs').fetchone()
+        return {'docs': docs, 'duplicates': duplicates, 'bytes_total': total, 'bytes_duplicate': duplicate_bytes}
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+class NearDuplicatePipeline(object):
+    """
+    settings
+        NEAR_DUP_INDEX         : 인덱스 파일 경로 (기본 .scrapy/near_dup.sqlite3)
+        NEAR_DUP_THRESHOLD     : 같은 기사로 볼 최소 유사도 (기본 0.8)
+        NEAR_DUP_MODE          : 중복 기사 처리 방식 (기본 tag)
+                                 tag      - news_duplicate_of에 원본 '언론사 코드/aid'를 넣는다.
+                                 collapse - tag에 더해서 news_content를 비운다.
+                                 drop     - 아이템을 버린다.
+        NEAR_DUP_MIN_LENGTH    : 이보다 짧은 본문(글자 수)은 비교하지 않는다. 사진 설명 기사 등 (기본 200)
+        NEAR_DUP_COMMIT_EVERY  : 몇 개마다 인덱스를 커밋할지 (기본 1000)
+    news_duplicate_of는 MySQL / Parquet / MongoDB / JSON Lines 저장에 모두 들어가므로 collapse로 비운 본문은 원본 기사에서 찾는다.
+    원본 기사는 저장이 확인될 때까지 unconfirmed에 두고 비교 대상으로 쓰지 않는다.
+    """
+
+    def __init__(self, stats, path, threshold=0.8, mode='tag', min_length=200, commit_every=1000):
+        if mode not in MODES:
+            raise NotConfigured(f'NEAR_DUP_MODE는 {", ".join(MODES)} 중 하나여야 합니다. ({mode})')
+        self.stats = stats
+        self.path = path
+        self.threshold = threshold
+        self.mode = mode
+        self.min_length = min_length
+        self.commit_every = commit_every
+        self.index = None
+        self.unconfirmed = dict()  # 저장을 기다리는 원본 기사 {(oid, aid): (news_date, 서명, 길이)}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pipeline = cls(crawler.stats,
+                       path=settings.get('NEAR_DUP_INDEX') or data_path('near_dup.sqlite3', createdir=True),
+                       threshold=settings.getfloat('NEAR_DUP_THRESHOLD', 0.8),
+                       mode=settings.get('NEAR_DUP_MODE', 'tag'),
+                       min_length=settings.getint('NEAR_DUP_MIN_LENGTH', 200),
+                       commit_every=settings.getint('NEAR_DUP_COMMIT_EVERY', 1000))
+        # 아이템을 모아서 저장하는 파이프라인이면 item_scraped 시점에는 아직 저장되지 않았다.
+        if any(getattr(load_object(path), 'sends_items_stored', False)
+               for path in build_component_list(settings.getwithbase('ITEM_PIPELINES'))):
+            crawler.signals.connect(pipeline.items_stored, signal=items_stored)
+        else:
+            crawler.signals.connect(pipeline.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(pipeline.item_dropped, signal=signals.item_dropped)
+        return pipeline
+
+    def open_spider(self, spider):
+        self.index = NearDupIndex(self.path)
+
+    def close_spider(self, spider):
+        # 저장 파이프라인의 close_spider가 먼저 불려서 남은 배치의 items_stored를 받은 다음이다.
+        if self.unconfirmed:
+            self.stats.inc_value('near_dup/unconfirmed', len(self.unconfirmed))
+            self.unconfirmed.clear()
+        self.index.close()
+        total = self.stats.get_value('near_dup/bytes_total', 0)
+        duplicate = self.stats.get_value('near_dup/bytes_duplicate', 0)
+        spider.logger.info(f'거의 같은 기사 {self.stats.get_value("near_dup/duplicates", 0)}개 '
+                           f'/ {self.stats.get_value("near_dup/checked", 0)}개, '
+                           f'본문 {duplicate / 1024 ** 2:.1f}MB / {total / 1024 ** 2:.1f}MB '
+                           f'({duplicate / total if total else 0:.1%}) 중복')
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        content = adapter.get('news_content') or ''
+        if len(content) < self.min_length:
+            self.stats.inc_value('near_dup/skipped')
+            return item
+
+        oid, aid = adapter['news_media_code'], adapter['news_id']
+        length = len(content.encode('utf-8'))
+        self.stats.inc_value('near_dup/checked')
+        self.stats.inc_value('near_dup/bytes_total', length)
+
+        known = self.index.get(oid, aid)
+        if known is not None:
+            # 다시 크롤링한 기사는 처음 판단을 그대로 쓴다.
+            original = None if known[0] is None else known
+        else:
+            sig = signature(content)
+            if sig is None:
+                return item
+            match = self.index.lookup(sig, self.threshold, oid, aid)
+            news_date = adapter.get('news_date')
+            news_date = None if news_date is None else str(news_date)
+            if match is None:
+                # 원본 기사는 저장이 확인되면 인덱스에 넣는다. (confirm)
+                self.unconfirmed[(oid, aid)] = (news_date, sig, length)
+                return item
+            # 원본은 이미 저장된 기사이므로 중복 기사는 바로 기록한다.
+            self.add(oid, aid, news_date, sig, length, match[0])
+            original = match[1:3]
+
+        self.stats.inc_value('near_dup/duplicates')
+        self.stats.inc_value('near_dup/bytes_duplicate', length)
+        if original[0] != oid:
+            self.stats.inc_value('near_dup/cross_outlet')
+        if self.mode == 'drop':
+            raise DropItem(f'거의 같은 기사 : {oid}/{aid} -> {original[0]}/{original[1]}')
+        adapter['news_duplicate_of'] = f'{original[0]}/{original[1]}'
+        if self.mode == 'collapse':
+            adapter['news_content'] = ''
+        return item
+
+    def add(self, oid, aid, news_date, sig, length, duplicate_of=None):
+        self.index.add(oid, aid, news_date, sig, length, duplicate_of)
+        if self.index.pending >= self.commit_every:
+            self.index.commit()
+
+    def confirm(self, stored, failed=()):
+        for key in stored:
+            pending = self.unconfirmed.pop(key, None)
+            if pending is not None:
+                self.add(*key, *pending)
+        for key in failed:
+            self.unconfirmed.pop(key, None)
+
+    def items_stored(self, stored, failed):
+        self.confirm(stored, failed)
+
+    def item_scraped(self, item, response, spider):
+        adapter = ItemAdapter(item)
+        self.confirm([(adapter.get('news_media_code'), adapter.get('news_id'))])
+
+    def item_dropped(self, item, response, exception, spider):
+        # 뒤의 파이프라인에서 버린 원본 기사
+        adapter = ItemAdapter(item)
+        self.confirm([], [(adapter.get('news_media_code'), adapter.get('news_id'))])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='거의 같은 기사 인덱스 상태')
+    parser.add_argument('path', help='인덱스 파일 경로 (NEAR_DUP_INDEX)')
+    parser.add_argument('command', choices=('status',))
+    args = parser.parse_args()
+
+    index = NearDupIndex(args.path)
+    status = index.status()
+    index.close()
+    print(f"기사 {status['docs']}개 중 거의 같은 기사 {status['duplicates']}개")
+    print(f"본문 {status['bytes_total'] / 1024 ** 2:.1f}MB 중 {status['bytes_duplicate'] / 1024 ** 2:.1f}MB "
+          f"({status['bytes_duplicate'] / status['bytes_total'] if status['bytes_total'] else 0:.1%})를 "
+          f"원본만 저장하면 줄일 수 있습니다.")
@@ -0,0 +1,162 @@
+"""
+기사 추출을 작업 프로세스에서 하는 풀
+parse_article의 XPath, 본문 정리는 모두 리액터 스레드에서 실행되기 때문에, 추출이 몰리는 동안에는 다운로드도 멈춰서
+CONCURRENT_REQUESTS만큼 동시에 요청하지 못한다. NAVER_PARSE_WORKERS를 설정하면 응답의 URL과 본문만 작업 프로세스로 보내서
+ArticleExtractor로 추출하고, 결과는 Deferred로 돌려받아서 리액터는 그동안 다른 응답을 처리한다.
+
+    NAVER_PARSE_WORKERS = 4      # 작업 프로세스 수, 0이면 사용하지 않음 (기본값)
+    NAVER_PARSE_ORDERED = True   # 응답을 받은 순서대로 결과를 돌려줄지 (기본값 True)
+
+- 순서 : NAVER_PARSE_ORDERED이면 먼저 끝난 결과도 앞선 응답의 결과가 나올 때까지 기다렸다가 받은 순서대로 돌려준다.
+- stats : 작업 프로세스의 추출기가 센 값(news/date/missing, news/date/unparsed)은 결과와 함께 돌려받아서 크롤러 stats에 더한다.
+- 에러 : 추출 중 생긴 예외는 Deferred의 errback으로 넘어가서 스파이더 콜백의 에러와 똑같이 처리된다. (spider_exceptions stats)
+         작업 프로세스가 죽어서 풀을 쓸 수 없게 되면 에러를 남기고 그 뒤로는 리액터 스레드에서 직접 추출한다.
+
+응답 본문과 결과를 프로세스 사이에 주고받는 비용이 있으므로 남는 CPU 코어가 있을 때만 켠다.
+코어가 하나뿐이면 오히려 느려진다. (benchmarks/bench_parse_pool.py로 확인)
+"""
+import concurrent.futures
+import logging
+from concurrent.futures.process import BrokenProcessPool
+
+from scrapy import signals
+from scrapy.http import HtmlResponse
+from twisted.internet import defer, reactor
+from twisted.python.failure import Failure
+
+from navernews.extractor import ArticleExtractor, WorkerStats
+from navernews.tools import BodyNormalizer, BOILERPLATE_PATTERNS
+
+logger = logging.getLogger(__name__)
+
+# 작업 프로세스마다 한번만 만든다. (_init_worker)
+_extractor = None
+_stats = None
+
+
+def _init_worker(options, patterns):
+    global _extractor, _stats
+    _stats = WorkerStats()
+    _extractor = ArticleExtractor(normalizer=BodyNormalizer(patterns), stats=_stats, **options)
+
+
+def _extract(url, body, encoding):
+    '''
+    작업 프로세스에서 실행된다. 스파이더에서 판단한 인코딩을 그대로 사용한다.
+    :return: ((레이아웃, 아이템 필드 dict), 추출기 stats {키: 개수})
+    '''
+    return _extractor.extract_response(HtmlResponse(url=url, body=body, encoding=encoding)), _stats.pop_counts()
+
+
+class ParsePool(object):
+    """
+    :param extractor: 풀을 쓸 수 없게 됐을 때 직접 추출할 스파이더의 추출기
+    :param options: 작업 프로세스에서 만들 ArticleExtractor 옵션 (스파이더의 extractor_options)
+    """
+
+    def __init__(self, extractor, options, workers, ordered=True, patterns=BOILERPLATE_PATTERNS, stats=None):
+        self.extractor = extractor
+        self.ordered = ordered
+        self.stats = stats
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                               initargs=(dict(options), list(patterns)))
+        self.broken = False
+        self.submitted = 0  # 지금까지 받은 응답 수 (순서 번호)
+        self.released = 0  # 결과를 돌려준 응답 수
+        self.waiting = dict()  # {순서 번호: [Deferred, 끝난 Future 또는 None, (url, body, encoding)]}
+        self.pending = set()  # 작업 프로세스에 넘긴 뒤 아직 끝나지 않은 Future, 종료할 때 취소한다.
+
+    @classmethod
+    def from_crawler(cls, crawler, extractor, options):
+        # NAVER_PARSE_WORKERS가 0이면 None (리액터 스레드에서 추출)
+        settings = crawler.settings
+        workers = settings.getint('NAVER_PARSE_WORKERS', 0)
+        if workers <= 0:
+            return None
+        pool = cls(extractor, options, workers,
+                   ordered=settings.getbool('NAVER_PARSE_ORDERED', True),
+                   patterns=settings.getlist('BODY_BOILERPLATE_PATTERNS', BOILERPLATE_PATTERNS))
+        crawler.signals.connect(pool.spider_opened, signal=signals.spider_opened)
+        return pool
+
+    def spider_opened(self, spider):
+        self.stats = spider.crawler.stats
+
+    def extract(self, response):
+        '''
+        :return: (레이아웃, 아이템 필드 dict)로 끝나는 Deferred
+        '''
+        seq = self.submitted
+        self.submitted += 1
+        args = (response.url, response.body, response.encoding)
+        d = defer.Deferred()
+        self.waiting[seq] = [d, None, args]
+        self._inc('parse_pool/submitted')
+
+        future = None
+        if not self.broken:
+            try:
+                future = self.executor.submit(_extract, *args)
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._set_broken(e)
+        if future is None:
+            self._finished(seq, self._inline(*args))
+        else:
+            # Future는 풀의 관리 스레드에서 끝나므로 결과 처리는 리액터 스레드로 넘긴다.
+            self.pending.add(future)
+            future.add_done_callback(self.pending.discard)
+            future.add_done_callback(lambda f: reactor.callFromThread(self._finished, seq, f))
+        return d
+
+    def close(self):
+        # shutdown(cancel_futures=True)는 Python 3.9부터 있으므로 아직 시작하지 않은 작업을 직접 취소한다.
+        for future in list(self.pending):
+            future.cancel()
+        self.executor.shutdown(wait=True)
+
+    def _inc(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(key)
+
+    def _set_broken(self, error):
+        if not self.broken:
+            self.broken = True
+            logger.error(f'기사 추출 작업 프로세스를 사용할 수 없습니다. 이후로는 직접 추출합니다. ({error})')
+
+    def _inline(self, url, body, encoding):
+        # 리액터 스레드에서 직접 추출하고 결과를 끝난 Future로 만든다. 스파이더의 추출기는 크롤러 stats에 바로 센다.
+        future = concurrent.futures.Future()
+        try:
+            future.set_result((self.extractor.extract_response(HtmlResponse(url=url, body=body, encoding=encoding)), {}))
+        except Exception as e:
+            future.set_exception(e)
+        self._inc('parse_pool/inline')
+        return future
+
+    def _finished(self, seq, future):
+        if future.cancelled():
+            # 스파이더가 종료되면서 취소된 요청
+            return
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._set_broken(future.exception())
+            future = self._inline(*self.waiting[seq][2])
+        self.waiting[seq][1] = future
+        if not self.ordered:
+            self._release(seq)
+            return
+        while self.released in self.waiting and self.waiting[self.released][1] is not None:
+            self._release(self.released)
+            self.released += 1
+
+    def _release(self, seq):
+        d, future, _ = self.waiting.pop(seq)
+        error = future.exception()
+        if error is not None:
+            self._inc('parse_pool/errors')
+            d.errback(Failure(error))
+        else:
+            result, counts = future.result()
+            if self.stats is not None:
+                for key, count in counts.items():
+                    self.stats.inc_value(key, count)
+            d.callback(result)
@@ -8,8 +8,87 @@
 from itemadapter import ItemAdapter
 from navernews.db_auth import connection_db
 from navernews.db_mongo import connection_mongodb
+from navernews.db_schema import ARTICLES_TABLE, TABLE_LAYOUTS, UNKNOWN_DATE
 import pymysql, pymongo
-from scrapy.exporters import JsonItemExporter, CsvItemExporter
+import datetime
+import os
+import time
+from collections import OrderedDict
+from twisted.internet import task
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.log import failure_to_exc_info
+from scrapy.utils.misc import load_object
+from navernews.signals import db_flushed, items_stored
+from navernews.tools import KST
+
+
+NEWS_COLUMNS = ('news_id', 'news_title', 'news_content',
+                'news_author', 'news_date', 'news_category',
+                'news_original_url', 'news_site', 'news_naver_url',
+                'news_duplicate_of')
+ARTICLES_COLUMNS = ('media_code',) + NEWS_COLUMNS
+
+
+def table_layout(settings):
+    # NEWS_TABLE_LAYOUT : per_outlet(언론사별 테이블, 기본) 또는 articles(news.articles 테이블 하나, db_schema.py)
+    layout = settings.get('NEWS_TABLE_LAYOUT', 'per_outlet')
+    if layout not in TABLE_LAYOUTS:
+        raise NotConfigured(f'NEWS_TABLE_LAYOUT은 {", ".join(TABLE_LAYOUTS)} 중 하나여야 합니다. ({layout})')
+    return layout
+
+
+def news_row(adapter, layout='per_outlet'):
+    '''
+    :return: (저장할 테이블, 값 tuple), 값 순서는 언론사별 테이블이면 NEWS_COLUMNS, articles 테이블이면 ARTICLES_COLUMNS
+    '''
+    if layout == 'articles':
+        news_date = adapter.get('news_date') or UNKNOWN_DATE
+        return ARTICLES_TABLE, (adapter['news_media_code'],) + tuple(
+            news_date if col == 'news_date' else adapter.get(col) for col in NEWS_COLUMNS)
+    return adapter['news_media_code'], tuple(adapter.get(col) for col in NEWS_COLUMNS)
+
+
+def resolve_undated(cursor, buffered):
+    '''
+    articles 테이블은 파티션 키(news_date)가 모든 유니크 키에 들어가야 하므로 (media_code, news_id)만으로 중복을 막을 수 없다.
+    그래서 날짜를 읽지 못해 UNKNOWN_DATE로 저장된 기사가 나중에 날짜와 함께 저장되면 같은 기사가 두 행이 된다.
+    날짜가 있는 행을 저장하기 전에 같은 기사의 UNKNOWN_DATE 행을 지우고,
+    날짜가 없는 행은 같은 기사가 이미 날짜와 함께 저장되어 있으면 빼서 중복으로 처리한다. (저장과 같은 트랜잭션에서 실행한다.)
+    executemany는 INSERT / REPLACE만 묶어서 보내므로 배치마다 DELETE 한번, SELECT 한번으로 처리한다.
+    :param buffered: [(키, ARTICLES_COLUMNS 순서의 row), ...]
+    :return: 저장할 [(키, row), ...]
+    '''
+    date_at = ARTICLES_COLUMNS.index('news_date')
+    dated = {(row[0], row[1]) for _, row in buffered if row[date_at] != UNKNOWN_DATE}
+    # 같은 배치에 날짜가 있는 행이 있으면 날짜가 없는 행은 DB를 확인하지 않고 뺀다.
+    undated = {(row[0], row[1]) for _, row in buffered if row[date_at] == UNKNOWN_DATE} - dated
+    if dated:
+        cursor.execute(f"DELETE FROM news.`{ARTICLES_TABLE}` "
+                       f"WHERE news_date = %s AND (media_code, news_id) IN %s", (UNKNOWN_DATE, sorted(dated)))
+    stored = set()
+    if undated:
+        cursor.execute(f"SELECT media_code, news_id FROM news.`{ARTICLES_TABLE}` "
+                       f"WHERE news_date <> %s AND (media_code, news_id) IN %s", (UNKNOWN_DATE, sorted(undated)))
+        stored = {(media_code, news_id) for media_code, news_id in cursor.fetchall()}
+    return [(key, row) for key, row in buffered
+            if row[date_at] != UNKNOWN_DATE or ((row[0], row[1]) in undated and (row[0], row[1]) not in stored)]
+
+
+def start_flush_task(flush_all, interval, spider):
+    '''
+    flush_all(spider)를 interval초마다 부르는 LoopingCall을 시작한다.
+    LoopingCall은 예외가 나면 조용히 멈추고, 그 뒤로는 배치 크기를 채운 테이블만 저장되므로 로그를 남기고 다시 시작한다.
+    '''
+    flush_task = task.LoopingCall(flush_all, spider)
+
+    def failed(failure):
+        spider.logger.error(f'주기적인 저장 중 에러가 났습니다. {interval}초 뒤에 다시 시도합니다. : {failure.getErrorMessage()}',
+                            exc_info=failure_to_exc_info(failure))
+        if not flush_task.running:
+            flush_task.start(interval, now=False).addErrback(failed)
+
+    flush_task.start(interval, now=False).addErrback(failed)
+    return flush_task
 
 
 class NavernewsPipeline:
@@ -18,8 +97,17 @@ class NavernewsPipeline:
 
 
 class NewsPipeline(object):
-    def __init__(self):
+    sends_items_stored = True  # commit한 다음 items_stored 시그널을 보낸다.
+
+    def __init__(self, signals=None, layout='per_outlet'):
         self.db_conn = connection_db()
+        self.signals = signals  # 저장 시간을 metrics.py로 보낼 crawler.signals
+        self.layout = layout
+        self.columns = ARTICLES_COLUMNS if layout == 'articles' else NEWS_COLUMNS
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(signals=crawler.signals, layout=table_layout(crawler.settings))
 
     def process_item(self, item, spider):
         self.db_conn = connection_db()
@@ -28,54 +116,436 @@ class NewsPipeline(object):
             print("데이터베이스 연결이 닫혀있습니다. 재연결 합니다.")
             self.db_conn = connection_db()
 
+        adapter = ItemAdapter(item)
+        key = (adapter['news_media_code'], adapter['news_id'])
+        stored = False
         try:
-            with self.db_conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                sql = f"INSERT INTO news.`{item['news_media_code']}` (" \
-                      f"news_id, news_title, news_content, " \
-                      f"news_author, news_date, news_category, " \
-                      f"news_original_url, news_site, news_naver_url) " \
-                      f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+            table, row = news_row(adapter, self.layout)
+            with self.db_conn.cursor() as cursor:
+                sql = f"INSERT INTO news.`{table}` ({', '.join(self.columns)}) " \
+                      f"VALUES ({', '.join(['%s'] * len(self.columns))})"
 
                 try:
-                    cursor.execute(sql, (item['news_id'], item['news_title'], item['news_content'], item['news_author'],
-                                         item['news_date'], item['news_category'], item['news_original_url'],
-                                         item['news_site'], item['news_naver_url']))
+                    started = time.perf_counter()
+                    if self.layout != 'articles' or resolve_undated(cursor, [(key, row)]):
+                        cursor.execute(sql, row)
                     self.db_conn.commit()
-                    print(f'* [기사제목] : {item["news_title"]}\n'
-                          f'* [언 론 사] : {item["news_site"]}\n'
-                          f'* [카테고리] : {item["news_category"]}\n'
-                          f'* [발행날짜] : {item["news_date"]}\n'
-                          f'* [네이버 URL] : {item["news_naver_url"]}\n'
-                          f'* [원  본 URL] : {item["news_original_url"]}\n')
-                    # print(f'* [Content] : {item["news_content"]}')
+                    stored = True
+                    # 아이템마다 출력하던 내용은 metrics.py의 진행 상황 출력으로 대신한다.
+                    if self.signals is not None:
+                        self.signals.send_catch_log(db_flushed, backend='mysql', rows=1,
+                                                    seconds=time.perf_counter() - started)
                 except pymysql.err.InternalError:
                     pass
                 except pymysql.err.IntegrityError:
-                    pass
+                    # 이미 저장된 기사
+                    stored = True
         finally:
             self.db_conn.close()
+            if self.signals is not None:
+                self.signals.send_catch_log(items_stored, stored=[key] if stored else [],
+                                            failed=[] if stored else [key])
 
         return item
 
 
+class NewsBatchPipeline(object):
+    """
+    NewsPipeline의 배치 버전, newsmanual 스파이더(News_manual)의 기본 파이프라인
+    연결을 하나만 열어두고 언론사 테이블별로 아이템을 모아뒀다가
+    MYSQL_BATCH_SIZE개가 쌓이거나 MYSQL_FLUSH_INTERVAL초가 지나면 executemany + commit 한번으로 저장한다.
+    스파이더가 종료될 때 남아있는 아이템도 모두 저장한다.
+    NEWS_TABLE_LAYOUT = 'articles'이면 모든 언론사의 아이템을 news.articles 배치 하나로 모은다.
+    배치를 commit한 다음 items_stored 시그널로 저장된 기사를 알린다.
+    연결이 끊겨서 저장하지 못한 배치는 재연결해서 한번 더 시도하고, 그래도 실패하면 버리지 않고 남겨뒀다가
+    retry_delay초 뒤(또는 다음 주기)에 다시 저장한다. 중복 키는 건너뛰므로 같은 배치를 다시 넣어도 된다.
+    """
+    sends_items_stored = True
+    retry_delay = 5.0  # 저장에 실패한 뒤 배치 크기를 채워도 다시 시도하지 않을 시간(초)
+
+    def __init__(self, stats, batch_size=500, flush_interval=5.0, signals=None, layout='per_outlet'):
+        self.stats = stats
+        self.signals = signals  # 배치 저장 시간을 metrics.py로 보낼 crawler.signals
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.layout = layout
+        self.columns = ARTICLES_COLUMNS if layout == 'articles' else NEWS_COLUMNS
+        self.db_conn = None
+        self.buffers = dict()  # {테이블: [((언론사 코드, aid), row), ...]}
+        self.flush_task = None
+        self.started = None
+        self.retry_at = 0.0  # 저장에 실패한 경우 배치 크기로 다시 저장을 시도할 시간 (time.monotonic)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats,
+                   batch_size=crawler.settings.getint('MYSQL_BATCH_SIZE', 500),
+                   flush_interval=crawler.settings.getfloat('MYSQL_FLUSH_INTERVAL', 5.0),
+                   signals=crawler.signals,
+                   layout=table_layout(crawler.settings))
+
+    def open_spider(self, spider):
+        self.db_conn = connection_db()
+        self.started = time.time()
+        if self.flush_interval > 0:
+            self.flush_task = start_flush_task(self.flush_all, self.flush_interval, spider)
+
+    def close_spider(self, spider):
+        if self.flush_task is not None and self.flush_task.running:
+            self.flush_task.stop()
+        self.flush_all(spider)
+        # 끝까지 저장하지 못한 아이템은 실패로 알려서 작업 큐가 날짜를 다른 워커에 다시 넘기도록 한다.
+        for table, buffered in self.buffers.items():
+            keys = [key for key, _ in buffered]
+            spider.logger.error(f'[{table}] DB에 연결할 수 없어서 {len(keys)}개를 저장하지 못하고 종료합니다.')
+            self.stats.inc_value('mysql/items_failed', len(keys))
+            if self.signals is not None:
+                self.signals.send_catch_log(items_stored, stored=[], failed=keys)
+        self.buffers.clear()
+        self.db_conn.close()
+
+        elapsed = time.time() - self.started
+        inserted = self.stats.get_value('mysql/items_inserted', 0)
+        if elapsed > 0:
+            self.stats.set_value('mysql/items_per_sec', round(inserted / elapsed, 2))
+        spider.logger.info(f'MySQL 저장 완료 : {inserted}개 저장, '
+                           f'{self.stats.get_value("mysql/items_duplicate", 0)}개 중복, '
+                           f'{self.stats.get_value("mysql/items_per_sec", 0)} items/sec')
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        table, row = news_row(adapter, self.layout)
+        self.buffers.setdefault(table, []).append(((adapter['news_media_code'], adapter['news_id']), row))
+
+        if len(self.buffers[table]) >= self.batch_size and time.monotonic() >= self.retry_at:
+            self.flush(table, spider)
+
+        return item
+
+    def flush_all(self, spider):
+        for table in list(self.buffers):
+            self.flush(table, spider)
+
+    def flush(self, table, spider):
+        # 저장에 성공한 다음에 버퍼에서 뺀다.
+        buffered = self.buffers.get(table)
+        if not buffered:
+            return
+        keys = [key for key, _ in buffered]
+        rows = [row for _, row in buffered]
+
+        started = time.perf_counter()
+        for attempt in range(2):
+            try:
+                # 오래 대기하는 동안 연결이 끊겼을 수 있으므로 필요하면 재연결한다.
+                self.db_conn.ping(reconnect=True)
+                inserted, failed = self.write(table, keys, rows, spider)
+                break
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError) as e:
+                self.stats.inc_value('mysql/flush_errors')
+                try:
+                    self.db_conn.rollback()
+                except pymysql.MySQLError:
+                    pass
+                spider.logger.warning(f'[{table}] 배치 저장 중 연결 에러({e}), '
+                                      f'{"재연결해서 다시 저장합니다." if attempt == 0 else "다음에 다시 저장합니다."}')
+        else:
+            self.retry_at = time.monotonic() + self.retry_delay
+            return
+        del self.buffers[table]
+
+        if self.signals is not None:
+            self.signals.send_catch_log(db_flushed, backend='mysql', rows=len(rows),
+                                        seconds=time.perf_counter() - started)
+            failed_keys = set(failed)
+            self.signals.send_catch_log(items_stored, stored=[key for key in keys if key not in failed_keys],
+                                        failed=failed)
+        self.stats.inc_value('mysql/flush_count')
+        self.stats.inc_value('mysql/items_inserted', inserted)
+        self.stats.inc_value('mysql/items_duplicate', len(rows) - inserted - len(failed))
+        spider.logger.info(f'[{table}] {len(rows)}개 중 {inserted}개를 저장했습니다.')
+
+    def write(self, table, keys, rows, spider):
+        '''
+        배치를 executemany + commit 한번으로 저장한다. 연결 에러(OperationalError)는 flush에서 처리한다.
+        :return: (추가된 행 수, 저장하지 못한 기사 키 목록)
+        '''
+        # 중복 키는 배치 전체를 실패시키지 않도록 아무것도 바꾸지 않는 UPDATE로 넘긴다.
+        # 이 경우 rowcount에는 실제로 추가된 행만 잡힌다.
+        sql = f"INSERT INTO news.`{table}` ({', '.join(self.columns)}) " \
+              f"VALUES ({', '.join(['%s'] * len(self.columns))}) " \
+              f"ON DUPLICATE KEY UPDATE news_id = news_id"
+
+        failed = []
+        try:
+            with self.db_conn.cursor() as cursor:
+                buffered = self.resolve(cursor, keys, rows)
+                inserted = cursor.executemany(sql, [row for _, row in buffered]) if buffered else 0
+            self.db_conn.commit()
+        except (pymysql.err.InternalError, pymysql.err.DataError, pymysql.err.IntegrityError) as e:
+            # 배치 안에 문제가 있는 행이 섞인 경우, 한 행씩 다시 넣어서 그 행만 건너뛴다.
+            self.db_conn.rollback()
+            spider.logger.warning(f'[{table}] 배치 저장 실패({e}), 한 건씩 다시 저장합니다.')
+            inserted = 0
+            with self.db_conn.cursor() as cursor:
+                for key, row in self.resolve(cursor, keys, rows):
+                    try:
+                        inserted += cursor.execute(sql, row)
+                    except (pymysql.err.InternalError, pymysql.err.DataError, pymysql.err.IntegrityError):
+                        failed.append(key)
+            self.db_conn.commit()
+            self.stats.inc_value('mysql/items_failed', len(failed))
+        return inserted, failed
+
+    def resolve(self, cursor, keys, rows):
+        # articles 테이블이면 날짜가 없는 행과 날짜가 있는 행이 같은 기사로 두 번 저장되지 않게 한다.
+        buffered = list(zip(keys, rows))
+        return resolve_undated(cursor, buffered) if self.layout == 'articles' else buffered
+
+
 class MongodbPipeline(object):
-    def __init__(self):
-        pass
+    """
+    스파이더가 열릴 때 MongoClient를 한번만 만들고, 컬렉션(언론사 코드)별 인덱스도 한번만 생성한다.
+    아이템은 컬렉션별로 모아뒀다가 MONGODB_BATCH_SIZE개 또는 MONGODB_FLUSH_INTERVAL초마다
+    ordered=False인 insert_many로 저장하므로, 중복 news_id가 있어도 나머지 문서는 그대로 저장된다.
+    MONGODB_CLIENT_FACTORY를 'mongomock.MongoClient'로 바꾸면 로컬에서 DB 없이 돌려볼 수 있다.
+    insert_many가 끝난 다음 items_stored 시그널로 저장된(중복 포함) 기사를 알린다.
+    서버에 연결하지 못해서 저장하지 못한 문서는 남겨뒀다가 retry_delay초 뒤(또는 다음 주기)에 다시 저장한다.
+    """
+    sends_items_stored = True
+    retry_delay = 5.0  # 저장에 실패한 뒤 배치 크기를 채워도 다시 시도하지 않을 시간(초)
+
+    def __init__(self, stats, client_factory=connection_mongodb, batch_size=500, flush_interval=5.0, signals=None):
+        self.stats = stats
+        self.signals = signals  # 배치 저장 시간을 metrics.py로 보낼 crawler.signals
+        self.client_factory = client_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.client = None
+        self.indexed = set()  # 인덱스를 이미 만든 컬렉션
+        self.buffers = dict()  # {언론사 코드: [document, ...]}
+        self.flush_task = None
+        self.retry_at = 0.0  # 저장에 실패한 경우 배치 크기로 다시 저장을 시도할 시간 (time.monotonic)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(crawler.stats,
+                   client_factory=load_object(settings.get('MONGODB_CLIENT_FACTORY',
+                                                           'navernews.db_mongo.connection_mongodb')),
+                   batch_size=settings.getint('MONGODB_BATCH_SIZE', 500),
+                   flush_interval=settings.getfloat('MONGODB_FLUSH_INTERVAL', 5.0),
+                   signals=crawler.signals)
+
+    def open_spider(self, spider):
+        self.client = self.client_factory()
+        if self.flush_interval > 0:
+            self.flush_task = start_flush_task(self.flush_all, self.flush_interval, spider)
+
+    def close_spider(self, spider):
+        if self.flush_task is not None and self.flush_task.running:
+            self.flush_task.stop()
+        self.flush_all(spider)
+        # 끝까지 저장하지 못한 문서는 실패로 알려서 작업 큐가 날짜를 다른 워커에 다시 넘기도록 한다.
+        for name, documents in self.buffers.items():
+            spider.logger.error(f'[{name}] MongoDB에 연결할 수 없어서 {len(documents)}개를 저장하지 못하고 종료합니다.')
+            self.stats.inc_value('mongodb/items_failed', len(documents))
+            if self.signals is not None:
+                self.signals.send_catch_log(items_stored, stored=[], failed=[
+                    (document['news_media_code'], document['news_id']) for document in documents])
+        self.buffers.clear()
+        self.client.close()
+        spider.logger.info(f'MongoDB 저장 완료 : {self.stats.get_value("mongodb/items_inserted", 0)}개 저장, '
+                           f'{self.stats.get_value("mongodb/items_duplicate", 0)}개 중복')
 
     def process_item(self, item, spider):
-        conn = connection_mongodb()
-        db = conn['news'][item['news_media_code']]
-        db.create_index([('news_id', pymongo.ASCENDING)], unique=True)
+        adapter = ItemAdapter(item)
+        collection = adapter['news_media_code']
+        self.buffers.setdefault(collection, []).append(adapter.asdict())
+
+        if len(self.buffers[collection]) >= self.batch_size and time.monotonic() >= self.retry_at:
+            self.flush(collection, spider)
+
+        return item
+
+    def get_collection(self, name):
+        collection = self.client['news'][name]
+        if name not in self.indexed:
+            collection.create_index([('news_id', pymongo.ASCENDING)], unique=True)
+            self.indexed.add(name)
+        return collection
+
+    def flush_all(self, spider):
+        for collection in list(self.buffers):
+            self.flush(collection, spider)
+
+    def flush(self, name, spider):
+        # 저장에 성공한 다음에 버퍼에서 뺀다.
+        documents = self.buffers.get(name)
+        if not documents:
+            return
+
+        started = time.perf_counter()
+        failed_indexes = set()
+        try:
+            result = self.get_collection(name).insert_many(documents, ordered=False)
+            inserted, duplicate, failed = len(result.inserted_ids), 0, 0
+        except pymongo.errors.ConnectionFailure as e:
+            # 일부 문서는 이미 저장됐을 수 있지만, news_id 유니크 인덱스로 다시 넣을 때 중복으로 건너뛴다.
+            self.stats.inc_value('mongodb/flush_errors')
+            self.retry_at = time.monotonic() + self.retry_delay
+            spider.logger.warning(f'[{name}] 연결 에러로 {len(documents)}개를 저장하지 못했습니다. 다음에 다시 저장합니다. : {e}')
+            return
+        except pymongo.errors.BulkWriteError as e:
+            # ordered=False 이므로 에러가 난 문서를 제외한 나머지는 모두 저장된 상태이다.
+            errors = e.details.get('writeErrors', [])
+            duplicate = sum(1 for error in errors if error.get('code') == 11000)
+            failed_indexes = {error.get('index') for error in errors if error.get('code') != 11000}
+            failed = len(errors) - duplicate
+            inserted = e.details.get('nInserted', len(documents) - len(errors))
+            if failed:
+                spider.logger.warning(f'[{name}] {failed}개의 문서를 저장하지 못했습니다. : {errors[0].get("errmsg")}')
+        del self.buffers[name]
+
+        if self.signals is not None:
+            self.signals.send_catch_log(db_flushed, backend='mongodb', rows=len(documents),
+                                        seconds=time.perf_counter() - started)
+            keys = [(document['news_media_code'], document['news_id']) for document in documents]
+            self.signals.send_catch_log(items_stored,
+                                        stored=[key for i, key in enumerate(keys) if i not in failed_indexes],
+                                        failed=[key for i, key in enumerate(keys) if i in failed_indexes])
+        self.stats.inc_value('mongodb/flush_count')
+        self.stats.inc_value('mongodb/items_inserted', inserted)
+        self.stats.inc_value('mongodb/items_duplicate', duplicate)
+        self.stats.inc_value('mongodb/items_failed', failed)
+        spider.logger.info(f'[{name}] {len(documents)}개 중 {inserted}개를 저장했습니다.')
+
 
+class ParquetPipeline(object):
+    """
+    분석용 Parquet 파일 저장 (pyarrow가 필요하다.)
+    아이템을 (언론사 코드, 기사 날짜)별로 모아서 Arrow 테이블로 만든 다음 행 그룹 단위로 Parquet 파일에 쓴다.
+    폴더는 Hive 형식으로 나누므로 한 언론사의 기간을 읽을 때는 해당 폴더의 파일만 읽는다.
+
+        <PARQUET_DIR>/news_media_code=001/date=2020-03-24/part-<시작 시각>-<pid>-<번호>.parquet
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        partitioning = ds.partitioning(pa.schema([('news_media_code', pa.string()), ('date', pa.string())]), flavor='hive')
+        dataset = ds.dataset('parquet', format='parquet', partitioning=partitioning)
+        table = dataset.to_table(filter=(ds.field('news_media_code') == '001') & (ds.field('date') >= '2020-03-01'))
+
+    partitioning='hive'로만 읽으면 폴더 이름의 001이 int32로 추론되어 앞의 0이 빠지고, 문자열과 비교하는 필터는 에러가 나므로
+    위처럼 두 폴더 키를 문자열로 지정해서 읽는다.
+
+    쓰는 중인 파일은 .tmp 이름으로 두고, 닫을 때 이름을 바꾸므로 읽는 쪽에서는 완성된 파일만 보인다.
+    열어둔 파일이 PARQUET_MAX_OPEN_FILES개를 넘으면 가장 오래 쓰지 않은 파일을 닫고, 그 날짜에 아이템이 더 오면 새 파일을 만든다.
+
+    settings
+        PARQUET_DIR             : 저장 폴더 (기본 parquet)
+        PARQUET_ROW_GROUP_SIZE  : 행 그룹 크기, 날짜별로 이만큼 모이면 파일에 쓴다. (기본 10000)
+        PARQUET_COMPRESSION     : 압축 방식 (zstd, snappy, gzip, none 등, 기본 zstd)
+        PARQUET_MAX_BUFFERED    : 모든 날짜를 합쳐서 메모리에 모아둘 최대 아이템 수, 넘으면 가장 많이 모인 날짜부터 쓴다. (기본 100000)
+        PARQUET_MAX_OPEN_FILES  : 동시에 열어둘 최대 파일 수 (기본 64)
+    """
+    COLUMNS = NEWS_COLUMNS  # news_media_code는 폴더 이름으로 저장한다.
+
+    def __init__(self, stats, directory='parquet', row_group_size=10000, compression='zstd', max_buffered=100000,
+                 max_open_files=64):
         try:
-            db.insert_one(item)
-            print(f'* [기사제목] : {item["news_title"]}\n'
-                  f'* [언 론 사] : {item["news_site"]}\n'
-                  f'* [카테고리] : {item["news_category"]}\n'
-                  f'* [발행날짜] : {item["news_date"]}\n'
-                  f'* [네이버 URL] : {item["news_naver_url"]}\n'
-                  f'* [원  본 URL] : {item["news_original_url"]}\n')
-        except pymongo.errors.DuplicateKeyError:
-            print("이미 저장된 기사입니다.")
-
-        return item
\ No newline at end of file
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise NotConfigured('ParquetPipeline을 사용하려면 pyarrow 패키지가 필요합니다. (pip install pyarrow)')
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.stats = stats
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.compression = None if compression in (None, '', 'none') else compression
+        self.max_buffered = max_buffered
+        self.max_open_files = max_open_files
+        self.schema = pyarrow.schema([(col, pyarrow.timestamp('us', tz='Asia/Seoul') if col == 'news_date'
+                                       else pyarrow.string()) for col in self.COLUMNS])
+        self.prefix = f"part-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.file_no = 0
+        self.buffers = dict()  # {(언론사 코드, 날짜): {컬럼: [값, ...]}}
+        self.buffered = 0
+        self.writers = OrderedDict()  # {(언론사 코드, 날짜): (ParquetWriter, 임시 경로, 경로)}, 오래 쓰지 않은 순서
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(crawler.stats,
+                   directory=settings.get('PARQUET_DIR', 'parquet'),
+                   row_group_size=settings.getint('PARQUET_ROW_GROUP_SIZE', 10000),
+                   compression=settings.get('PARQUET_COMPRESSION', 'zstd'),
+                   max_buffered=settings.getint('PARQUET_MAX_BUFFERED', 100000),
+                   max_open_files=settings.getint('PARQUET_MAX_OPEN_FILES', 64))
+
+    def close_spider(self, spider):
+        for partition in list(self.buffers):
+            self.write(partition)
+        for partition in list(self.writers):
+            self.close_file(partition)
+        spider.logger.info(f'Parquet 저장 완료 : {self.stats.get_value("parquet/items_written", 0)}개, '
+                           f'{self.stats.get_value("parquet/files", 0)}개 파일')
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        news_date = adapter.get('news_date')
+        day = news_date.strftime('%Y-%m-%d') if isinstance(news_date, datetime.datetime) else 'unknown'
+        partition = (adapter['news_media_code'], day)
+
+        columns = self.buffers.get(partition)
+        if columns is None:
+            columns = self.buffers[partition] = {col: [] for col in self.COLUMNS}
+        for col in self.COLUMNS:
+            value = adapter.get(col)
+            if col == 'news_date':
+                # tzinfo가 없는 날짜는 한국 시간으로 보고 KST를 붙인다. (붙이지 않으면 UTC로 저장된다.)
+                if not isinstance(value, datetime.datetime):
+                    value = None
+                elif value.tzinfo is None:
+                    value = value.replace(tzinfo=KST)
+            columns[col].append(value)
+        self.buffered += 1
+
+        if len(columns['news_id']) >= self.row_group_size:
+            self.write(partition)
+        elif self.buffered > self.max_buffered:
+            self.write(max(self.buffers, key=lambda key: len(self.buffers[key]['news_id'])))
+        return item
+
+    def write(self, partition):
+        # 모아둔 아이템을 행 그룹 하나로 쓴다.
+        columns = self.buffers.pop(partition, None)
+        if not columns or not columns['news_id']:
+            return
+        table = self.pa.Table.from_pydict(columns, schema=self.schema)
+        self.open_file(partition).write_table(table, row_group_size=self.row_group_size)
+        self.buffered -= table.num_rows
+        self.stats.inc_value('parquet/row_groups')
+        self.stats.inc_value('parquet/items_written', table.num_rows)
+
+    def open_file(self, partition):
+        if partition in self.writers:
+            self.writers.move_to_end(partition)
+            return self.writers[partition][0]
+        if len(self.writers) >= self.max_open_files:
+            self.close_file(next(iter(self.writers)))
+
+        oid, day = partition
+        directory = os.path.join(self.directory, f'news_media_code={oid}', f'date={day}')
+        os.makedirs(directory, exist_ok=True)
+        self.file_no += 1
+        path = os.path.join(directory, f'{self.prefix}-{self.file_no:04d}.parquet')
+        writer = self.pq.ParquetWriter(f'{path}.tmp', self.schema, compression=self.compression)
+        self.writers[partition] = (writer, f'{path}.tmp', path)
+        return writer
+
+    def close_file(self, partition):
+        writer, tmp_path, path = self.writers.pop(partition)
+        writer.close()
+        os.replace(tmp_path, path)
+        self.stats.inc_value('parquet/files')
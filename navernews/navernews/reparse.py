@@ -0,0 +1,259 @@
+"""
+저장해둔 기사 HTML을 네이버에 요청하지 않고 다시 파싱하는 명령
+추출기(extractor.py)를 고쳤거나 새 필드를 추가했을 때, 다시 크롤링하지 않고 HTTP 캐시(httpcache.py)에 저장된
+기사 페이지로 아이템을 다시 만든다.
+
+1. 메인 프로세스는 캐시 파일에서 기사 페이지(압축된 상태)를 chunk 단위로 읽어서 작업 프로세스에 나눠주고
+2. 작업 프로세스(기본값 CPU 코어 수)는 압축을 풀고 ArticleExtractor로 필드를 추출해서 돌려주며
+3. 메인 프로세스는 돌려받은 아이템을 순서대로 파이프라인(ITEM_PIPELINES 또는 --pipeline)이나 exporter(--output)로 넘긴다.
+처리 중인 chunk는 작업 프로세스 수의 두 배까지만 유지하므로 기사 수와 관계없이 메모리 사용량이 일정하다.
+
+    cd navernews
+    python -m navernews.reparse httpcache/navernews.sqlite3 --output items.jl
+    python -m navernews.reparse httpcache/navernews.sqlite3 --oid 001,020 --start 20200331 --end 20200301 \
+        --pipeline navernews.pipelines.MongodbPipeline --body html
+
+--start / --end는 스파이더와 같이 start가 최신 날짜, end가 과거 날짜이다.
+작업 프로세스에서 기사 시간을 읽지 못한 경우는 chunk 결과와 함께 돌려받아서 stats(news/date/missing, news/date/unparsed)에 더한다.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sqlite3
+import time
+
+import scrapy
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DropItem, UsageError
+from scrapy.exporters import JsonItemExporter, CsvItemExporter
+from scrapy.http import Headers, HtmlResponse
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object, create_instance
+from scrapy.utils.project import get_project_settings
+
+from navernews.extractor import ArticleExtractor, WorkerStats
+from navernews.feed import NewsJsonLinesExporter
+from navernews.httpcache import iter_articles
+from navernews.items import NewsItem
+from navernews.tools import BodyNormalizer, BOILERPLATE_PATTERNS
+
+EXPORTERS = {'.jl': NewsJsonLinesExporter, '.jsonl': NewsJsonLinesExporter,
+             '.json': JsonItemExporter, '.csv': CsvItemExporter}
+
+# 작업 프로세스마다 한번만 만든다. (_init_worker)
+_extractor = None
+_decompressor = None
+_stats = None
+
+
+def _init_worker(body, check_url, patterns):
+    global _extractor, _decompressor, _stats
+    import zstandard
+    # 작업 프로세스에는 크롤러 stats가 없으므로 추출기가 센 값을 모아뒀다가 chunk 결과와 함께 돌려준다.
+    _stats = WorkerStats()
+    _extractor = ArticleExtractor(body=body, check_url=check_url, normalizer=BodyNormalizer(patterns), stats=_stats)
+    _decompressor = zstandard.ZstdDecompressor()
+
+
+def _parse_chunk(pages):
+    '''
+    작업 프로세스에서 실행된다.
+    :param pages: [(url, headers json, 압축된 본문), ...]
+    :return: ([(url, 레이아웃, 필드 dict), ...], 추출기 stats {키: 개수})
+             실패한 페이지는 레이아웃 자리에 None, 필드 자리에 에러 문자열
+    '''
+    results = []
+    for url, headers, body in pages:
+        try:
+            # 캐시에서 꺼낼 때와 같이 저장된 헤더로 응답을 만들어서 인코딩(euc-kr 등)을 똑같이 판단한다.
+            response = HtmlResponse(url=url, headers=Headers(json.loads(headers)),
+                                    body=_decompressor.decompress(body))
+            layout, fields = _extractor.extract_response(response)
+            results.append((url, layout, fields))
+        except Exception as e:
+            results.append((url, None, f'{type(e).__name__}: {e}'))
+    return results, _stats.pop_counts()
+
+
+def _chunks(pages, size):
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_pages(pages, workers, chunk_size, body='text', check_url=False, patterns=BOILERPLATE_PATTERNS,
+                stats=None):
+    '''
+    페이지를 작업 프로세스들에 나눠서 파싱하고, 끝난 chunk부터 결과를 하나씩 돌려준다.
+    :param stats: 작업 프로세스의 추출기가 센 값(news/date/missing 등)을 더할 stats
+    '''
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(body, check_url, list(patterns))) as executor:
+        chunks = _chunks(pages, chunk_size)
+        pending = set()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.add(executor.submit(_parse_chunk, chunk))
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                results, counts = future.result()
+                if stats is not None:
+                    for key, count in counts.items():
+                        stats.inc_value(key, count)
+                yield from results
+
+
+class ReparseSpider(scrapy.Spider):
+    # 파이프라인에 넘겨줄 스파이더 (요청은 하지 않는다)
+    name = 'reparse'
+
+
+class ItemSink(object):
+    """
+    다시 만든 아이템을 받을 곳
+    :param pipelines: 파이프라인 경로 목록, None이면 프로젝트 settings의 ITEM_PIPELINES
+    :param output: exporter로 저장할 파일 (.jl / .jsonl / .json / .csv), 지정하면 파이프라인은 사용하지 않는다.
+    """
+
+    def __init__(self, settings, pipelines=None, output=None):
+        # 리액터 없이 실행하므로 주기적으로 저장하는 LoopingCall은 쓰지 않고 배치 크기와 종료 시점에만 저장한다.
+        settings.set('MYSQL_FLUSH_INTERVAL', 0, priority='cmdline')
+        settings.set('MONGODB_FLUSH_INTERVAL', 0, priority='cmdline')
+        crawler = Crawler(ReparseSpider, settings)
+        crawler.stats = load_object(settings['STATS_CLASS'])(crawler)
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.spider = ReparseSpider.from_crawler(crawler)
+        crawler.spider = self.spider
+
+        self.file = None
+        self.exporter = None
+        self.pipelines = []
+        if output:
+            exporter_cls = EXPORTERS.get(os.path.splitext(output)[1].lower())
+            if exporter_cls is None:
+                raise UsageError(f'{output} : 지원하지 않는 파일 형식입니다. ({", ".join(EXPORTERS)})')
+            self.file = open(output, 'wb')
+            self.exporter = exporter_cls(self.file)
+        else:
+            if pipelines is None:
+                pipelines = build_component_list(settings.getwithbase('ITEM_PIPELINES'))
+            if not pipelines:
+                # 받을 곳이 없으면 다시 만든 아이템이 모두 버려지므로 시작하지 않는다.
+                raise UsageError('아이템을 받을 곳이 없습니다. --pipeline 또는 --output을 지정하거나 '
+                                 'settings의 ITEM_PIPELINES를 설정하세요.')
+            self.pipelines = [create_instance(load_object(path), settings, crawler) for path in pipelines]
+
+    def open(self):
+        self.stats.open_spider(self.spider)
+        if self.exporter is not None:
+            self.exporter.start_exporting()
+        for pipeline in self.pipelines:
+            if hasattr(pipeline, 'open_spider'):
+                pipeline.open_spider(self.spider)
+
+    def process_item(self, item):
+        if self.exporter is not None:
+            self.exporter.export_item(item)
+            return
+        try:
+            for pipeline in self.pipelines:
+                item = pipeline.process_item(item, self.spider)
+        except DropItem:
+            self.stats.inc_value('reparse/items_dropped')
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.finish_exporting()
+            self.file.close()
+        for pipeline in self.pipelines:
+            if hasattr(pipeline, 'close_spider'):
+                pipeline.close_spider(self.spider)
+        self.stats.close_spider(self.spider, 'finished')
+
+
+def reparse(args):
+    settings = get_project_settings()
+    for setting in args.set or ():
+        name, _, value = setting.partition('=')
+        settings.set(name, value, priority='cmdline')
+    patterns = settings.getlist('BODY_BOILERPLATE_PATTERNS', BOILERPLATE_PATTERNS)
+    oids = [oid.strip() for oid in args.oid.split(',') if oid.strip()] if args.oid else None
+    sink = ItemSink(settings, pipelines=args.pipeline, output=args.output)
+    stats = sink.stats
+
+    conn = sqlite3.connect(args.path)
+    started = time.time()
+    sink.open()
+    try:
+        pages = iter_articles(conn, oids)
+        for url, layout, fields in parse_pages(pages, args.workers, args.chunk_size,
+                                               body=args.body, check_url=args.check_url, patterns=patterns,
+                                               stats=stats):
+            stats.inc_value('reparse/pages')
+            if layout is None:
+                stats.inc_value('reparse/failed')
+                sink.spider.logger.warning(f'파싱 실패 [{url}] : {fields}')
+                continue
+            stats.inc_value(f'reparse/layout/{layout}')
+            if fields['news_date'] is None:
+                stats.inc_value('reparse/date_missing')
+            elif args.start or args.end:
+                day = fields['news_date'].strftime('%Y%m%d')
+                if (args.start and day > args.start) or (args.end and day < args.end):
+                    stats.inc_value('reparse/filtered')
+                    continue
+
+            sink.process_item(NewsItem(**fields))
+            items = stats.get_value('reparse/items', 0) + 1
+            stats.set_value('reparse/items', items)
+            if items % args.progress == 0:
+                print(f'{items}개 처리 ({items / (time.time() - started):.1f} items/sec)')
+    finally:
+        conn.close()
+        elapsed = time.time() - started
+        if elapsed > 0:
+            stats.set_value('reparse/pages_per_sec', round(stats.get_value('reparse/pages', 0) / elapsed, 2))
+        sink.close()
+    return stats.get_stats()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='HTTP 캐시에 저장된 네이버 뉴스 기사를 요청 없이 다시 파싱')
+    parser.add_argument('path', help='캐시 파일 경로 (NAVER_HTTPCACHE_FILE)')
+    parser.add_argument('--oid', help='언론사 코드, 여러 개는 쉼표로 구분 (기본 전체)')
+    parser.add_argument('--start', help='이 날짜(20200331 형식, 최신) 이전 기사만')
+    parser.add_argument('--end', help='이 날짜(20200301 형식, 과거) 이후 기사만')
+    parser.add_argument('--body', choices=('text', 'html'), default='text',
+                        help="본문 추출 방식 (News_manual은 text, News_manual_mongo는 html)")
+    parser.add_argument('--check-url', action='store_true', help='http(s)가 아닌 언론사 원본 URL은 ""로 저장')
+    parser.add_argument('--output', help='파이프라인 대신 exporter로 저장할 파일 (.jl / .jsonl / .json / .csv)')
+    parser.add_argument('--pipeline', action='append',
+                        help='사용할 파이프라인 경로, 여러 번 지정 가능 (기본 settings의 ITEM_PIPELINES)')
+    parser.add_argument('-s', '--set', action='append', metavar='NAME=VALUE',
+                        help='settings 값 덮어쓰기, scrapy crawl -s와 같다. (예: -s MONGODB_BATCH_SIZE=1000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='작업 프로세스 수 (기본 CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='작업 프로세스에 한번에 넘길 페이지 수')
+    parser.add_argument('--progress', type=int, default=1000, help='몇 개마다 진행 상황을 출력할지')
+    args = parser.parse_args()
+    if args.start and args.end and args.start < args.end:
+        parser.error('--start는 최신 날짜, --end는 과거 날짜입니다. (예: --start 20200331 --end 20200301)')
+
+    try:
+        result = reparse(args)
+    except UsageError as e:
+        parser.error(str(e))
+    for key in sorted(result):
+        if key.startswith(('reparse/', 'news/date/', 'mysql/', 'mongodb/')):
+            print(f'{key:32} {result[key]}')
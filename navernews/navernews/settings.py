@@ -50,15 +50,24 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
+# 스파이더의 custom_settings에 있는 DOWNLOADER_MIDDLEWARES, ITEM_PIPELINES는 덮어쓰지 않고 여기의 목록과 합친다.
+# (NewsSpider.update_component_settings) 여기에서 None으로 지정하면 스파이더의 것도 끄고, 명령행(-s)으로 지정하면 그 목록만 쓴다.
+# 아래의 DOWNLOADER_MIDDLEWARES / ITEM_PIPELINES 예시를 여러 개 켤 때는 하나의 dict로 합쳐서 적는다.
 #DOWNLOADER_MIDDLEWARES = {
 #    'navernews.middlewares.NavernewsDownloaderMiddleware': 543,
 #}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
+EXTENSIONS = {
 #    'scrapy.extensions.telnet.TelnetConsole': None,
-#}
+    'navernews.metrics.NaverMetrics': 500,
+}
+
+# 진행 상황 출력과 측정값 내보내기 (navernews/metrics.py)
+NAVER_PROGRESS_INTERVAL = 10  # 몇 초마다 진행 상황을 한 줄로 출력할지, 0이면 출력하지 않는다.
+#NAVER_METRICS_FILE = 'metrics/navernews.prom'  # Prometheus node_exporter textfile
+#NAVER_METRICS_PORT = 9410  # http://127.0.0.1:9410/metrics
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -66,6 +75,75 @@ ROBOTSTXT_OBEY = True
 #    'navernews.pipelines.NavernewsPipeline': 300,
 #}
 
+# NewsBatchPipeline 설정 - 몇 개씩 모아서 저장할지, 최대 몇 초마다 저장할지 (newsmanual 스파이더의 기본 파이프라인)
+# 예전처럼 아이템마다 연결해서 저장하려면 ITEM_PIPELINES에
+# {'navernews.pipelines.NewsBatchPipeline': None, 'navernews.pipelines.NewsPipeline': 300}을 넣는다.
+MYSQL_BATCH_SIZE = 500
+MYSQL_FLUSH_INTERVAL = 5.0
+
+# MySQL 테이블 구성 - per_outlet(언론사 코드별 테이블) 또는 articles(기사 날짜로 파티션한 news.articles 하나)
+# 기존 테이블을 옮기려면 python -m navernews.articles migrate (navernews/articles.py)
+#NEWS_TABLE_LAYOUT = 'articles'
+
+# MongodbPipeline 설정 - 로컬 테스트시에는 MONGODB_CLIENT_FACTORY = 'mongomock.MongoClient'
+MONGODB_CLIENT_FACTORY = 'navernews.db_mongo.connection_mongodb'
+MONGODB_BATCH_SIZE = 500
+MONGODB_FLUSH_INTERVAL = 5.0
+
+# ParquetPipeline 설정 - 분석용 Parquet 파일, 언론사 코드 / 기사 날짜별 폴더로 나눠서 저장한다. (pyarrow 필요)
+# 스파이더의 저장 파이프라인(MySQL / MongoDB)과 함께 실행된다. 읽는 방법은 ParquetPipeline 설명 참고
+#ITEM_PIPELINES = {
+#    'navernews.pipelines.ParquetPipeline': 300,
+#}
+#PARQUET_DIR = 'parquet'
+#PARQUET_ROW_GROUP_SIZE = 10000
+#PARQUET_COMPRESSION = 'zstd'
+#PARQUET_MAX_BUFFERED = 100000
+#PARQUET_MAX_OPEN_FILES = 64
+
+# JsonLinesFeedPipeline 설정 - 다른 팀에 넘겨줄 압축 JSON Lines 파일, 크기나 매 정시에 따라 다음 파일로 넘어간다. (navernews/feed.py)
+#ITEM_PIPELINES = {
+#    'navernews.feed.JsonLinesFeedPipeline': 400,
+#}
+#JSONL_DIR = 'feed'
+#JSONL_COMPRESSION = 'gzip'  # gzip, zstd(zstandard 필요), none
+#JSONL_MAX_FILE_SIZE = 256 * 1024 ** 2
+#JSONL_ROTATE_HOURLY = True
+
+# 언론사 사이의 거의 같은 기사(통신사 전재) 찾기 - 저장 파이프라인보다 앞에 둔다. (navernews/near_dup.py)
+#ITEM_PIPELINES = {
+#    'navernews.near_dup.NearDuplicatePipeline': 250,
+#}
+#NEAR_DUP_INDEX = 'near_dup.sqlite3'
+#NEAR_DUP_THRESHOLD = 0.8
+#NEAR_DUP_MODE = 'tag'  # tag, collapse(본문을 비움), drop
+#NEAR_DUP_MIN_LENGTH = 200
+
+# 기사 본문(텍스트 노드)에서 지울 줄의 정규식 목록, 하나라도 찾아지는 줄은 지운다. (tools.BodyNormalizer)
+BODY_BOILERPLATE_PATTERNS = [
+    '무단 ?전재 및 재배포 금지',
+    'ⓒ',
+    # r'[\w.+-]+@[\w-]+\.[\w.]+',  # 기자 이메일
+    # r'\S+ 기자\s*$',  # 기자 서명
+]
+
+# 기사 추출을 작업 프로세스에서 할지 - 프로세스 수, 0이면 리액터 스레드에서 추출한다. (navernews/parse_pool.py)
+NAVER_PARSE_WORKERS = 0
+NAVER_PARSE_ORDERED = True
+
+# 목록 / 기사 페이지별 동시 요청 수와 딜레이 자동 조절 (navernews/throttle.py)
+# 켜면 스파이더의 DOWNLOAD_DELAY 대신 종류별 슬롯의 값을 응답 시간, 에러 비율, 403/429 응답에 따라 조절한다.
+#NAVER_THROTTLE_ENABLED = True
+#NAVER_THROTTLE_ENDPOINTS = {
+#    'list': {'concurrency': 4, 'max_concurrency': 8, 'delay': 0.25, 'target_latency': 1.0},
+#    'article': {'concurrency': 16, 'max_concurrency': 32, 'delay': 0.1, 'target_latency': 0.5},
+#}
+#NAVER_THROTTLE_TARGET_ERROR_RATE = 0.02
+#NAVER_THROTTLE_INTERVAL = 5.0
+#DOWNLOADER_MIDDLEWARES = {
+#    'navernews.throttle.AdaptiveThrottle': 560,
+#}
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -86,3 +164,19 @@ ROBOTSTXT_OBEY = True
 #HTTPCACHE_DIR = 'httpcache'
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
+
+# 네이버 뉴스용 캐시 저장소 - SQLite 파일 하나에 zstd로 압축해서 저장한다. (navernews/httpcache.py)
+# 캐시를 켜면 다시 실행하거나 파서를 고칠 때 이미 받은 페이지를 다시 요청하지 않는다.
+#HTTPCACHE_ENABLED = True
+#HTTPCACHE_STORAGE = 'navernews.httpcache.NaverCacheStorage'
+#HTTPCACHE_IGNORE_HTTP_CODES = [403, 429, 500, 502, 503, 504]
+# 종류별 만료 시간(초), 0이면 만료되지 않는다.
+NAVER_HTTPCACHE_EXPIRATION = {'article': 0, 'list': 0, 'list_today': 600, 'other': 0}
+
+# 원본 응답 보관 - 기사/목록 페이지 응답을 WARC 형식(zstd)의 세그먼트 파일로 보관한다. (navernews/archive.py)
+#NAVER_ARCHIVE_ENABLED = True
+#NAVER_ARCHIVE_DIR = 'archive'
+#NAVER_ARCHIVE_SEGMENT_SIZE = 1024 ** 3
+#DOWNLOADER_MIDDLEWARES = {  # 적응형 조절(throttle.py)도 켜려면 'navernews.throttle.AdaptiveThrottle': 560을 같이 적는다.
+#    'navernews.archive.ArchiveMiddleware': 950,
+#}
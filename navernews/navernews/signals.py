@@ -0,0 +1,10 @@
+"""
+navernews에서 사용하는 시그널 (crawler.signals.connect / send_catch_log)
+"""
+
+# 파이프라인이 배치를 저장할 때마다 보내는 시그널 (backend, rows, seconds), metrics.py에서 저장 시간을 모은다.
+db_flushed = object()
+
+# 저장 파이프라인이 commit한 다음 보내는 시그널 (stored, failed), 둘 다 [(언론사 코드, aid), ...]
+# 스파이더는 이 시그널을 받은 기사만 체크포인트 / 작업 큐에서 끝난 것으로 기록한다. (NewsListSpider)
+items_stored = object()
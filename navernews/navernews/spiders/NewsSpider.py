@@ -1,21 +1,61 @@
 import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from itemadapter import ItemAdapter
 from scrapy.spiders import Rule, CrawlSpider
 from scrapy.linkextractors import LinkExtractor
-from allcrawler.items import NewsItem
 from urllib.parse import urlparse, parse_qs
 import re
 from w3lib.html import remove_tags_with_content
 import datetime
-from allcrawler.db_auth import connection_db
+from navernews.db_auth import connection_db
 from navernews.info import naver_news_code
-from navernews.tools import clean_html
+from navernews.items import NewsItem
+from navernews.tools import date_range, parse_categories, parse_weights, KST
+from navernews.db_schema import ARTICLES_TABLE, prepare_articles_table, prepare_news_table
+from navernews.work_queue import open_work_queue
+from navernews.checkpoint import Checkpoint
+from navernews.high_water import HighWaterMark
+from navernews.seen_index import SeenIndex
+from navernews.extractor import ArticleExtractor
+from navernews.parse_pool import ParsePool
+from navernews.signals import items_stored
+from scrapy.settings import BaseSettings, get_settings_priority
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from scrapy.utils.defer import maybe_deferred_to_future
 import pymysql
 import csv
+import os
+import socket
+import time
+from collections import deque
+from twisted.internet import task
+
+COMPONENT_SETTINGS = ('DOWNLOADER_MIDDLEWARES', 'ITEM_PIPELINES')  # settings.py의 목록과 합치는 custom_settings
+
+
+def update_component_settings(custom_settings, settings):
+    """
+    custom_settings는 spider 우선순위로 들어가므로 DOWNLOADER_MIDDLEWARES, ITEM_PIPELINES를 그대로 넣으면
+    settings.py의 목록을 통째로 덮어써서 settings.py에서 켠 미들웨어 / 파이프라인(AdaptiveThrottle, ArchiveMiddleware 등)이 빠진다.
+    스파이더의 목록을 기본값으로 두고 그 위에 settings.py의 목록을 합친다. settings.py에서 None으로 지정하면 스파이더의 것도 끈다.
+    명령행(-s)으로 지정한 목록은 합치지 않고 그대로 쓴다.
+    """
+    custom_settings = dict(custom_settings or {})
+    for name in COMPONENT_SETTINGS:
+        if name in custom_settings and (settings.getpriority(name) or 0) <= get_settings_priority('spider'):
+            # 값이 JSON 문자열이어도 Scrapy처럼 dict로 읽는다.
+            merged = BaseSettings({name: custom_settings[name]}).getdict(name)
+            merged.update(settings.getdict(name))
+            custom_settings[name] = merged
+    settings.setdict(custom_settings, priority='spider')
 
 
 # Linkextractor를 사용하는 버전
 class News(CrawlSpider):
     name = 'news'  # 스파이더 이름 지정, 호출시에 사용하는 용도이다. 각 스파이더를 구분지어주기도 함
+    extractor_options = {'body': 'text'}  # 기사 페이지 추출기 옵션 (navernews/extractor.py), 추출기는 from_crawler에서 만든다.
     custom_settings = {  # 기본적인 세팅값을 설정한다. 이 부분에 설정하는 것은 스파이더마다 설정값을 다르게 한다는 의미이다.
         'ROBOTSTXT_OBEY': False,  # Robots.txt 파일의 권장사항을 지킬것인지 설정
         'LOG_ENABLED': True,  # 로그를 사용할 것인지
@@ -37,14 +77,20 @@ class News(CrawlSpider):
         'CONCURRENT_REQUESTS': 32,  # default: 16
     }
 
-    def __init__(self, category=None, *a, **kw):  # Spider가 생성될때의 초기화
+    def __init__(self, category=None, table_layout='per_outlet', *a, **kw):  # Spider가 생성될때의 초기화
+        """
+        :param category: 크롤링하는 언론사 코드, 여러 언론사는 쉼표로 구분(001,003)하고 전체는 all
+        :param table_layout: 저장할 MySQL 테이블 구성, from_crawler에서 NEWS_TABLE_LAYOUT 설정으로 넘겨준다.
+        """
         print("*" * 100)
         print("뉴스 스파이더를 실행합니다.")
-        news_category = category
-        print(f"크롤링하는 언론사는 [{naver_news_code[news_category]}]({news_category}) 입니다.")
+        news_categories = parse_categories(category)
+        for news_category in news_categories:
+            print(f"크롤링하는 언론사는 [{naver_news_code[news_category]}]({news_category}) 입니다.")
         self.allowed_domains = ['news.naver.com']
         self.start_urls = [
-            f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec&listType=summary&oid={news_category}"]
+            f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec&listType=summary&oid={news_category}"
+            for news_category in news_categories]
 
         print("데이터베이스 연결")
         db_connect = connection_db()
@@ -52,50 +98,15 @@ class News(CrawlSpider):
         if db_connect.open:
             print("데이터베이스 연결 성공")
             try:
-                with db_connect.cursor(pymysql.cursors.DictCursor) as cursor:
-                    print("데이터베이스에 테이블이 있는지 확인합니다.")
-                    sql = f"SELECT EXISTS(SELECT 1 FROM Information_schema.tables " \
-                          "WHERE table_schema = 'news' AND TABLE_NAME = %s) AS flag"
-
-                    try:
-                        cursor.execute(sql, (news_category))
-                        result = cursor.fetchall()
-
-                        if result[0]['flag'] == 0:
-                            print(f"[{naver_news_code[news_category]}]의 {news_category} 테이블이 없습니다. 생성합니다.")
-                            sql = f'''
-                                    CREATE TABLE if not exists news.`{news_category}` (
-                                        `inx` INT(11) NOT NULL AUTO_INCREMENT,
-                                        `news_id` VARCHAR(255) NOT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_title` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_content` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_author` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_date` TIMESTAMP NULL DEFAULT NULL,
-                                        `news_category` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_original_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_site` VARCHAR(30) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_naver_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        PRIMARY KEY (`inx`),
-                                        UNIQUE INDEX `inx` (`inx`),
-                                        UNIQUE INDEX `naver_news_id_uindex` (`news_id`)
-                                    )
-                                    COLLATE='utf8mb4_unicode_ci'
-                                    ENGINE=InnoDB
-                                    '''
-                            cursor.execute(sql)
-
-                        else:
-                            print(f"[{naver_news_code[news_category]}]의 {news_category} 테이블이 이미 있습니다.")
-                            print(f"데이터를 {news_category} 테이블에 저장합니다.")
-
-                    except pymysql.err.InternalError:
-                        pass
-                    except pymysql.err.IntegrityError:
-                        pass
+                if table_layout == 'articles':
+                    prepare_articles_table(db_connect)
+                else:
+                    for news_category in news_categories:
+                        prepare_news_table(db_connect, news_category)
             finally:
+                db_connect.close()
 
-
-                self.rules = (Rule(LinkExtractor(allow=(f"oid={news_category}"),
+                self.rules = (Rule(LinkExtractor(allow=tuple(f"oid={news_category}" for news_category in news_categories),
                                                  deny=('news.naver.com/main/tool/print.nhn',
                                                        'media.naver.com/channel/promotion.nhn'),
                                                  restrict_xpaths=(
@@ -113,148 +124,518 @@ class News(CrawlSpider):
 
         super().__init__(*a, **kw)
 
+    @classmethod
+    def update_settings(cls, settings):
+        update_component_settings(cls.custom_settings, settings)
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        # __init__에서는 아직 설정을 읽을 수 없으므로 테이블 구성은 인자로 넘겨준다.
+        kwargs.setdefault('table_layout', crawler.settings.get('NEWS_TABLE_LAYOUT', 'per_outlet'))
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.extractor = ArticleExtractor.from_crawler(crawler, **spider.extractor_options)
+        return spider
+
     def parse_link(self, response):
 
         if "list.nhn" in response.url:
             # 리스트 페이지를 크롤링 한경우, 아무 작업도 하지 않는다.
             # 어차피 LinkExtractor 가 링크는 추출하므로 따로 파싱작업을 할 필요가 없다.
-            print(f"{'*' * 50} [ 기사목록 ] {'*' * 50}")
-            print(f"[{response.url}] 에서 가져왔습니다.")
+            # 목록 페이지마다 출력하던 문구는 진행 상황 출력(metrics.py)과 겹치므로 debug 로그로만 남긴다.
+            self.logger.debug(f"[ 기사목록 ] [{response.url}] 에서 가져왔습니다.")
 
         else:
-            article_type = response.xpath('/html/head/meta[@property="me:feed:serviceId"]/@content').extract_first()
-            items = NewsItem()
-            # 네이버 뉴스에서의 고유의 뉴스기사 ID값 - 일반, 스포츠, 연예 모두 동일
-            urlparsing = urlparse(response.url)
-            url_query = parse_qs(urlparsing.query)
-            items['news_id'] = url_query['aid'][0]
-            items['news_media_code'] = url_query['oid'][0]  # 뉴스 언론사 코드
-
-            # 뉴스기사의 제목 - 일반, 스포츠, 연예 모두 동일
-            items['news_title'] = response.xpath(
-                '/html/head/meta[@property="og:title"]/@content').extract_first()
-
-            # 뉴스기사의 네이버뉴스 URL - 일반, 소포츠, 연예 모두 동일
-            items['news_naver_url'] = response.url
-
-            if article_type is None:
-                article_type = response.xpath('/html/head/meta[@name="twitter:site"]/@content').extract_first()
-
-                # 뉴스기사를 발행한 언론사 이름 - 일반, 연예 동일
-                items['news_site'] = response.xpath(
-                    '/html/head/meta[@name="twitter:creator"]/@content').extract_first()
-
-                if article_type == "네이버 TV연예":
-                    print(f"{'*' * 50} [ 연예기사 ] {'*' * 50}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = "TV연예"
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                          'div[@class="article_info"]/span[@class="author"]/em/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    items['news_original_url'] = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                                                'div[@class="article_info"]/a/@href').extract_first()
-
-                    # 뉴스기사의 내용
-                    content_tmp = response.xpath('//*[@id="articeBody"]/text()').extract()
-                    for line in content_tmp:  # 저작권 라인 제거
-                        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                            inx = content_tmp.index(line)
-                            del content_tmp[inx]
-                    items['news_content'] = " ".join((" ".join(content_tmp)).split())
+            started = time.perf_counter()
+            layout, fields = self.extractor.extract_response(response)
+            # 기사마다 출력하던 문구 대신 metrics.py에서 레이아웃과 추출 시간을 모아서 진행 상황을 출력한다.
+            response.meta['layout'] = layout
+            response.meta['parse_time'] = time.perf_counter() - started
+            items = NewsItem(**fields)
+
+            self.crawler.stats.inc_value(f"news/{items.news_media_code}/items")
+            yield items
 
-                else:
-                    print(f"{'*' * 50} [ 일반기사 ] {'*' * 50}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = response.xpath(
-                        '/html/head/meta[@property="me2:category2"]/@content').extract_first()
-
-                    # 만약 카테고리가 속보인 경우 원본 기사에서 지정한 카테고리로 설정한다.
-                    if items['news_category'] is None or items['news_category'] == "속보":
-                        items['news_category'] = response.xpath(
-                            '//*[@id="articleBody"]/div[@class="guide_categorization"]/a/em/text()').extract_first()
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                          '/div[@class="article_info"]'
-                                          '/div/span[@class="t11"][1]/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    items['news_original_url'] = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                                                '/div[@class="article_info"]/div/a[1]/@href').extract_first()
-
-                    # 뉴스기사의 내용
-                    content_tmp = response.xpath('//*[@id="articleBodyContents"]/text()').extract()
-                    for line in content_tmp:  # 저작권 라인 제거
-                        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                            inx = content_tmp.index(line)
-                            del content_tmp[inx]
-                    items['news_content'] = " ".join((" ".join(content_tmp)).split())
-
-            else:
-                print(f"{'*' * 50} [ 스 포 츠 ] {'*' * 50}")
-
-                # 뉴스기사를 발행한 언론사 이름
-                site_tmp = response.xpath(
-                    '/html/head/meta[@property="og:article:author"]/@content').extract_first()
-                items['news_site'] = site_tmp.replace("네이버 스포츠 | ", "")
-
-                # 뉴스기사의 카테고리
-                items['news_category'] = "스포츠"
-
-                # 뉴스기사 발행 시간
-                date = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                      'div/div[@class="news_headline"]/div[@class="info"]/span[1]/text()').extract_first()
-                try:
-                    date = date.replace("기사입력 ", "")
-                    date = date.replace("오전", "AM")
-                    date = date.replace("오후", "PM")
-                    date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                    items['news_date'] = date_time_obj
-                except AttributeError:
-                    items['news_date'] = date
-
-                # 뉴스기사의 언론사 원본 URL
-                items['news_original_url'] = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                                            'div/div[@class="news_headline"]/div[@class="info"]/a/@href').extract_first()
-
-                # 뉴스기사의 내용
-                content_tmp = response.xpath('//*[@id="newsEndContents"]/text()').extract()
-                for line in content_tmp:  # 저작권 라인 제거
-                    if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                        inx = content_tmp.index(line)
-                        del content_tmp[inx]
-                items['news_content'] = " ".join((" ".join(content_tmp)).split())
-
-            # 뉴스기사를 작성한 기자
-            items['news_author'] = ""
 
-            yield items
+class NewsListSpider(scrapy.Spider):
+    """
+    News_manual, News_manual_mongo 공통 부분
+    start ~ end 사이의 날짜를 처음에 모두 계산해두고, (언론사, 날짜)별 기사목록(list.nhn) 페이지를 동시에 크롤링한다.
+    -a max_dates=(동시에 크롤링할 최대 (언론사, 날짜) 수, 기본값 8)
+    -a paging=(serial 또는 concurrent, 기본값 serial)
+    -a weights=(언론사별 가중치, 001:3,003:2 형식, 기본값 모두 1)
+
+    한 날짜의 마지막 페이지까지 크롤링이 끝나면 대기 중인 다음 날짜를 시작한다.
+    여러 언론사를 크롤링할 때는 (진행 중인 날짜 수 / 가중치)가 가장 작은 언론사의 날짜를 먼저 시작하므로
+    기사가 많은 언론사 하나가 다른 언론사를 계속 밀어내지 않는다.
+    paging=serial 이면 N페이지를 처리한 다음에 N+1페이지를 요청하고,
+    paging=concurrent 이면 1페이지에서 그 날짜의 마지막 페이지를 알아낸 다음 나머지 페이지를 한번에 요청한다.
+
+    -a queue=(작업 큐 주소, 예: sqlite:///work.db, redis://host:6379/0)
+    -a lease_timeout=(작업 임대 시간(초), 기본값 600)
+    queue를 지정하면 start, end 대신 작업 큐(work_queue.py)에서 (언론사, 날짜)를 임대해서 크롤링하고,
+    날짜가 끝나면 완료 처리한다. 여러 서버에서 같은 큐를 지정하면 작업이 나눠진다.
+    날짜의 완료는 목록 페이지를 모두 처리하고, 그 날짜에서 요청한 기사가 모두 저장(또는 실패)된 다음에 기록한다.
+    임대할 작업이 없어도 다른 워커가 임대 중인 작업이 남아있으면 종료하지 않고 기다리다가,
+    그 워커가 죽어서 임대 시간이 지난 작업을 가져와서 크롤링한다.
+    이때 category에는 큐에 등록한 언론사를 모두 포함해야 한다. (테이블 확인, 이미 저장된 기사 확인용)
+
+    -a checkpoint=(체크포인트 파일 경로, 예: checkpoint/001.db)
+    checkpoint를 지정하면 처리가 끝난 (언론사, 날짜, 페이지)와 아직 아이템이 나오지 않은 기사 요청을 기록한다.
+    같은 파일로 다시 실행하면 끝난 날짜와 목록 페이지는 건너뛰고, 끝나지 않은 요청만 다시 보낸다. (checkpoint.py 참고)
+    배치로 저장하는 파이프라인(NewsBatchPipeline, MongodbPipeline 등)을 사용하면 기사는 DB에 commit된 다음에 끝난 것으로 기록한다.
+
+    -a incremental=(언론사별 최신 기사 기록 파일 경로, 예: state/high_water.json)
+    incremental을 지정하면 start, end 없이 오늘부터 지난번에 저장한 가장 최신 기사의 날짜까지만 크롤링한다.
+    목록 페이지를 최신순으로 한 페이지씩 보다가, 페이지의 기사가 모두 지난번 기록(news_id) 이하이면 그 날짜는 멈춘다.
+    스파이더가 정상 종료되면 새로 저장한 가장 최신 기사로 기록을 갱신한다. (high_water.py 참고)
+    배치로 저장하는 파이프라인을 사용하면 commit된(items_stored) 기사로만 갱신하고,
+    저장하지 못한 기사가 있는 언론사는 다음 실행에서 다시 보도록 기록을 그대로 둔다.
+    """
+    LAST_PAGE_PROBE = 10000  # 네이버는 마지막 페이지보다 큰 페이지를 요청하면 마지막 페이지를 보여준다.
+
+    def __init__(self, max_dates=8, paging='serial', weights=None, queue=None, lease_timeout=600,
+                 checkpoint=None, incremental=None, *a, **kw):
+        super().__init__(*a, **kw)
+        self.max_dates = int(max_dates)
+        self.paging = paging
+        self.weights = parse_weights(weights)
+        self.high_water = None
+        self.high_water_dates = dict()  # {(언론사, aid): 기사 날짜} - 저장이 확인되면 기록을 갱신할 기사
+        if incremental is not None:
+            # 최신 기사부터 한 페이지씩 확인해야 하므로 페이징은 serial로 고정한다.
+            self.high_water = HighWaterMark(incremental)
+            self.paging = 'serial'
+            self.today = datetime.datetime.now(KST).strftime('%Y%m%d')
+            print(f"증분 크롤링 : [{incremental}] 에 기록된 최신 기사 이후만 크롤링합니다.")
+        self.work_queue = None
+        if queue is not None:
+            self.work_queue = open_work_queue(queue, lease_timeout=int(lease_timeout))
+            # 목록 페이지를 다 보고 기사 저장을 기다리는 동안에도 임대가 끝나지 않도록 주기적으로 연장한다.
+            self.renew_task = task.LoopingCall(self.renew_leases)
+            self.renew_interval = max(1, int(lease_timeout) // 3)
+            self.worker_id = f'{socket.gethostname()}-{os.getpid()}'
+            print(f"작업 큐 [{queue}] 에서 작업을 가져옵니다. (워커 : {self.worker_id})")
+        # 언론사별로 아직 시작하지 않은 날짜, 작업 큐를 사용하는 경우에는 큐에서 가져온다.
+        self.pending_dates = {oid: deque(self.initial_dates(oid)) for oid in self.news_categories}
+        self.open_dates = dict()  # {(언론사, 날짜): 응답을 기다리는 목록 페이지 요청 수}
+        self.open_per_oid = {oid: 0 for oid in self.news_categories}  # 언론사별 진행 중인 날짜 수
+        self.started_per_oid = {oid: 0 for oid in self.news_categories}  # 언론사별 시작한 날짜 수
+        self.page_signatures = dict()  # {(언론사, 날짜): 이미 처리한 목록 페이지의 기사 id 묶음} - 같은 페이지가 반복되는지 확인용
+        self.failed_dates = set()  # 목록 페이지 요청이 실패한 (언론사, 날짜)
+        # 작업 큐를 사용할 때 날짜별로 저장을 기다리는 기사 - 모두 끝나야 작업을 완료 처리한다.
+        self.open_articles = dict()  # {(언론사, 날짜): 저장을 기다리는 기사 수}
+        self.article_units = dict()  # {(언론사, aid): 날짜}
+        self.failed_units = set()  # 목록 페이지나 기사를 가져오지 못한 (언론사, 날짜), 완료하지 않고 큐로 되돌린다.
+        self.waiting_leased = None  # 다른 워커가 임대 중인 작업 수 (종료하지 않고 기다리는 중)
+
+        self.checkpoint = None
+        self.done_dates = set()  # 체크포인트에 완료로 기록된 (언론사, 날짜)
+        if checkpoint is not None:
+            self.checkpoint = Checkpoint(checkpoint)
+            # 새 요청이 없는 동안에도 모아둔 기록을 주기적으로 쓴다.
+            self.checkpoint_task = task.LoopingCall(self.checkpoint.flush)
+            self.done_dates = self.checkpoint.done_dates()
+            for oid, dates in self.pending_dates.items():
+                self.pending_dates[oid] = deque(date for date in dates if (oid, date) not in self.done_dates)
+            print(f"체크포인트 [{checkpoint}] 를 사용합니다. 이미 끝난 날짜 {len(self.done_dates)}개는 건너뜁니다.")
+
+    def initial_dates(self, oid):
+        # 언론사별로 크롤링할 날짜 목록
+        if self.work_queue is not None:
+            return []
+        if self.high_water is not None:
+            return date_range(self.today, self.high_water.date(oid) or self.today)
+        return date_range(self.start_date, self.end_date)
+
+    @classmethod
+    def update_settings(cls, settings):
+        update_component_settings(cls.custom_settings, settings)
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        # __init__에서는 아직 설정을 읽을 수 없으므로 테이블 구성은 인자로 넘겨준다.
+        kwargs.setdefault('table_layout', crawler.settings.get('NEWS_TABLE_LAYOUT', 'per_outlet'))
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.extractor = ArticleExtractor.from_crawler(crawler, **spider.extractor_options)
+        spider.parse_pool = ParsePool.from_crawler(crawler, spider.extractor, spider.extractor_options)
+        # 저장 파이프라인이 아이템을 모아뒀다가 저장하는 경우, item_scraped 시점에는 아직 DB에 없으므로
+        # 파이프라인이 commit한 다음 보내는 items_stored 시그널로 기사가 끝난 것을 기록한다.
+        spider.wait_for_storage = any(
+            getattr(load_object(path), 'sends_items_stored', False)
+            for path in build_component_list(crawler.settings.getwithbase('ITEM_PIPELINES')))
+        if spider.wait_for_storage:
+            crawler.signals.connect(spider.articles_stored, signal=items_stored)
+        else:
+            crawler.signals.connect(spider.article_finished, signal=signals.item_scraped)
+            crawler.signals.connect(spider.article_stored, signal=signals.item_scraped)
+        crawler.signals.connect(spider.article_finished, signal=signals.item_dropped)
+        crawler.signals.connect(spider.article_error, signal=signals.spider_error)
+        crawler.signals.connect(spider.article_request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
+        return spider
+
+    @property
+    def article_callback(self):
+        # NAVER_PARSE_WORKERS를 설정하면 기사 추출을 작업 프로세스에서 하는 parse_article_pooled를 사용한다.
+        return self.parse_article if self.parse_pool is None else self.parse_article_pooled
+
+    async def parse_article_pooled(self, response):
+        # 기사 추출은 작업 프로세스(parse_pool.py)에서 하고, 리액터는 결과를 기다리는 동안 다른 응답을 처리한다.
+        # 추출 시간에는 작업 프로세스를 기다린 시간도 포함된다.
+        started = time.perf_counter()
+        layout, fields = await maybe_deferred_to_future(self.parse_pool.extract(response))
+        yield self.article_item(response, layout, fields, time.perf_counter() - started)
+
+    def article_item(self, response, layout, fields, parse_time):
+        # 기사마다 출력하던 문구 대신 metrics.py에서 레이아웃과 추출 시간을 모아서 진행 상황을 출력한다.
+        response.meta['layout'] = layout
+        response.meta['parse_time'] = parse_time
+        items = NewsItem(**fields)
+        if self.high_water is not None and self.wait_for_storage:
+            # 증분 크롤링 기록은 저장이 확인된 다음(articles_stored) 갱신하므로 그때까지 기사 날짜를 기억해둔다.
+            self.high_water_dates[(items.news_media_code, items.news_id)] = items.news_date
+
+        self.crawler.stats.inc_value(f"news/{items.news_media_code}/items")
+        return items
 
+    def start_requests(self):
+        if self.checkpoint is not None:
+            # 지난번 실행에서 요청했지만 아이템이 나오지 않은 기사를 다시 요청한다.
+            pending = self.checkpoint.pending_articles()
+            if pending:
+                print(f"체크포인트에서 끝나지 않은 기사 요청 {len(pending)}개를 다시 요청합니다.")
+            for oid, aid, url in pending:
+                if aid in self.article_id_list.get(oid, ()):
+                    self.checkpoint.article_done(oid, aid)
+                    continue
+                yield self.article_request(oid, None, aid, url)
+        yield from self.next_dates()
+
+    def next_oid(self):
+        # 대기 중인 날짜가 남은 언론사 중, 가중치 대비 진행 중인 날짜가 가장 적은 언론사를 고른다.
+        # 같으면 가중치 대비 지금까지 시작한 날짜가 적은 언론사를 골라서 돌아가면서 시작되도록 한다.
+        candidates = [oid for oid in self.news_categories if self.pending_dates[oid]]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda oid: (self.open_per_oid[oid] / self.weights.get(oid, 1),
+                                                self.started_per_oid[oid] / self.weights.get(oid, 1)))
+
+    def next_dates(self):
+        # 동시에 열려있는 날짜가 max_dates보다 적으면 대기 중인 날짜를 시작한다.
+        if self.work_queue is not None:
+            # 목록 페이지를 다 보고 기사 저장을 기다리는 날짜도 임대 중인 작업이므로 같이 센다.
+            for oid, date in self.work_queue.lease(self.worker_id, self.max_dates - len(self.leased_units())):
+                if oid not in self.open_per_oid:
+                    self.logger.error(f"[{oid}] 는 category에 없는 언론사입니다. 작업을 되돌립니다.")
+                    self.work_queue.release(self.worker_id, oid, date)
+                    continue
+                if (oid, date) in self.open_dates or (oid, date) in self.open_articles:
+                    # 이미 진행 중인 작업의 임대가 끝났다가 다시 임대된 경우
+                    continue
+                yield from self.open_date(oid, date)
+            return
+
+        while len(self.open_dates) < self.max_dates:
+            oid = self.next_oid()
+            if oid is None:
+                return
+            yield from self.open_date(oid, self.pending_dates[oid].popleft())
+
+    def open_date(self, oid, date):
+        # (언론사, 날짜)의 크롤링을 시작한다.
+        # 체크포인트에 이 날짜의 끝나지 않은 목록 페이지가 있으면 1페이지 대신 그 페이지들을 요청한다.
+        pages = [(1, {})]
+        if self.checkpoint is not None:
+            if (oid, date) not in self.done_dates and self.checkpoint.started(oid, date):
+                pages = self.checkpoint.unfinished_pages(oid, date)
+                if pages:
+                    print(f"[{naver_news_code[oid]}] [{date}] 체크포인트에서 {[page for page, _ in pages]}페이지부터 다시 시작합니다.")
+            if (oid, date) in self.done_dates or not pages:
+                # 이미 끝난 날짜이거나, 목록 페이지는 모두 끝났는데 날짜 완료를 기록하기 전에 종료된 경우
+                self.checkpoint.date_done(oid, date)
+                if self.work_queue is not None:
+                    self.work_queue.ack(self.worker_id, oid, date)
+                return
+
+        self.open_per_oid[oid] += 1
+        self.started_per_oid[oid] += 1
+        for page, meta in pages:
+            yield self.list_request(oid, date, page, **meta)
+
+    def list_request(self, oid, date, page, **meta):
+        self.open_dates[(oid, date)] = self.open_dates.get((oid, date), 0) + 1
+        if self.checkpoint is not None:
+            self.checkpoint.list_requested(oid, date, page, meta)
+        return scrapy.Request(
+            f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
+            f"&listType=summary&oid={oid}&date={date}&page={page}",
+            callback=self.parse_link,
+            errback=self.list_failed,
+            # 실패해서 큐로 되돌린 날짜를 다시 임대하면 같은 목록 페이지를 다시 요청해야 한다.
+            # 페이지 중복은 스파이더가 page_signatures로 직접 확인한다.
+            dont_filter=True,
+            meta=dict(meta, oid=oid, page=page, date=date))
+
+    def list_done(self, oid, date):
+        # 목록 페이지 하나의 처리가 끝났을 때 호출한다.
+        # 그 날짜에 남은 목록 페이지 요청이 없으면 날짜를 닫고 다음 날짜를 시작한다.
+        self.open_dates[(oid, date)] -= 1
+        if self.open_dates[(oid, date)] == 0:
+            del self.open_dates[(oid, date)]
+            self.open_per_oid[oid] -= 1
+            self.page_signatures.pop((oid, date), None)
+            failed = (oid, date) in self.failed_dates
+            self.failed_dates.discard((oid, date))
+            if self.checkpoint is not None and not failed:
+                self.checkpoint.date_done(oid, date)
+                self.done_dates.add((oid, date))
+            if failed:
+                self.failed_units.add((oid, date))
+            self.settle_date(oid, date)
+            self.crawler.stats.inc_value(f'news/{oid}/dates_done')
+            print(f'[{naver_news_code[oid]}] [{date}]날짜의 뉴스 기사 크롤링 완료')
+            yield from self.next_dates()
+
+    def settle_date(self, oid, date):
+        # 목록 페이지와 그 날짜의 기사가 모두 끝났으면 작업 큐에서 완료 처리한다.
+        # 하나라도 가져오지 못했으면 완료하지 않고 큐로 되돌린다.
+        if self.work_queue is None or (oid, date) in self.open_dates or (oid, date) in self.open_articles:
+            return
+        if (oid, date) in self.failed_units:
+            self.failed_units.discard((oid, date))
+            self.work_queue.release(self.worker_id, oid, date)
+        else:
+            self.work_queue.ack(self.worker_id, oid, date)
+
+    def spider_opened(self, spider):
+        if self.work_queue is not None:
+            self.renew_task.start(self.renew_interval, now=False)
+        if self.checkpoint is not None:
+            self.checkpoint_task.start(self.checkpoint.flush_interval, now=False)
+
+    def leased_units(self):
+        # 이 워커가 임대해서 아직 완료하지 않은 작업 (목록 페이지 또는 기사 저장을 기다리는 날짜)
+        return set(self.open_dates) | set(self.open_articles)
+
+    def renew_leases(self):
+        # 이 워커가 임대해서 아직 완료하지 않은 작업의 임대 시간을 연장한다.
+        for oid, date in self.leased_units():
+            self.work_queue.renew(self.worker_id, oid, date)
+
+    def spider_idle(self):
+        # 작업 큐를 사용할 때, 다른 워커가 임대 중인 작업이 있으면 종료하지 않는다.
+        # 그 워커가 죽으면 임대 시간이 지난 뒤 lease에서 다시 대기 상태가 되므로 가져와서 크롤링한다.
+        if self.work_queue is None:
+            return
+        requests = list(self.next_dates())
+        for request in requests:
+            self.crawler.engine.crawl(request)
+        # 이 워커가 임대한 작업 중 아직 완료하지 않은 작업은 종료할 때 파이프라인이 저장하면서 완료된다.
+        own = len(self.leased_units())
+        leased = self.work_queue.status().get('leased', 0) - own
+        if leased > 0 and leased != self.waiting_leased:
+            self.logger.info(f"다른 워커가 임대 중인 작업 {leased}개가 끝나기를 기다립니다.")
+        self.waiting_leased = leased
+        if requests or leased > 0:
+            raise DontCloseSpider
+
+    def list_failed(self, failure):
+        request = failure.request
+        self.logger.error(f"[{request.meta['oid']}] [{request.meta['date']}]의 [{request.meta['page']}]페이지 "
+                          f"요청 실패 : {failure.value}")
+        self.crawler.stats.inc_value(f"news/{request.meta['oid']}/list_pages_failed")
+        # 작업 큐를 사용하는 경우, 목록 페이지를 하나라도 못 가져온 날짜는 완료하지 않고 큐로 되돌린다.
+        self.failed_dates.add((request.meta['oid'], request.meta['date']))
+        if self.high_water is not None:
+            self.high_water.hold(request.meta['oid'])
+        yield from self.list_done(request.meta['oid'], request.meta['date'])
+
+    def article_finished(self, item, **kwargs):
+        # drop된 아이템, 또는 저장 파이프라인이 items_stored를 보내지 않는 경우에는 파이프라인을 지나면 끝난 것으로 본다.
+        adapter = ItemAdapter(item)
+        self.high_water_dates.pop((adapter['news_media_code'], adapter['news_id']), None)
+        self.article_done(adapter['news_media_code'], adapter['news_id'])
+
+    def articles_stored(self, stored, failed, **kwargs):
+        # 저장 파이프라인이 commit한 기사, 저장하지 못한 기사는 체크포인트에 남겨서 다시 실행할 때 요청한다.
+        for oid, aid in stored:
+            if self.high_water is not None:
+                self.high_water.update(oid, aid, self.high_water_dates.pop((oid, aid), None))
+            self.article_done(oid, aid)
+
+        for oid, aid in failed:
+            self.article_settled(oid, aid, failed=True)
+
+    def article_done(self, oid, aid):
+        # 체크포인트에서 끝나지 않은 기사 요청 목록에서 지운다.
+        if self.checkpoint is not None:
+            self.checkpoint.article_done(oid, aid)
+        self.article_settled(oid, aid)
+
+    def article_request(self, oid, date, aid, link):
+        # 작업 큐를 사용하면 날짜별로 저장을 기다리는 기사 수를 센다. (체크포인트에서 다시 보내는 기사는 날짜를 모른다.)
+        counted = self.work_queue is not None and date is not None and (oid, aid) not in self.article_units
+        if counted:
+            self.article_units[(oid, aid)] = date
+            self.open_articles[(oid, date)] = self.open_articles.get((oid, date), 0) + 1
+        return scrapy.Request(link, callback=self.article_callback, errback=self.article_failed,
+                              meta={'article': (oid, aid), 'article_counted': counted})
+
+    def article_settled(self, oid, aid, failed=False):
+        # 작업 큐 : 기사가 저장되거나 실패하면 날짜의 남은 기사 수를 줄이고, 남은 기사가 없으면 작업을 완료 처리한다.
+        if failed and self.high_water is not None:
+            # 가져오거나 저장하지 못한 기사가 있으면 그 언론사의 증분 크롤링 기록은 갱신하지 않는다.
+            self.high_water_dates.pop((oid, aid), None)
+            self.high_water.hold(oid)
+        date = self.article_units.pop((oid, aid), None)
+        if date is None:
+            return
+        if failed:
+            self.failed_units.add((oid, date))
+        self.open_articles[(oid, date)] -= 1
+        if self.open_articles[(oid, date)] == 0:
+            del self.open_articles[(oid, date)]
+            self.settle_date(oid, date)
+
+    def article_failed(self, failure):
+        oid, aid = failure.request.meta['article']
+        self.logger.error(f"[{oid}] [{aid}] 기사 요청 실패 : {failure.value}")
+        self.crawler.stats.inc_value(f"news/{oid}/articles_failed")
+        self.article_settled(oid, aid, failed=True)
+
+    def article_error(self, failure, response, spider):
+        # 기사 추출 중 에러가 나서 아이템이 나오지 않은 경우
+        if 'article' in response.meta:
+            self.article_settled(*response.meta['article'], failed=True)
+
+    def article_request_dropped(self, request, spider):
+        # 날짜별 기사 수에 들어간 요청이 먼저 보낸 같은 기사 요청과 중복이라 버려진 경우
+        if request.meta.get('article_counted'):
+            self.article_settled(*request.meta['article'])
+
+    def article_stored(self, item, **kwargs):
+        # 저장 파이프라인이 items_stored를 보내지 않는 경우, 파이프라인을 지난 기사로 증분 크롤링 기록을 갱신한다.
+        if self.high_water is not None:
+            adapter = ItemAdapter(item)
+            self.high_water.update(adapter['news_media_code'], adapter['news_id'], adapter.get('news_date'))
+
+    def closed(self, reason):
+        if self.high_water is not None and reason == 'finished':
+            # 중간에 멈춘 경우에는 빠진 기사가 있을 수 있으므로 기록을 갱신하지 않는다.
+            self.high_water.save()
+        if self.work_queue is not None:
+            if self.renew_task.running:
+                self.renew_task.stop()
+            self.work_queue.close()
+        if self.checkpoint is not None:
+            if self.checkpoint_task.running:
+                self.checkpoint_task.stop()
+            self.checkpoint.close()
+        if self.parse_pool is not None:
+            self.parse_pool.close()
 
-class News_manual(scrapy.Spider):
+    def parse_link(self, response):
+        # lint.nhn의 뉴스 기사 링크를 추출하는 파서
+        # 추출시 페이징부분도 처리를 해서 리스트 페이지도 추출한다.
+        oid = response.meta['oid']  # 현재 리스트 페이지의 언론사 코드
+        crawl_date = response.meta['date']  # 현재 리스트 페이지의 참조 날짜
+        crawl_page = response.meta['page']  # 현재 리스트 페이지의 참조 페이지
+
+        links = response.xpath('//*[@id="main_content"]/'
+                               'div[@class="list_body newsflash_body"]/'
+                               'ul[@class="type06_headline" or @class="type06"]/li/dl/dt[1]/a/@href').extract()
+
+        print(f'[{oid}] [{crawl_date}]의 [{crawl_page}]페이지를 크롤링하는 중입니다.. [{len(links)}]개의 기사를 가져왔습니다.')
+        self.crawler.stats.inc_value(f'news/{oid}/list_pages')
+        if self.work_queue is not None:
+            self.work_queue.renew(self.worker_id, oid, crawl_date)
+
+        # 빈 페이지이거나 이미 처리한 페이지와 같은 내용이면 기사도, 다음 페이지도 요청하지 않는다.
+        article_ids = [parse_qs(urlparse(link).query)['aid'][0] for link in links]
+        signature = frozenset(article_ids)
+        seen_pages = self.page_signatures.setdefault((oid, crawl_date), set())
+        if not signature or signature in seen_pages:
+            if self.checkpoint is not None:
+                self.checkpoint.list_done(oid, crawl_date, crawl_page)
+            yield from self.list_done(oid, crawl_date)
+            return
+        seen_pages.add(signature)
+
+        # 증분 크롤링 : 페이지의 기사가 모두 지난번 기록 이하이면 이미 저장된 페이지이므로 이 날짜는 여기서 멈춘다.
+        high_water_id = self.high_water.news_id(oid) if self.high_water is not None else None
+        if high_water_id is not None and all(int(arti_id) <= high_water_id for arti_id in article_ids):
+            print(f'[{oid}] [{crawl_date}]의 [{crawl_page}]페이지는 이미 저장된 기사들입니다. 증분 크롤링을 멈춥니다.')
+            if self.checkpoint is not None:
+                self.checkpoint.list_done(oid, crawl_date, crawl_page)
+            yield from self.list_done(oid, crawl_date)
+            return
+
+        # 이 부분에서 리스트 페이지의 뉴스기사 링크를 추출한다.
+        # parse_article로 값을 넘겨 뉴스 정보들을 추출해야 한다.
+        article_id_list = self.article_id_list.get(oid, ())
+        for link, arti_id in zip(links, article_ids):
+            if high_water_id is not None and int(arti_id) <= high_water_id:
+                continue
+            if arti_id not in article_id_list:
+                self.crawler.stats.inc_value(f'news/{oid}/articles_requested')
+                if self.checkpoint is not None:
+                    self.checkpoint.article_requested(oid, arti_id, crawl_date, link)
+                yield self.article_request(oid, crawl_date, arti_id, link)
+
+        # 페이징 처리 부분이다.
+        paging = response.xpath('//*[@id="main_content"]/div[@class="paging"]/a[@class="nclicks(fls.page)"]')
+        last_page = response.xpath(
+            '//*[@id="main_content"]/div[@class="paging"]/a[@class="next nclicks(fls.page)"]/text()').extract_first()
+        page_list = []
+        for a in paging:
+            val = a.xpath('text()').extract_first()
+            page_list.append(int(val))
+        try:
+            max_page = max(page_list)
+        except ValueError:
+            max_page = 1
+
+        if self.paging == 'concurrent':
+            yield from self.paginate_concurrent(response, oid, crawl_date, crawl_page, max_page, last_page)
+        elif int(crawl_page) < max_page:
+            yield self.list_request(oid, crawl_date, int(crawl_page) + 1)
+        elif int(crawl_page) > max_page:
+            if last_page is not None:
+                yield self.list_request(oid, crawl_date, int(crawl_page) + 1)
+
+        # 이 목록 페이지에서 나올 요청은 모두 나왔으므로 체크포인트에 완료로 기록한다.
+        if self.checkpoint is not None:
+            self.checkpoint.list_done(oid, crawl_date, crawl_page)
+
+        # 날짜 이동은 start_requests에서 미리 계산한 날짜 목록으로 처리한다.
+        yield from self.list_done(oid, crawl_date)
+
+    def paginate_concurrent(self, response, oid, crawl_date, crawl_page, max_page, last_page):
+        """
+        paging=concurrent 일 때의 페이징 처리
+        1페이지 : 페이징 영역에 보이는 페이지를 모두 요청하고, 다음(next) 버튼이 있으면 마지막 페이지를 알아내기 위해
+                  아주 큰 페이지 번호(LAST_PAGE_PROBE)를 요청한다.
+        마지막 페이지 확인 요청 : 응답에 표시된 현재 페이지가 마지막 페이지이므로, 아직 요청하지 않은 페이지를 모두 요청한다.
+        """
+        if crawl_page == 1:
+            for page in range(2, max_page + 1):
+                yield self.list_request(oid, crawl_date, page)
+            if last_page is not None:
+                yield self.list_request(oid, crawl_date, self.LAST_PAGE_PROBE, requested=max_page)
+
+        elif crawl_page == self.LAST_PAGE_PROBE:
+            current = response.xpath('//*[@id="main_content"]/div[@class="paging"]/strong/text()').extract_first()
+            final_page = int(current) if current is not None else max_page
+            # 1페이지에서 페이징 영역에 보였던 페이지까지는 이미 요청했고, 마지막 페이지는 지금 처리한 응답이다.
+            for page in range(response.meta['requested'] + 1, final_page):
+                yield self.list_request(oid, crawl_date, page)
+
+class News_manual(NewsListSpider):
     """
     뉴스기사 크롤링 스파이더, LinkExtractor를 사용하지 않는 버전
     정해진 기간의 뉴스 기사를 크롤링하며, 어떤 언론사를 크롤링할지는 입력받는다.
-    -a category=(언론사 코드)
+    -a category=(언론사 코드, 여러 언론사는 001,003 처럼 쉼표로 구분, 전체는 all)
     -a start=(시작 날짜)
     -a end=(끝나는 날짜)
 
@@ -264,6 +645,7 @@ class News_manual(scrapy.Spider):
     그 이유는 최신뉴스 -> 과거뉴스 순으로 크롤링하도록 구성했기 때문..
     """
     name = 'newsmanual'  # 스파이더 이름 지정, 호출시에 사용하는 용도이다. 각 스파이더를 구분지어주기도 함
+    extractor_options = {'body': 'text'}  # 기사 페이지 추출기 옵션 (navernews/extractor.py), 추출기는 from_crawler에서 만든다.
 
     custom_settings = {  # 기본적인 세팅값을 설정한다.
         'ROBOTSTXT_OBEY': False,  # Robots.txt 파일의 권장사항을 지킬것인지 설정
@@ -279,28 +661,32 @@ class News_manual(scrapy.Spider):
             'scrapy_fake_useragent.middleware.RandomUserAgentMiddleware': 400,
         },
         'RANDOM_UA_DESKTOP_ONLY ': True,
-        'ITEM_PIPELINES': {  # Spider가 사용할 Pipeline 설정
-            'navernews.pipelines.NewsPipeline': 300
+        'ITEM_PIPELINES': {  # Spider가 사용할 Pipeline 설정, 연결 하나로 모아서 저장한다. (MYSQL_BATCH_SIZE, MYSQL_FLUSH_INTERVAL)
+            'navernews.pipelines.NewsBatchPipeline': 300
         },
         'CONCURRENT_REQUESTS_PER_DOMAIN': 16,  # default: 16
         'CONCURRENT_REQUESTS_PER_IP': 16,  # default: 16
         'CONCURRENT_REQUESTS': 32,  # default: 16
     }
 
-    def __init__(self, category=None, start=None, end=None, *a, **kw):  # Spider가 생성될때의 초기화
+    def __init__(self, category=None, start=None, end=None, seen_dir='seen_index', table_layout='per_outlet',
+                 *a, **kw):  # Spider가 생성될때의 초기화
         """
 
-        :param category: 크롤링하는 언론사 코드
+        :param category: 크롤링하는 언론사 코드, 여러 언론사는 쉼표로 구분(001,003)하고 전체는 all
         :param start: 크롤링 시작하는 날짜(미래) - 미래에서 과거로 크롤링함, 2020/03/24 형식
         :param end: 크롤링 끝나는 날짜(과거)
+        :param seen_dir: 이미 저장된 기사 인덱스(SeenIndex) 스냅샷을 저장할 폴더
+        :param table_layout: 저장할 MySQL 테이블 구성, from_crawler에서 NEWS_TABLE_LAYOUT 설정으로 넘겨준다.
         :param a:
-        :param kw:
+        :param kw: max_dates, paging, weights (NewsListSpider 참고)
         """
 
         print("*" * 100)
         print("뉴스 스파이더를 실행합니다.")
-        self.news_category = category
-        print(f"크롤링하는 언론사는 [{naver_news_code[self.news_category]}]({self.news_category}) 입니다.")
+        self.news_categories = parse_categories(category)
+        for news_category in self.news_categories:
+            print(f"크롤링하는 언론사는 [{naver_news_code[news_category]}]({news_category}) 입니다.")
         print(f"크롤링하는 기간은 {start} ~ {end} 입니다.")
         self.start_date = start
         self.end_date = end
@@ -308,62 +694,33 @@ class News_manual(scrapy.Spider):
 
         db_connect = connection_db()
 
-        self.article_id_list = dict()
+        self.article_id_list = dict()  # {언론사 코드: SeenIndex}
 
         if db_connect.open:
             print("데이터베이스 연결 성공")
             try:
-                with db_connect.cursor(pymysql.cursors.DictCursor) as cursor:
-                    print("데이터베이스에 테이블이 있는지 확인합니다.")
-                    sql = f"SELECT EXISTS(SELECT 1 FROM Information_schema.tables " \
-                          "WHERE table_schema = 'news' AND TABLE_NAME = %s) AS flag"
-
-                    try:
-                        cursor.execute(sql, (self.news_category))
-                        result = cursor.fetchall()
-
-                        if result[0]['flag'] == 0:
-                            print(f"[{naver_news_code[self.news_category]}]의 {self.news_category} 테이블이 없습니다. 생성합니다.")
-                            sql = f'''
-                                    CREATE TABLE if not exists news.`{self.news_category}` (
-                                        `inx` INT(11) NOT NULL AUTO_INCREMENT,
-                                        `news_id` VARCHAR(255) NOT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_title` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_content` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_author` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_date` TIMESTAMP NULL DEFAULT NULL,
-                                        `news_category` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_original_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_site` VARCHAR(30) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        `news_naver_url` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_unicode_ci',
-                                        PRIMARY KEY (`inx`),
-                                        UNIQUE INDEX `inx` (`inx`),
-                                        UNIQUE INDEX `naver_news_id_uindex` (`news_id`)
-                                    )
-                                    COLLATE='utf8mb4_unicode_ci'
-                                    ENGINE=InnoDB
-                                    '''
-                            cursor.execute(sql)
-
-                        else:
-                            print(f"[{naver_news_code[self.news_category]}]의 {self.news_category} 테이블이 이미 있습니다.")
-                            print(f"데이터를 {self.news_category} 테이블에 저장합니다.")
-
-                            with db_connect.cursor(pymysql.cursors.Cursor) as curs:
-                                sql = f'SELECT news_id FROM news.`{self.news_category}`'
-                                curs.execute(sql)
-                                result = curs.fetchall()
-                                for idx in result:
-                                    self.article_id_list[idx[0]] = ""
-                                print(f'데이터베이스에 이미 저장된 게시글 수 : {len(self.article_id_list)}개')
-
-                    except pymysql.err.InternalError:
-                        pass
-                    except pymysql.err.IntegrityError:
-                        pass
+                if table_layout == 'articles':
+                    created = prepare_articles_table(db_connect)
+                for news_category in self.news_categories:
+                    if table_layout == 'articles':
+                        # articles 테이블의 inx는 모든 언론사가 같이 쓰므로 언론사별 테이블의 스냅샷과 섞이지 않게 따로 둔다.
+                        seen_index = SeenIndex.open(os.path.join(seen_dir, f'{news_category}.{ARTICLES_TABLE}.idx'))
+                    else:
+                        seen_index = SeenIndex.open(os.path.join(seen_dir, f'{news_category}.idx'))
+                        created = prepare_news_table(db_connect, news_category)
+
+                    # 스냅샷을 열고 마지막 실행 이후에 저장된 기사만 DB에서 읽어온다.
+                    # 테이블을 새로 만든 경우에는 예전 스냅샷이 남아있다면 비워진다.
+                    if table_layout == 'articles':
+                        added = seen_index.refresh(db_connect, ARTICLES_TABLE, media_code=news_category)
+                    else:
+                        added = seen_index.refresh(db_connect, news_category)
+                    seen_index.save()
+                    if not created:
+                        print(f'데이터베이스에 이미 저장된 게시글 수 : {len(seen_index)}개 (새로 읽어온 게시글 {added}개)')
+                    self.article_id_list[news_category] = seen_index
             finally:
                 db_connect.close()
-                pass
             print("*" * 100)
         else:
             print("데이터베이스 연결 실패")
@@ -372,275 +729,18 @@ class News_manual(scrapy.Spider):
 
         super().__init__(*a, **kw)
 
-    def start_requests(self):
-        yield scrapy.Request(
-            f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-            f"&listType=summary&oid={self.news_category}&date={self.start_date}&page=1",
-            callback=self.parse_link,
-            meta={'page': 1, 'date': self.start_date, 'end_date': self.end_date})
-
-    def parse_link(self, response):
-        # lint.nhn의 뉴스 기사 링크를 추출하는 파서
-        # 추출시 페이징부분도 처리를 해서 리스트 페이지도 추출한다.
-        crawl_date = response.meta['date']  # 현재 리스트 페이지의 참조 날짜
-        crawl_page = response.meta['page']  # 현재 리스트 페이지의 참조 페이지
-        end_date = response.meta['end_date']
-
-        headline_list = response.xpath('//*[@id="main_content"]/'
-                                       'div[@class="list_body newsflash_body"]/'
-                                       'ul[@class="type06_headline"]/li')
-        underline_list = response.xpath('//*[@id="main_content"]/'
-                                        'div[@class="list_body newsflash_body"]/'
-                                        'ul[@class="type06"]/li')
-
-        print(
-            f'[{crawl_date}]의 [{crawl_page}]페이지를 크롤링하는 중입니다.. [{len(headline_list) + len(underline_list)}]개의 기사를 가져왔습니다.')
-        # 이 부분에서 리스트 페이지의 뉴스기사 링크를 추출한다.
-        # parse_article로 값을 넘겨 뉴스 정보들을 추출해야 한다.
-        for row in headline_list:
-            link = row.xpath('dl/dt[1]/a/@href').extract_first()
-            urlparsing = urlparse(link)
-            url_query = parse_qs(urlparsing.query)
-            arti_id = url_query['aid'][0]
-            if arti_id not in self.article_id_list:
-                yield scrapy.Request(link, callback=self.parse_article)
-
-        for row in underline_list:
-            link = row.xpath('dl/dt[1]/a/@href').extract_first()
-            urlparsing = urlparse(link)
-            url_query = parse_qs(urlparsing.query)
-            arti_id = url_query['aid'][0]
-            if arti_id not in self.article_id_list:
-                yield scrapy.Request(link, callback=self.parse_article)
-
-        # 페이징 처리 부분이다.
-        paging = response.xpath('//*[@id="main_content"]/div[@class="paging"]/a[@class="nclicks(fls.page)"]')
-        last_page = response.xpath(
-            '//*[@id="main_content"]/div[@class="paging"]/a[@class="next nclicks(fls.page)"]/text()').extract_first()
-        page_list = []
-        for a in paging:
-            val = a.xpath('text()').extract_first()
-            page_list.append(int(val))
-        try:
-            max_page = max(page_list)
-        except ValueError:
-            max_page = 1
-
-        if int(crawl_page) < max_page:
-            next_page = int(crawl_page) + 1
-            yield scrapy.Request(
-                f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                f"&listType=summary&oid={self.news_category}&date={crawl_date}&page={next_page}",
-                callback=self.parse_link,
-                meta={'page': next_page, 'date': crawl_date, 'end_date': end_date})
-        elif int(crawl_page) > max_page:
-            if last_page is not None:
-                next_page = int(crawl_page) + 1
-                yield scrapy.Request(
-                    f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                    f"&listType=summary&oid={self.news_category}&date={crawl_date}&page={next_page}",
-                    callback=self.parse_link,
-                    meta={'page': next_page, 'date': crawl_date, 'end_date': end_date})
-            else:
-                print(f'[{crawl_date}]날짜의 뉴스 기사 크롤링 완료')
-
-        if crawl_page == 1:
-            date_list = response.xpath(
-                '//*[@id="main_content"]/div[@class="pagenavi_day"]/a[@class="nclicks(fls.date)"]')
-            for dt in date_list:
-                url = dt.xpath('@href').extract_first()
-                urlparsing = urlparse(url)
-                url_query = parse_qs(urlparsing.query)
-                datee = url_query['date'][0]
-
-                if int(crawl_date) > int(datee) >= int(end_date):
-                    yield scrapy.Request(
-                        f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                        f"&listType=summary&oid={self.news_category}&date={datee}&page=1",
-                        callback=self.parse_link,
-                        meta={'page': 1, 'date': datee, 'end_date': end_date})
-                    return
-
     def parse_article(self, response):
-        if "list.nhn" in response.url:
-            # 리스트 페이지를 크롤링 한경우, 아무 작업도 하지 않는다.
-            # 어차피 LinkExtractor 가 링크는 추출하므로 따로 파싱작업을 할 필요가 없다.
-            print(f"{'*' * 50} [ 기사목록 ] {'*' * 50}")
-            print(f"[{response.url}] 에서 가져왔습니다.")
-
-        else:
-            article_type = response.xpath('/html/head/meta[@property="me:feed:serviceId"]/@content').extract_first()
-            items = NewsItem()
-            # 네이버 뉴스에서의 고유의 뉴스기사 ID값 - 일반, 스포츠, 연예 모두 동일
-            urlparsing = urlparse(response.url)
-            url_query = parse_qs(urlparsing.query)
-            items['news_id'] = url_query['aid'][0]
-            items['news_media_code'] = url_query['oid'][0]  # 뉴스 언론사 코드
-
-            # 뉴스기사의 제목 - 일반, 스포츠, 연예 모두 동일
-            items['news_title'] = response.xpath(
-                '/html/head/meta[@property="og:title"]/@content').extract_first()
-
-            # 뉴스기사의 네이버뉴스 URL - 일반, 소포츠, 연예 모두 동일
-            items['news_naver_url'] = response.url
-
-            if article_type is None:
-                article_type = response.xpath('/html/head/meta[@name="twitter:site"]/@content').extract_first()
-
-                # 뉴스기사를 발행한 언론사 이름 - 일반, 연예 동일
-                items['news_site'] = response.xpath(
-                    '/html/head/meta[@name="twitter:creator"]/@content').extract_first()
-
-                if article_type == "네이버 TV연예":
-                    print(f"{'*' * 50} [ 연예기사 ] {'*' * 50}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = "TV연예"
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                          'div[@class="article_info"]/span[@class="author"]/em/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    items['news_original_url'] = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                                                'div[@class="article_info"]/a/@href').extract_first()
-
-                    # 연예뉴스 내용
-                    content_tmp = response.xpath('//*[@id="articeBody"]/div/text()').extract()
-                    for line in content_tmp:  # 저작권 라인 제거
-                        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                            inx = content_tmp.index(line)
-                            del content_tmp[inx]
-                    join_content = " ".join((" ".join(content_tmp)).split())
-
-                    if join_content == "":
-                        content_tmp = response.xpath('//*[@id="articeBody"]/text()').extract()
-                        for line in content_tmp:  # 저작권 라인 제거
-                            if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                                inx = content_tmp.index(line)
-                                del content_tmp[inx]
-                        join_content = " ".join((" ".join(content_tmp)).split())
-
-                    items['news_content'] = join_content
-
-                else:
-                    print(f"{'*' * 50} [ 일반기사 ] {'*' * 50}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = response.xpath(
-                        '/html/head/meta[@property="me2:category2"]/@content').extract_first()
-
-                    # 만약 카테고리가 속보인 경우 원본 기사에서 지정한 카테고리로 설정한다.
-                    if items['news_category'] is None or items['news_category'] == "속보":
-                        items['news_category'] = response.xpath(
-                            '//*[@id="articleBody"]/div[@class="guide_categorization"]/a/em/text()').extract_first()
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                          '/div[@class="article_info"]'
-                                          '/div/span[@class="t11"][1]/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    items['news_original_url'] = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                                                '/div[@class="article_info"]/div/a[1]/@href').extract_first()
-
-                    # 뉴스기사의 내용
-                    content_tmp = response.xpath('//*[@id="articleBodyContents"]/div/text()').extract()
-                    for line in content_tmp:  # 저작권 라인 제거
-                        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                            inx = content_tmp.index(line)
-                            del content_tmp[inx]
-                    join_content = " ".join((" ".join(content_tmp)).split())
-
-                    if join_content == "":
-                        content_tmp = response.xpath('//*[@id="articleBodyContents"]/text()').extract()
-                        for line in content_tmp:  # 저작권 라인 제거
-                            if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                                inx = content_tmp.index(line)
-                                del content_tmp[inx]
-                        join_content = " ".join((" ".join(content_tmp)).split())
-
-                    if join_content == "":
-                        content_tmp = response.xpath('//*[@id="articleBodyContents"]/div/span/text()').extract()
-                        for line in content_tmp:  # 저작권 라인 제거
-                            if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                                inx = content_tmp.index(line)
-                                del content_tmp[inx]
-                        join_content = " ".join((" ".join(content_tmp)).split())
-
-                    items['news_content'] = join_content
-
-            else:
-                print(f"{'*' * 50} [ 스 포 츠 ] {'*' * 50}")
-
-                # 뉴스기사를 발행한 언론사 이름
-                site_tmp = response.xpath(
-                    '/html/head/meta[@property="og:article:author"]/@content').extract_first()
-                items['news_site'] = site_tmp.replace("네이버 스포츠 | ", "")
-
-                # 뉴스기사의 카테고리
-                items['news_category'] = "스포츠"
-
-                # 뉴스기사 발행 시간
-                date = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                      'div/div[@class="news_headline"]/div[@class="info"]/span[1]/text()').extract_first()
-                try:
-                    date = date.replace("기사입력 ", "")
-                    date = date.replace("오전", "AM")
-                    date = date.replace("오후", "PM")
-                    date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                    items['news_date'] = date_time_obj
-                except AttributeError:
-                    items['news_date'] = date
-
-                # 뉴스기사의 언론사 원본 URL
-                items['news_original_url'] = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                                            'div/div[@class="news_headline"]/div[@class="info"]/a/@href').extract_first()
-
-                # 스포츠기사 내용
-                content_tmp = response.xpath('//*[@id="newsEndContents"]/div/text()').extract()
-
-                for line in content_tmp:  # 저작권 라인 제거
-                    if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                        inx = content_tmp.index(line)
-                        del content_tmp[inx]
-                join_content = " ".join((" ".join(content_tmp)).split())
-
-                if join_content == "":
-                    content_tmp = response.xpath('//*[@id="newsEndContents"]/text()').extract()
-                    for line in content_tmp:  # 저작권 라인 제거
-                        if "무단전재 및 재배포 금지" in line or "무단 전재 및 재배포 금지" in line or "ⓒ" in line:
-                            inx = content_tmp.index(line)
-                            del content_tmp[inx]
-                    join_content = " ".join((" ".join(content_tmp)).split())
-
-                items['news_content'] = join_content
-
-            # 뉴스기사를 작성한 기자
-            items['news_author'] = ""
-
-            yield items
+        # 목록 페이지는 parse_link에서 처리하므로 여기에는 기사 페이지만 온다. (article_request)
+        started = time.perf_counter()
+        layout, fields = self.extractor.extract_response(response)
+        yield self.article_item(response, layout, fields, time.perf_counter() - started)
 
 
-class News_manual_mongo(scrapy.Spider):
+class News_manual_mongo(NewsListSpider):
     """
     뉴스기사 크롤링 스파이더, LinkExtractor를 사용하지 않는 버전
     정해진 기간의 뉴스 기사를 크롤링하며, 어떤 언론사를 크롤링할지는 입력받는다.
-    -a category=(언론사 코드)
+    -a category=(언론사 코드, 여러 언론사는 001,003 처럼 쉼표로 구분, 전체는 all)
     -a start=(시작 날짜)
     -a end=(끝나는 날짜)
 
@@ -650,6 +750,7 @@ class News_manual_mongo(scrapy.Spider):
     그 이유는 최신뉴스 -> 과거뉴스 순으로 크롤링하도록 구성했기 때문..
     """
     name = 'newsmongo'  # 스파이더 이름 지정, 호출시에 사용하는 용도이다. 각 스파이더를 구분지어주기도 함
+    extractor_options = {'body': 'html', 'check_url': True}  # 기사 페이지 추출기 옵션 (navernews/extractor.py), 추출기는 from_crawler에서 만든다.
 
     custom_settings = {  # 기본적인 세팅값을 설정한다.
         'ROBOTSTXT_OBEY': False,  # Robots.txt 파일의 권장사항을 지킬것인지 설정
@@ -676,253 +777,27 @@ class News_manual_mongo(scrapy.Spider):
     def __init__(self, category=None, start=None, end=None, *a, **kw):  # Spider가 생성될때의 초기화
         """
 
-        :param category: 크롤링하는 언론사 코드
+        :param category: 크롤링하는 언론사 코드, 여러 언론사는 쉼표로 구분(001,003)하고 전체는 all
         :param start: 크롤링 시작하는 날짜(미래) - 미래에서 과거로 크롤링함, 2020/03/24 형식
         :param end: 크롤링 끝나는 날짜(과거)
         :param a:
-        :param kw:
+        :param kw: max_dates, paging, weights (NewsListSpider 참고)
         """
 
         print("*" * 100)
         print("뉴스 스파이더를 실행합니다.")
-        self.news_category = category
-        print(f"크롤링하는 언론사는 [{naver_news_code[self.news_category]}]({self.news_category}) 입니다.")
+        self.news_categories = parse_categories(category)
+        for news_category in self.news_categories:
+            print(f"크롤링하는 언론사는 [{naver_news_code[news_category]}]({news_category}) 입니다.")
         print(f"크롤링하는 기간은 {start} ~ {end} 입니다.")
         self.start_date = start
         self.end_date = end
-        self.article_id_list = dict()
+        self.article_id_list = dict()  # {언론사 코드: 이미 저장된 기사 id}
 
         super().__init__(*a, **kw)
 
-    def start_requests(self):
-        yield scrapy.Request(
-            f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-            f"&listType=summary&oid={self.news_category}&date={self.start_date}&page=1",
-            callback=self.parse_link,
-            meta={'page': 1, 'date': self.start_date, 'end_date': self.end_date})
-
-    def parse_link(self, response):
-        # lint.nhn의 뉴스 기사 링크를 추출하는 파서
-        # 추출시 페이징부분도 처리를 해서 리스트 페이지도 추출한다.
-        crawl_date = response.meta['date']  # 현재 리스트 페이지의 참조 날짜
-        crawl_page = response.meta['page']  # 현재 리스트 페이지의 참조 페이지
-        end_date = response.meta['end_date']
-
-        headline_list = response.xpath('//*[@id="main_content"]/'
-                                       'div[@class="list_body newsflash_body"]/'
-                                       'ul[@class="type06_headline"]/li')
-        underline_list = response.xpath('//*[@id="main_content"]/'
-                                        'div[@class="list_body newsflash_body"]/'
-                                        'ul[@class="type06"]/li')
-
-        print(
-            f'[{crawl_date}]의 [{crawl_page}]페이지를 크롤링하는 중입니다.. [{len(headline_list) + len(underline_list)}]개의 기사를 가져왔습니다.')
-        # 이 부분에서 리스트 페이지의 뉴스기사 링크를 추출한다.
-        # parse_article로 값을 넘겨 뉴스 정보들을 추출해야 한다.
-        for row in headline_list:
-            link = row.xpath('dl/dt[1]/a/@href').extract_first()
-            urlparsing = urlparse(link)
-            url_query = parse_qs(urlparsing.query)
-            arti_id = url_query['aid'][0]
-            if arti_id not in self.article_id_list:
-                yield scrapy.Request(link, callback=self.parse_article)
-
-        for row in underline_list:
-            link = row.xpath('dl/dt[1]/a/@href').extract_first()
-            urlparsing = urlparse(link)
-            url_query = parse_qs(urlparsing.query)
-            arti_id = url_query['aid'][0]
-            if arti_id not in self.article_id_list:
-                yield scrapy.Request(link, callback=self.parse_article)
-
-        # 페이징 처리 부분이다.
-        paging = response.xpath('//*[@id="main_content"]/div[@class="paging"]/a[@class="nclicks(fls.page)"]')
-        last_page = response.xpath(
-            '//*[@id="main_content"]/div[@class="paging"]/a[@class="next nclicks(fls.page)"]/text()').extract_first()
-        page_list = []
-        for a in paging:
-            val = a.xpath('text()').extract_first()
-            page_list.append(int(val))
-        try:
-            max_page = max(page_list)
-        except ValueError:
-            max_page = 1
-
-        if int(crawl_page) < max_page:
-            next_page = int(crawl_page) + 1
-            yield scrapy.Request(
-                f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                f"&listType=summary&oid={self.news_category}&date={crawl_date}&page={next_page}",
-                callback=self.parse_link,
-                meta={'page': next_page, 'date': crawl_date, 'end_date': end_date})
-        elif int(crawl_page) > max_page:
-            if last_page is not None:
-                next_page = int(crawl_page) + 1
-                yield scrapy.Request(
-                    f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                    f"&listType=summary&oid={self.news_category}&date={crawl_date}&page={next_page}",
-                    callback=self.parse_link,
-                    meta={'page': next_page, 'date': crawl_date, 'end_date': end_date})
-            else:
-                print(f'[{crawl_date}]날짜의 뉴스 기사 크롤링 완료')
-
-        if crawl_page == 1:
-            date_list = response.xpath(
-                '//*[@id="main_content"]/div[@class="pagenavi_day"]/a[@class="nclicks(fls.date)"]')
-            for dt in date_list:
-                url = dt.xpath('@href').extract_first()
-                urlparsing = urlparse(url)
-                url_query = parse_qs(urlparsing.query)
-                datee = url_query['date'][0]
-
-                if int(crawl_date) > int(datee) >= int(end_date):
-                    yield scrapy.Request(
-                        f"https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec"
-                        f"&listType=summary&oid={self.news_category}&date={datee}&page=1",
-                        callback=self.parse_link,
-                        meta={'page': 1, 'date': datee, 'end_date': end_date})
-                    return
-
     def parse_article(self, response):
-        if "list.nhn" in response.url:
-            # 리스트 페이지를 크롤링 한경우, 아무 작업도 하지 않는다.
-            # 어차피 LinkExtractor 가 링크는 추출하므로 따로 파싱작업을 할 필요가 없다.
-            print(f"{'*' * 30} [ 기사목록 ] {'*' * 30}")
-            print(f"[{response.url}] 에서 가져왔습니다.")
-
-        else:
-            article_type = response.xpath('/html/head/meta[@property="me:feed:serviceId"]/@content').extract_first()
-            items = NewsItem()
-            # 네이버 뉴스에서의 고유의 뉴스기사 ID값 - 일반, 스포츠, 연예 모두 동일
-            urlparsing = urlparse(response.url)
-            url_query = parse_qs(urlparsing.query)
-            items['news_id'] = url_query['aid'][0]
-            items['news_media_code'] = url_query['oid'][0]  # 뉴스 언론사 코드
-
-            # 뉴스기사의 제목 - 일반, 스포츠, 연예 모두 동일
-            items['news_title'] = response.xpath(
-                '/html/head/meta[@property="og:title"]/@content').extract_first()
-
-            # 뉴스기사의 네이버뉴스 URL - 일반, 소포츠, 연예 모두 동일
-            items['news_naver_url'] = response.url
-
-            if article_type is None:
-                article_type = response.xpath('/html/head/meta[@name="twitter:site"]/@content').extract_first()
-
-                # 뉴스기사를 발행한 언론사 이름 - 일반, 연예 동일
-                items['news_site'] = response.xpath(
-                    '/html/head/meta[@name="twitter:creator"]/@content').extract_first()
-
-                if article_type == "네이버 TV연예":
-                    print(f"{'*' * 30} [ 연예기사 ] {'*' * 30}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = "TV연예"
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                          'div[@class="article_info"]/span[@class="author"]/em/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    ori_url = response.xpath('//*[@id="content"]/div[@class="end_ct"]/div/'
-                                             'div[@class="article_info"]/a/@href').extract_first()
-                    try:
-                        if 'http://' in ori_url or 'https://' in ori_url:
-                            items['news_original_url'] = ori_url
-                        else:
-                            items['news_original_url'] = ""
-                    except TypeError:
-                        items['news_original_url'] = ""
-
-                    # 연예뉴스 내용
-                    content_tmp = response.xpath('//*[@id="articeBody"]').extract_first()
-                    items['news_content'] = clean_html(content_tmp)
-
-                else:
-                    print(f"{'*' * 30} [ 일반기사 ] {'*' * 30}")
-
-                    # 뉴스기사의 카테고리
-                    items['news_category'] = response.xpath(
-                        '/html/head/meta[@property="me2:category2"]/@content').extract_first()
-
-                    # 만약 카테고리가 속보인 경우 원본 기사에서 지정한 카테고리로 설정한다.
-                    if items['news_category'] is None or items['news_category'] == "속보":
-                        items['news_category'] = response.xpath(
-                            '//*[@id="articleBody"]/div[@class="guide_categorization"]/a/em/text()').extract_first()
-
-                    # 뉴스기사 발행 시간
-                    date = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                          '/div[@class="article_info"]'
-                                          '/div/span[@class="t11"][1]/text()').extract_first()
-                    try:
-                        date = date.replace("오전", "AM")
-                        date = date.replace("오후", "PM")
-                        date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                        items['news_date'] = date_time_obj
-                    except AttributeError:
-                        items['news_date'] = date
-
-                    # 뉴스기사의 언론사 URL
-                    ori_url = response.xpath('//*[@id="main_content"]/div[@class="article_header"]'
-                                             '/div[@class="article_info"]/div/a[1]/@href').extract_first()
-                    try:
-                        if 'http://' in ori_url or 'https://' in ori_url:
-                            items['news_original_url'] = ori_url
-                        else:
-                            items['news_original_url'] = ""
-                    except TypeError:
-                        items['news_original_url'] = ""
-
-                    # 뉴스기사의 내용
-                    news_content = response.xpath('//*[@id="articleBodyContents"]').extract_first()
-                    items['news_content'] = clean_html(news_content)
-
-            else:
-                print(f"{'*' * 30} [ 스 포 츠 ] {'*' * 30}")
-
-                # 뉴스기사를 발행한 언론사 이름
-                site_tmp = response.xpath(
-                    '/html/head/meta[@property="og:article:author"]/@content').extract_first()
-                items['news_site'] = site_tmp.replace("네이버 스포츠 | ", "")
-
-                # 뉴스기사의 카테고리
-                items['news_category'] = "스포츠"
-
-                # 뉴스기사 발행 시간
-                date = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                      'div/div[@class="news_headline"]/div[@class="info"]/span[1]/text()').extract_first()
-                try:
-                    date = date.replace("기사입력 ", "")
-                    date = date.replace("오전", "AM")
-                    date = date.replace("오후", "PM")
-                    date_time_obj = datetime.datetime.strptime(date, '%Y.%m.%d. %p %I:%M')
-                    items['news_date'] = date_time_obj
-                except AttributeError:
-                    items['news_date'] = date
-
-                # 뉴스기사의 언론사 URL
-                ori_url = response.xpath('//*[@id="content"]/div/div[@class="content"]/'
-                                         'div/div[@class="news_headline"]/div[@class="info"]/a/@href').extract_first()
-                try:
-                    if 'http://' in ori_url or 'https://' in ori_url:
-                        items['news_original_url'] = ori_url
-                    else:
-                        items['news_original_url'] = ""
-                except TypeError:
-                    items['news_original_url'] = ""
-
-                # 스포츠기사 내용
-                content_tmp = response.xpath('//*[@id="newsEndContents"]').extract_first()
-                items['news_content'] = clean_html(content_tmp)
-
-            # 뉴스기사를 작성한 기자
-            items['news_author'] = ""
-
-            yield items
+        # 목록 페이지는 parse_link에서 처리하므로 여기에는 기사 페이지만 온다. (article_request)
+        started = time.perf_counter()
+        layout, fields = self.extractor.extract_response(response)
+        yield self.article_item(response, layout, fields, time.perf_counter() - started)
@@ -0,0 +1,199 @@
+"""
+목록 페이지 / 기사 페이지별 동시 요청 수와 딜레이를 응답 상태에 따라 조절하는 다운로더 미들웨어
+스파이더마다 DOWNLOAD_DELAY(0.1 ~ 0.25)와 동시 요청 수(16 / 32)가 고정되어 있고, 목록 페이지와 기사 페이지가
+같은 도메인 슬롯을 같이 쓰기 때문에 느린 목록 페이지 뒤에 기사 요청이 밀린다.
+이 미들웨어는 요청을 'news.naver.com/list', 'news.naver.com/article' 슬롯으로 나누고, 슬롯마다
+
+1. NAVER_THROTTLE_INTERVAL초마다 그동안 받은 응답의 평균 응답 시간과 에러 비율을 보고
+   - 목표(target_latency, NAVER_THROTTLE_TARGET_ERROR_RATE)보다 나쁘면 동시 요청 수를 3/4로 줄이고 딜레이를 1.5배로 늘린다.
+   - 목표 안이면 동시 요청 수를 1 늘리고 딜레이를 0.8배로 줄인다. (AIMD)
+2. 403 / 429 (NAVER_THROTTLE_CODES) 응답을 받으면 기다리지 않고 바로 동시 요청 수를 절반으로, 딜레이를 두 배(최소 1초)로 줄인다.
+   그 뒤 NAVER_THROTTLE_INTERVAL초 동안은 다시 늘리지 않는다.
+
+현재 값과 결정은 stats에 남는다.
+    throttle/<list|article>/concurrency, delay, latency   : 현재 동시 요청 수, 딜레이, 마지막 구간의 평균 응답 시간
+    throttle/<list|article>/increase, decrease, backoff  : 결정 횟수
+    throttle/<list|article>/throttled, errors             : 403/429 응답 수, 에러(5xx, 연결 실패) 수
+
+    NAVER_THROTTLE_ENABLED = True
+    DOWNLOADER_MIDDLEWARES = {'navernews.throttle.AdaptiveThrottle': 560}
+
+settings.py의 DOWNLOADER_MIDDLEWARES는 스파이더의 custom_settings 목록과 합쳐진다. (NewsSpider.update_component_settings)
+한 번만 켜보려면 -s NAVER_THROTTLE_ENABLED=True와 함께 settings.py에 미들웨어를 넣어둔다.
+"""
+import logging
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from navernews.httpcache import cache_key
+
+logger = logging.getLogger(__name__)
+
+# 종류별 기본값, NAVER_THROTTLE_ENDPOINTS에 덮어쓴다.
+DEFAULT_ENDPOINTS = {
+    'list': {'concurrency': 4, 'min_concurrency': 1, 'max_concurrency': 8,
+             'delay': 0.25, 'min_delay': 0.05, 'max_delay': 30.0, 'target_latency': 1.0},
+    'article': {'concurrency': 16, 'min_concurrency': 2, 'max_concurrency': 32,
+                'delay': 0.1, 'min_delay': 0.0, 'max_delay': 30.0, 'target_latency': 0.5},
+}
+
+
+class Endpoint(object):
+    # 슬롯 하나의 현재 값과 이번 구간에 받은 응답 기록
+
+    def __init__(self, name, concurrency, min_concurrency, max_concurrency, delay, min_delay, max_delay,
+                 target_latency):
+        self.name = name
+        self.slot = f'news.naver.com/{name}'
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.cooldown_until = 0.0
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+
+
+class AdaptiveThrottle(object):
+    """
+    settings
+        NAVER_THROTTLE_ENABLED            : True이면 사용
+        NAVER_THROTTLE_ENDPOINTS          : 종류별 설정 dict, DEFAULT_ENDPOINTS에 덮어쓴다.
+        NAVER_THROTTLE_TARGET_ERROR_RATE  : 목표 에러 비율 (기본 0.02)
+        NAVER_THROTTLE_INTERVAL           : 몇 초마다 조절할지 (기본 5)
+        NAVER_THROTTLE_CODES              : 바로 줄일 응답 코드 (기본 [403, 429])
+    """
+
+    def __init__(self, crawler, endpoints, target_error_rate=0.02, interval=5.0, throttle_codes=(403, 429)):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.endpoints = {name: Endpoint(name, **options) for name, options in endpoints.items()}
+        self.target_error_rate = target_error_rate
+        self.interval = interval
+        self.throttle_codes = set(throttle_codes)
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('NAVER_THROTTLE_ENABLED'):
+            raise NotConfigured
+        endpoints = {name: dict(options) for name, options in DEFAULT_ENDPOINTS.items()}
+        for name, options in settings.getdict('NAVER_THROTTLE_ENDPOINTS').items():
+            endpoints.setdefault(name, {}).update(options)
+        middleware = cls(crawler, endpoints,
+                         target_error_rate=settings.getfloat('NAVER_THROTTLE_TARGET_ERROR_RATE', 0.02),
+                         interval=settings.getfloat('NAVER_THROTTLE_INTERVAL', 5.0),
+                         throttle_codes=[int(code) for code in settings.getlist('NAVER_THROTTLE_CODES', [403, 429])])
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        for endpoint in self.endpoints.values():
+            self.apply(endpoint)
+        self.task = task.LoopingCall(self.adjust)
+        self.task.start(self.interval, now=False)
+
+    def spider_closed(self, spider):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+
+    def endpoint(self, url):
+        key = cache_key(url)
+        if key is None:
+            return None
+        return self.endpoints.get('list' if key[0] == 'list_today' else key[0])
+
+    def apply(self, endpoint):
+        # 새로 만들어지는 슬롯(오래 쓰지 않아서 지워졌다가 다시 만들어지는 경우 포함)과 이미 있는 슬롯 모두에 반영한다.
+        downloader = self.crawler.engine.downloader
+        downloader.per_slot_settings[endpoint.slot] = {'concurrency': endpoint.concurrency, 'delay': endpoint.delay}
+        slot = downloader.slots.get(endpoint.slot)
+        if slot is not None:
+            slot.concurrency = endpoint.concurrency
+            slot.delay = endpoint.delay
+        self.stats.set_value(f'throttle/{endpoint.name}/concurrency', endpoint.concurrency)
+        self.stats.set_value(f'throttle/{endpoint.name}/delay', round(endpoint.delay, 3))
+
+    def process_request(self, request, spider):
+        endpoint = self.endpoint(request.url)
+        if endpoint is not None:
+            request.meta['download_slot'] = endpoint.slot
+        return None
+
+    def process_response(self, request, response, spider):
+        endpoint = self.endpoint(request.url)
+        if endpoint is None or 'cached' in response.flags:
+            return response
+        if response.status in self.throttle_codes:
+            self.stats.inc_value(f'throttle/{endpoint.name}/throttled')
+            self.backoff(endpoint, f'{response.status} 응답')
+        else:
+            endpoint.responses += 1
+            endpoint.latency_sum += request.meta.get('download_latency', 0.0)
+            if response.status >= 500:
+                endpoint.errors += 1
+                self.stats.inc_value(f'throttle/{endpoint.name}/errors')
+        return response
+
+    def process_exception(self, request, exception, spider):
+        endpoint = self.endpoint(request.url)
+        if endpoint is not None:
+            endpoint.responses += 1
+            endpoint.errors += 1
+            self.stats.inc_value(f'throttle/{endpoint.name}/errors')
+        return None
+
+    def backoff(self, endpoint, reason):
+        # 차단 신호가 연달아 와도 한 구간에 한번만 줄인다.
+        now = time.time()
+        if now < endpoint.cooldown_until:
+            return
+        endpoint.cooldown_until = now + self.interval
+        endpoint.concurrency = max(endpoint.min_concurrency, endpoint.concurrency // 2)
+        endpoint.delay = min(endpoint.max_delay, max(endpoint.delay * 2, 1.0))
+        self.stats.inc_value(f'throttle/{endpoint.name}/backoff')
+        logger.warning(f'[{endpoint.name}] {reason} : 동시 요청 {endpoint.concurrency}개, 딜레이 {endpoint.delay:.2f}초로 줄입니다.')
+        self.apply(endpoint)
+
+    def adjust(self):
+        now = time.time()
+        for endpoint in self.endpoints.values():
+            if endpoint.responses == 0:
+                continue
+            latency = endpoint.latency_sum / endpoint.responses
+            error_rate = endpoint.errors / endpoint.responses
+            self.stats.set_value(f'throttle/{endpoint.name}/latency', round(latency, 3))
+
+            if latency > endpoint.target_latency or error_rate > self.target_error_rate:
+                concurrency = max(endpoint.min_concurrency, endpoint.concurrency * 3 // 4)
+                delay = min(endpoint.max_delay, max(endpoint.delay * 1.5, endpoint.min_delay, 0.05))
+                decision = 'decrease'
+            elif now >= endpoint.cooldown_until:
+                concurrency = min(endpoint.max_concurrency, endpoint.concurrency + 1)
+                delay = max(endpoint.min_delay, endpoint.delay * 0.8)
+                decision = 'increase'
+            else:
+                endpoint.reset()
+                continue
+
+            if (concurrency, round(delay, 3)) != (endpoint.concurrency, round(endpoint.delay, 3)):
+                self.stats.inc_value(f'throttle/{endpoint.name}/{decision}')
+                logger.info(f'[{endpoint.name}] 평균 응답 {latency:.2f}초, 에러 {error_rate:.1%} : '
+                            f'동시 요청 {endpoint.concurrency} -> {concurrency}, '
+                            f'딜레이 {endpoint.delay:.2f} -> {delay:.2f}초')
+                endpoint.concurrency = concurrency
+                endpoint.delay = delay
+                self.apply(endpoint)
+            endpoint.reset()
@@ -1,4 +1,26 @@
 from w3lib.html import remove_tags, remove_tags_with_content, replace_entities, remove_comments
+from lxml import etree
+import copy
+import datetime
+import functools
+import re
+from itertools import filterfalse
+
+from navernews.info import naver_news_code
+
+KST = datetime.timezone(datetime.timedelta(hours=9))  # 네이버 뉴스의 시간은 모두 한국 시간이다.
+
+# 2020.03.24. 오후 3:05 / 기사입력 2020.03.24. 오후 3:05 / 최종수정 2020.03.24. 오전 9:41 / 2020-03-24 15:05:00
+_NAVER_TIME = re.compile(r'(\d{4})[.\-/] ?(\d{1,2})[.\-/] ?(\d{1,2})\.?\s*(오전|오후|AM|PM|am|pm)?\s*(\d{1,2}):(\d{2})(?::(\d{2}))?')
+_PM = ('오후', 'PM', 'pm')
+
+CLEAN_REMOVE_TAGS = ('script', 'a', 'h4')  # clean_html에서 내용까지 지우는 태그
+# 속성, 주석, 스크립트 안에 '<', '>'가 있으면 clean_html의 정규식이 태그 경계를 다르게 자르므로 clean_element가 같은 결과를 낼 수 없다.
+_CLEAN_FALLBACK = etree.XPath('boolean(.//@*[contains(., "<") or contains(., ">")] | .//comment()[contains(., "<")] '
+                              '| .//script[contains(., "<")])')
+
+# 기사 본문에서 지우는 줄의 기본 패턴 (정규식), settings.BODY_BOILERPLATE_PATTERNS로 바꿀 수 있다.
+BOILERPLATE_PATTERNS = ('무단 ?전재 및 재배포 금지', 'ⓒ')
 
 
 def clean_html(text):
@@ -11,7 +33,7 @@ def clean_html(text):
         body = replace_entities(text)  # &nbsp; - 띄어쓰기, &#8216; - ... 이런것들 제거하는 코드
         # remove_tags : 입력된 텍스트에서 태그 제거하는 라이브러리 함수
         # remove_tags_with_content : 입력한 텍스트에서 선택된 태그안의 내용을 지우는 라이브러리 함수
-        body = replace_entities(remove_tags_with_content(body, ('script', 'a', 'h4')))
+        body = replace_entities(remove_tags_with_content(body, CLEAN_REMOVE_TAGS))
         body = remove_comments(body)
         body = remove_tags(body)
         # body = re.sub('(http|ftp|https)://(?:[-\w.]|(?:%[\da-fA-F]{2}))+', '', body)  # 텍스트의 http url 제거
@@ -23,3 +45,129 @@ def clean_html(text):
         return body
     else:
         return text
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_naver_time(text):
+    match = _NAVER_TIME.search(text)
+    if match is None:
+        return None
+    year, month, day, meridiem, hour, minute, second = match.groups()
+    hour = int(hour)
+    if meridiem is not None:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem in _PM else 0)
+    try:
+        return datetime.datetime(int(year), int(month), int(day), hour, int(minute), int(second or 0), tzinfo=KST)
+    except ValueError:
+        return None
+
+
+def parse_naver_time(text):
+    '''
+    네이버 뉴스의 시간 문자열을 한국 시간 datetime으로 바꾼다.
+    '2020.03.24. 오후 3:05', '기사입력 2020.03.24. 오후 3:05', '최종수정 2020.03.24. 오전 9:41', '2020-03-24 15:05:00' 등
+    strptime은 느리고 %p가 로케일에 따라 달라서 정규식으로 직접 읽는다.
+    같은 분에 나온 기사들은 시간 문자열이 같으므로, 한번 읽은 문자열은 기억해뒀다가 그대로 돌려준다.
+    :param text: 시간 문자열
+    :return: tzinfo=KST인 datetime, 읽을 수 없으면 None
+    '''
+    if text is None:
+        return None
+    return _parse_naver_time(text.strip())
+
+
+def clean_element(element):
+    '''
+    clean_html(etree.tostring(element))와 똑같은 결과를, 이미 파싱된 lxml 요소에서 바로 만든다.
+    문자열에 정규식을 여러번 돌리는 대신 파싱된 트리에서 script, a, h4와 주석을 빼고 텍스트를 한번에 꺼낸다.
+    :param element: 기사 본문 영역 (lxml 요소)
+    :return: 태그와 공백이 정리된 본문, element가 None이면 None
+    '''
+    if element is None:
+        return None
+    if _CLEAN_FALLBACK(element):
+        return clean_html(etree.tostring(element, method='html', encoding='unicode', with_tail=False))
+
+    element = copy.deepcopy(element)  # 응답의 트리는 건드리지 않는다.
+    etree.strip_elements(element, *CLEAN_REMOVE_TAGS, etree.Comment, with_tail=False)
+    body = etree.tostring(element, method='text', encoding='unicode', with_tail=False)
+    # 파서가 엔티티를 한번 풀어준 상태이므로, clean_html처럼 &lt;a&gt; 같은 글자가 태그로 풀린 경우만 한번 더 처리한다.
+    if '<' in body:
+        body = remove_tags_with_content(body, CLEAN_REMOVE_TAGS)
+    if '&' in body:
+        body = replace_entities(body)
+    if '<' in body:
+        body = remove_tags(remove_comments(body))
+    return " ".join(body.split())
+
+
+class BodyNormalizer(object):
+    '''
+    기사 본문 줄(텍스트 노드) 목록에서 저작권 문구 같은 상용구 줄을 지우고, 공백을 정리해서 하나의 문자열로 만든다.
+    패턴들을 정규식 하나로 미리 컴파일해두고 각 줄을 한번씩만 검사한다.
+    (이전에는 줄을 돌면서 list.index + del로 지워서 줄이 많으면 느리고, 지운 줄 바로 다음 줄은 검사하지 못했다.)
+    기사 크기(40줄 안팎)에서는 줄마다 정규식을 돌리는 만큼 이전 방식보다 기사당 10 ~ 15us 느리다.
+    기사 추출 전체(0.5 ~ 0.7ms)의 2% 정도이고, 줄이 수천 줄 이상이면 몇 배 빠르다. (benchmarks/bench_body.py)
+    '''
+
+    def __init__(self, patterns=BOILERPLATE_PATTERNS):
+        '''
+        :param patterns: 지울 줄의 정규식 목록, 한 줄에서 하나라도 찾아지면 그 줄을 지운다. 빈 목록이면 지우지 않는다.
+        '''
+        self.patterns = tuple(patterns)
+        self.matcher = re.compile('|'.join(f'(?:{p})' for p in self.patterns)) if self.patterns else None
+
+    def __call__(self, lines):
+        '''
+        :param lines: 본문 줄 목록
+        :return: 상용구 줄을 뺀 본문, 공백은 한칸으로 정리된다.
+        '''
+        if self.matcher is not None:
+            lines = filterfalse(self.matcher.search, lines)
+        return " ".join(" ".join(lines).split())
+
+
+def date_range(start, end):
+    '''
+    start(최신) 부터 end(과거) 까지의 날짜를 하루씩 거꾸로 돌려준다.
+    :param start: 시작 날짜, 20200324 형식
+    :param end: 끝나는 날짜, 20200101 형식
+    :return: '20200324', '20200323', ... '20200101'
+    '''
+    day = datetime.datetime.strptime(str(start), '%Y%m%d').date()
+    last = datetime.datetime.strptime(str(end), '%Y%m%d').date()
+    while day >= last:
+        yield day.strftime('%Y%m%d')
+        day -= datetime.timedelta(days=1)
+
+
+def parse_categories(category):
+    '''
+    스파이더의 category 인자를 언론사 코드 목록으로 바꾼다.
+    :param category: '001' 또는 '001,003' 또는 'all'
+    :return: ['001', '003']
+    '''
+    if category == 'all':
+        return list(naver_news_code)
+    categories = [c.strip() for c in str(category).split(',') if c.strip()]
+    for c in categories:
+        if c not in naver_news_code:
+            raise KeyError(f'{c} 는 info.naver_news_code에 없는 언론사 코드입니다.')
+    return categories
+
+
+def parse_weights(weights):
+    '''
+    스파이더의 weights 인자를 언론사별 가중치로 바꾼다.
+    :param weights: '001:3,003:2' 형식, None이면 모두 1
+    :return: {'001': 3.0, '003': 2.0}
+    '''
+    if not weights:
+        return dict()
+    result = dict()
+    for pair in str(weights).split(','):
+        oid, weight = pair.split(':')
+        result[oid.strip()] = float(weight)
+    return result
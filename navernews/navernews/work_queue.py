@@ -0,0 +1,257 @@
+"""
+여러 서버에서 기간 크롤링을 나눠서 하기 위한 작업 큐
+작업 단위는 (언론사 코드, 날짜)이고, 워커(스파이더)는 작업을 임대(lease)해서 크롤링한 다음 완료(ack) 처리한다.
+임대 시간(lease_timeout) 안에 완료하지도, 연장(renew)하지도 못한 작업은 워커가 죽은 것으로 보고 다시 대기 상태가 된다.
+
+큐 주소
+    sqlite:///work.db                       - 파일 하나로 동작하는 큐, 한 서버 또는 공유 폴더에서 사용
+    redis://host:6379/0?key=navernews       - 여러 서버에서 사용
+
+작업 등록 / 상태 확인
+    python -m navernews.work_queue sqlite:///work.db enqueue --category 001,003 --start 20200324 --end 20200101
+    python -m navernews.work_queue sqlite:///work.db status
+"""
+import argparse
+import sqlite3
+import time
+from urllib.parse import urlparse, parse_qs
+
+from navernews.tools import date_range, parse_categories
+
+
+class SQLiteWorkQueue(object):
+    # 작업을 다시 대기 상태로 되돌리되, max_attempts번 실패한 작업은 failed로 남긴다.
+    RETRY = "state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END, " \
+            "worker = NULL, lease_until = NULL, attempts = attempts + 1"
+
+    def __init__(self, path, lease_timeout=600, max_attempts=3):
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS work (
+                oid TEXT NOT NULL,
+                date TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (oid, date)
+            )''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS work_state ON work (state, seq)')
+
+    def enqueue(self, units):
+        """
+        :param units: (언론사 코드, 날짜) 목록, 이 순서대로 임대된다.
+        :return: 새로 등록된 작업 수
+        """
+        with self.conn:
+            seq = self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM work').fetchone()[0]
+            cursor = self.conn.executemany(
+                'INSERT OR IGNORE INTO work (oid, date, seq) VALUES (?, ?, ?)',
+                ((oid, date, seq + i) for i, (oid, date) in enumerate(units, 1)))
+        return cursor.rowcount
+
+    def lease(self, worker, count=1):
+        """
+        대기 중인 작업을 count개까지 임대한다. 임대 시간이 지난 작업은 먼저 대기 상태로 되돌린다.
+        :return: [(언론사 코드, 날짜), ...]
+        """
+        if count <= 0:
+            return []
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(f"UPDATE work SET {self.RETRY} WHERE state = 'leased' AND lease_until < ?",
+                              (self.max_attempts, now))
+            units = self.conn.execute("SELECT oid, date FROM work WHERE state = 'pending' "
+                                      "ORDER BY seq LIMIT ?", (count,)).fetchall()
+            self.conn.executemany("UPDATE work SET state = 'leased', worker = ?, lease_until = ? "
+                                  "WHERE oid = ? AND date = ?",
+                                  ((worker, now + self.lease_timeout, oid, date) for oid, date in units))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return units
+
+    def renew(self, worker, oid, date):
+        # 작업이 아직 진행 중이라는 것을 알려 임대 시간을 연장한다.
+        self.conn.execute("UPDATE work SET lease_until = ? WHERE oid = ? AND date = ? AND worker = ? "
+                          "AND state = 'leased'", (time.time() + self.lease_timeout, oid, date, worker))
+
+    def ack(self, worker, oid, date):
+        self.conn.execute("UPDATE work SET state = 'done', lease_until = NULL WHERE oid = ? AND date = ? "
+                          "AND worker = ?", (oid, date, worker))
+
+    def release(self, worker, oid, date):
+        # 크롤링에 실패한 작업을 다른 워커가 다시 가져갈 수 있도록 되돌린다.
+        self.conn.execute(f"UPDATE work SET {self.RETRY} WHERE oid = ? AND date = ? AND worker = ? AND state = 'leased'",
+                          (self.max_attempts, oid, date, worker))
+
+    def status(self):
+        return dict(self.conn.execute('SELECT state, COUNT(*) FROM work GROUP BY state').fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+class RedisWorkQueue(object):
+    """
+    redis 자료구조
+        <key>:units     set        등록된 적이 있는 작업, 같은 작업을 두번 등록하지 않는다.
+        <key>:pending   list       대기 중인 작업 ("oid:date")
+        <key>:leased    sorted set 임대 중인 작업, score = 임대 만료 시각
+        <key>:owner     hash       임대 중인 작업의 워커
+        <key>:attempts  hash       작업별 실패 횟수
+        <key>:done      set        완료된 작업
+        <key>:failed    set        max_attempts번 실패한 작업
+    작업의 상태를 바꾸는 명령은 Lua 스크립트 하나로 실행하므로, 워커가 중간에 죽어도 작업이 사라지지 않는다.
+    """
+    # 등록, 이 큐를 units 집합이 생기기 전부터 사용했다면 완료 / 임대 중인 작업도 건너뛴다.
+    ENQUEUE = """
+        if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then return 0 end
+        if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 or redis.call('ZSCORE', KEYS[3], ARGV[1]) then return 0 end
+        redis.call('RPUSH', KEYS[4], ARGV[1])
+        return 1
+    """
+    # 대기 중인 작업을 ARGV[1]개까지 꺼내서 임대 중으로 옮긴다.
+    LEASE = """
+        local units = {}
+        for i = 1, tonumber(ARGV[1]) do
+            local unit = redis.call('LPOP', KEYS[1])
+            if not unit then break end
+            redis.call('ZADD', KEYS[2], ARGV[2], unit)
+            redis.call('HSET', KEYS[3], unit, ARGV[3])
+            units[#units + 1] = unit
+        end
+        return units
+    """
+    # 임대 중인 작업을 대기 상태로 되돌리고, max_attempts번 실패한 작업은 failed로 옮긴다.
+    # ARGV[3]이 있으면 그 워커가 임대한 작업만 되돌린다.
+    REQUEUE = """
+        if ARGV[3] ~= '' and redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[3] then return 0 end
+        if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        if redis.call('HINCRBY', KEYS[3], ARGV[1], 1) < tonumber(ARGV[2]) then
+            redis.call('LPUSH', KEYS[4], ARGV[1])
+        else
+            redis.call('SADD', KEYS[5], ARGV[1])
+        end
+        return 1
+    """
+    ACK = """
+        if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+        if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        redis.call('SADD', KEYS[3], ARGV[1])
+        return 1
+    """
+
+    def __init__(self, client, key='navernews', lease_timeout=600, max_attempts=3):
+        self.redis = client
+        self.key = key
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.enqueue_script = client.register_script(self.ENQUEUE)
+        self.lease_script = client.register_script(self.LEASE)
+        self.requeue_script = client.register_script(self.REQUEUE)
+        self.ack_script = client.register_script(self.ACK)
+
+    def _requeue(self, unit, worker=''):
+        return self.requeue_script(
+            keys=[f'{self.key}:leased', f'{self.key}:owner', f'{self.key}:attempts', f'{self.key}:pending',
+                  f'{self.key}:failed'],
+            args=[unit, self.max_attempts, worker])
+
+    def enqueue(self, units):
+        added = 0
+        for oid, date in units:
+            added += self.enqueue_script(
+                keys=[f'{self.key}:units', f'{self.key}:done', f'{self.key}:leased', f'{self.key}:pending'],
+                args=[f'{oid}:{date}'])
+        return added
+
+    def lease(self, worker, count=1):
+        if count <= 0:
+            return []
+        now = time.time()
+        for unit in self.redis.zrangebyscore(f'{self.key}:leased', '-inf', now):
+            # 스크립트 안에서 zrem이 성공한 경우에만 되돌리므로 여러 워커가 동시에 확인해도 한번만 다시 들어간다.
+            self._requeue(unit)
+
+        units = self.lease_script(keys=[f'{self.key}:pending', f'{self.key}:leased', f'{self.key}:owner'],
+                                  args=[count, now + self.lease_timeout, worker])
+        return [tuple((unit.decode() if isinstance(unit, bytes) else unit).split(':', 1)) for unit in units]
+
+    def _owned(self, worker, unit):
+        owner = self.redis.hget(f'{self.key}:owner', unit)
+        owner = owner.decode() if isinstance(owner, bytes) else owner
+        return owner == worker
+
+    def renew(self, worker, oid, date):
+        unit = f'{oid}:{date}'
+        if self._owned(worker, unit):
+            self.redis.zadd(f'{self.key}:leased', {unit: time.time() + self.lease_timeout}, xx=True)
+
+    def ack(self, worker, oid, date):
+        self.ack_script(keys=[f'{self.key}:leased', f'{self.key}:owner', f'{self.key}:done'],
+                        args=[f'{oid}:{date}', worker])
+
+    def release(self, worker, oid, date):
+        self._requeue(f'{oid}:{date}', worker)
+
+    def status(self):
+        return {'pending': self.redis.llen(f'{self.key}:pending'),
+                'leased': self.redis.zcard(f'{self.key}:leased'),
+                'done': self.redis.scard(f'{self.key}:done'),
+                'failed': self.redis.scard(f'{self.key}:failed')}
+
+    def close(self):
+        self.redis.close()
+
+
+def open_work_queue(uri, lease_timeout=600):
+    '''
+    큐 주소로 작업 큐를 연다.
+    :param uri: sqlite:///work.db 또는 redis://host:6379/0?key=navernews
+    :param lease_timeout: 작업 임대 시간(초)
+    '''
+    parsed = urlparse(uri)
+    if parsed.scheme == 'sqlite':
+        return SQLiteWorkQueue(uri[len('sqlite:///'):], lease_timeout=lease_timeout)
+    if parsed.scheme == 'redis':
+        import redis
+        key = parse_qs(parsed.query).get('key', ['navernews'])[0]
+        return RedisWorkQueue(redis.Redis.from_url(uri.split('?')[0]), key=key, lease_timeout=lease_timeout)
+    raise ValueError(f'지원하지 않는 작업 큐 주소입니다. : {uri}')
+
+
+def work_units(category, start, end):
+    '''
+    (언론사, 날짜) 작업 목록을 만든다. 날짜마다 언론사를 번갈아 넣어서 언론사별로 고르게 임대되도록 한다.
+    '''
+    categories = parse_categories(category)
+    for date in date_range(start, end):
+        for oid in categories:
+            yield oid, date
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='네이버 뉴스 기간 크롤링 작업 큐')
+    parser.add_argument('queue', help='sqlite:///work.db 또는 redis://host:6379/0?key=navernews')
+    sub = parser.add_subparsers(dest='command', required=True)
+    enqueue_parser = sub.add_parser('enqueue', help='작업 등록')
+    enqueue_parser.add_argument('--category', required=True, help='언론사 코드, 여러 언론사는 쉼표로 구분, 전체는 all')
+    enqueue_parser.add_argument('--start', required=True, help='시작 날짜(최신), 20200324 형식')
+    enqueue_parser.add_argument('--end', required=True, help='끝나는 날짜(과거), 20200101 형식')
+    sub.add_parser('status', help='작업 상태 확인')
+    args = parser.parse_args()
+
+    queue = open_work_queue(args.queue)
+    if args.command == 'enqueue':
+        print(f'{queue.enqueue(work_units(args.category, args.start, args.end))}개의 작업을 등록했습니다.')
+    print(queue.status())
+    queue.close()
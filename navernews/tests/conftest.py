@@ -0,0 +1,114 @@
+"""
+테스트용 MySQL 대용품
+pymysql과 같은 방식으로 인자를 SQL에 넣은 다음 SQLite(news 스키마를 ATTACH)에서 실행한다.
+테이블은 db_schema.py와 같은 컬럼과 유니크 키로 만들고, ON DUPLICATE KEY UPDATE는 ON CONFLICT DO NOTHING으로 바꾼다.
+"""
+import sqlite3
+
+import pymysql
+import pytest
+from pymysql.converters import escape_item
+
+from navernews.db_schema import ARTICLES_TABLE
+from navernews.pipelines import ARTICLES_COLUMNS, NEWS_COLUMNS
+
+
+class FakeCursor(object):
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.db.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.conn.check()
+        if args is not None:
+            sql = sql % tuple(escape_item(arg, 'utf8mb4') for arg in args)
+        sql = sql.replace('ON DUPLICATE KEY UPDATE news_id = news_id', 'ON CONFLICT DO NOTHING')
+        self.conn.executed.append(' '.join(sql.split()))
+        try:
+            self.cursor.execute(sql)
+        except sqlite3.IntegrityError as e:
+            raise pymysql.err.IntegrityError(1062, str(e))
+        return max(self.cursor.rowcount, 0)
+
+    def executemany(self, sql, rows):
+        return sum(self.execute(sql, row) for row in rows)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self.cursor.fetchmany(size or 1)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+class FakeConnection(object):
+    """
+    fail : 다음 쿼리부터 이 횟수만큼 연결 에러(OperationalError)를 낸다.
+    executed : 실행한 SQL (인자를 넣은 뒤)
+    """
+    open = True
+
+    def __init__(self):
+        self.db = sqlite3.connect(':memory:', isolation_level=None)
+        self.db.execute("ATTACH ':memory:' AS news")
+        self.db.execute('BEGIN')
+        self.fail = 0
+        self.executed = []
+        self.commits = 0
+
+    def check(self):
+        if self.fail:
+            self.fail -= 1
+            raise pymysql.err.OperationalError(2013, 'Lost connection to MySQL server during query')
+
+    def create_table(self, sql):
+        # MySQL의 DDL처럼 바로 commit해서 rollback으로 테이블이 없어지지 않게 한다.
+        self.db.execute(sql)
+        self.db.execute('COMMIT')
+        self.db.execute('BEGIN')
+
+    def create_news_table(self, oid):
+        self.create_table(f"CREATE TABLE news.`{oid}` (inx INTEGER PRIMARY KEY AUTOINCREMENT, "
+                          f"{', '.join(NEWS_COLUMNS)}, UNIQUE (news_id))")
+
+    def create_articles_table(self):
+        self.create_table(f"CREATE TABLE news.`{ARTICLES_TABLE}` (inx INTEGER PRIMARY KEY AUTOINCREMENT, "
+                          f"{', '.join(ARTICLES_COLUMNS)}, UNIQUE (media_code, news_id, news_date))")
+
+    def rows(self, sql):
+        return self.db.execute(sql).fetchall()
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def ping(self, reconnect=True):
+        self.check()
+
+    def commit(self):
+        self.check()
+        self.db.execute('COMMIT')
+        self.db.execute('BEGIN')
+        self.commits += 1
+
+    def rollback(self):
+        self.db.execute('ROLLBACK')
+        self.db.execute('BEGIN')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def mysql(monkeypatch):
+    # connection_db()가 항상 같은 대용품 연결을 돌려주도록 바꾼다.
+    conn = FakeConnection()
+    monkeypatch.setattr('navernews.pipelines.connection_db', lambda: conn)
+    return conn
@@ -0,0 +1,43 @@
+"""
+ArchiveMiddleware / ArchiveWriter / ArchiveReader - 보관한 응답을 인덱스로 다시 읽기
+"""
+import pytest
+from scrapy.http import HtmlResponse, Request, Response
+
+pytest.importorskip('zstandard')
+
+from navernews.archive import ArchiveMiddleware, ArchiveReader, ArchiveWriter  # noqa: E402
+
+READ = 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=109&aid=0004188437'
+SPORTS = 'https://sports.news.naver.com/news.nhn?oid=109&aid=0004188437'
+
+
+def archive(tmp_path, responses, queue_size=1000):
+    writer = ArchiveWriter(str(tmp_path), queue_size=queue_size)
+    middleware = ArchiveMiddleware(writer, ['article', 'list'], stats=None)
+    writer.start()
+    try:
+        for response in responses:
+            assert middleware.process_response(Request(response.url), response, None) is response
+    finally:
+        writer.close()
+    return ArchiveReader(str(tmp_path))
+
+
+def test_article_is_read_back(tmp_path):
+    body = '<html>기사 본문</html>'.encode('utf-8')
+    reader = archive(tmp_path, [HtmlResponse(READ, body=body, headers={'Content-Type': 'text/html; charset=utf-8'})])
+    response = reader.get_article('109', '0004188437')
+    assert (response.status, response.url, response.body) == (200, READ, body)
+    assert reader.status()['records'] == {'article': 1}
+    reader.close()
+
+
+def test_redirect_does_not_shadow_article(tmp_path):
+    page = HtmlResponse(SPORTS, body=b'<html>sports</html>')
+    redirect = Response(READ, status=302, headers={'Location': SPORTS})
+    # 다음 실행에서 기사 페이지는 캐시에서 나오고 리다이렉트만 다시 받은 경우
+    reader = archive(tmp_path, [page, redirect])
+    assert reader.get_article('109', '0004188437').url == SPORTS
+    assert reader.get('redirect', '109/0004188437').status == 302
+    reader.close()
@@ -0,0 +1,71 @@
+"""
+기간 크롤링 체크포인트 (Checkpoint)와 스파이더에서 기사 완료를 기록하는 시점
+"""
+import sqlite3
+
+from twisted.internet import task
+
+from navernews.checkpoint import Checkpoint
+from navernews.signals import items_stored
+from tests.test_high_water import open_spider, scrape
+
+URL = 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid={aid}'
+
+
+def written_articles(path):
+    # 다른 연결로 읽어서 파일에 기록된 내용만 본다.
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT oid, aid FROM articles ORDER BY aid').fetchall()
+    finally:
+        conn.close()
+
+
+def test_resume_skips_done_pages_and_dates(tmp_path):
+    path = str(tmp_path / 'checkpoint.db')
+    checkpoint = Checkpoint(path)
+    checkpoint.list_requested('001', '20200324', 1, {'last': '0000000010'})
+    checkpoint.list_requested('001', '20200324', 2)
+    checkpoint.list_done('001', '20200324', 1)
+    checkpoint.list_requested('001', '20200323', 1)
+    checkpoint.date_done('001', '20200323')
+    checkpoint.close()
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.done_dates() == {('001', '20200323')}
+    assert checkpoint.started('001', '20200324')
+    assert checkpoint.unfinished_pages('001', '20200324') == [(2, {})]
+    # 끝난 날짜의 목록 페이지 기록은 지운다.
+    assert not checkpoint.started('001', '20200323')
+    checkpoint.close()
+
+
+def test_article_done_waits_for_items_stored(tmp_path):
+    path = str(tmp_path / 'checkpoint.db')
+    crawler, spider = open_spider(checkpoint=path, start='20200324', end='20200324')
+    for aid in ('0000000010', '0000000011'):
+        spider.checkpoint.article_requested('001', aid, '20200324', URL.format(aid=aid))
+        scrape(crawler, spider, aid)
+    # 파이프라인을 지났지만 아직 commit되지 않은 기사는 다시 실행할 때 요청해야 한다.
+    assert len(spider.checkpoint.pending_articles()) == 2
+
+    crawler.signals.send_catch_log(items_stored, stored=[('001', '0000000010')], failed=[('001', '0000000011')])
+    spider.closed('finished')
+    assert written_articles(path) == [('001', '0000000011')]
+
+
+def test_buffered_ops_are_flushed_while_idle(tmp_path):
+    path = str(tmp_path / 'checkpoint.db')
+    crawler, spider = open_spider(checkpoint=path, start='20200324', end='20200324')
+    clock = task.Clock()
+    spider.checkpoint_task.clock = clock
+    spider.spider_opened(spider)
+
+    spider.checkpoint.article_requested('001', '0000000010', '20200324', URL.format(aid='0000000010'))
+    assert written_articles(path) == []
+    # 다음 기록이나 조회가 없어도 flush_interval초가 지나면 파일에 쓴다.
+    clock.advance(spider.checkpoint.flush_interval)
+    assert written_articles(path) == [('001', '0000000010')]
+
+    spider.closed('shutdown')
+    assert not spider.checkpoint_task.running
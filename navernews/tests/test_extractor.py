@@ -0,0 +1,50 @@
+"""
+ArticleExtractor의 기사 시간 stats (news/date/missing, news/date/unparsed)
+
+    cd navernews
+    python -m pytest tests
+"""
+from scrapy import Spider, signals
+from scrapy.crawler import Crawler
+
+from navernews.extractor import ArticleExtractor
+
+URL = 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid=0011494587'
+
+ARTICLE = '''<html><head><meta property="og:title" content="제목"></head><body>
+<div id="main_content"><div class="article_header"><div class="article_info"><div class="sponsor">{date}</div></div></div>
+<div id="articleBodyContents">본문</div></div>
+</body></html>'''
+
+
+def open_extractor():
+    # Scrapy 2.11은 스파이더를 만든 다음에 crawler.stats를 만든다.
+    # 스파이더의 from_crawler처럼 stats가 없을 때 추출기를 만들고, 스파이더가 열린 다음에 추출한다.
+    crawler = Crawler(Spider, {'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7'})
+    assert crawler.stats is None
+    extractor = ArticleExtractor.from_crawler(crawler)
+    crawler._apply_settings()
+    spider = Spider.from_crawler(crawler, name='test')
+    crawler.signals.send_catch_log(signals.spider_opened, spider=spider)
+    return crawler, extractor
+
+
+def test_missing_date_is_counted():
+    crawler, extractor = open_extractor()
+    _, fields = extractor.extract_html(URL, ARTICLE.format(date=''))
+    assert fields['news_date'] is None
+    assert crawler.stats.get_value('news/date/missing') == 1
+
+
+def test_unparsed_date_is_counted():
+    crawler, extractor = open_extractor()
+    _, fields = extractor.extract_html(URL, ARTICLE.format(date='<span class="t11">어제 오후</span>'))
+    assert fields['news_date'] is None
+    assert crawler.stats.get_value('news/date/unparsed') == 1
+
+
+def test_date_is_parsed():
+    crawler, extractor = open_extractor()
+    _, fields = extractor.extract_html(URL, ARTICLE.format(date='<span class="t11">2020.03.24. 오후 3:05</span>'))
+    assert fields['news_date'].strftime('%Y-%m-%d %H:%M') == '2020-03-24 15:05'
+    assert crawler.stats.get_value('news/date/missing') is None
@@ -0,0 +1,89 @@
+"""
+압축 JSON Lines 파이프라인 (JsonLinesFeedPipeline) - 파일 이름, 압축, 크기 / 시간별로 파일 나누기
+"""
+import datetime
+import gzip
+import json
+import logging
+
+import pytest
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.spiders import Spider
+from scrapy.statscollectors import MemoryStatsCollector
+
+from navernews import feed
+from navernews.feed import JsonLinesFeedPipeline
+from navernews.items import NewsItem
+from navernews.tools import KST
+
+
+class FakeSpider:
+    logger = logging.getLogger('test')
+
+
+def open_pipeline(tmp_path, **kwargs):
+    pipeline = JsonLinesFeedPipeline(MemoryStatsCollector(Crawler(Spider)), directory=str(tmp_path), **kwargs)
+    pipeline.open_spider(FakeSpider)
+    return pipeline
+
+
+def item(aid):
+    return NewsItem(news_id=aid, news_media_code='001', news_title='제목',
+                    news_date=datetime.datetime(2020, 3, 24, 15, 5, tzinfo=KST))
+
+
+def read_lines(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_gzip_lines_are_readable_after_close(tmp_path):
+    pipeline = open_pipeline(tmp_path)
+    for aid in ('a', 'b'):
+        pipeline.process_item(item(aid), FakeSpider)
+    # 쓰는 중인 파일은 .tmp 이름이다.
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.tmp']
+    pipeline.close_spider(FakeSpider)
+
+    [path] = tmp_path.iterdir()
+    assert path.name.endswith('-0001.jl.gz')
+    lines = read_lines(path, gzip.open)
+    assert [line['news_id'] for line in lines] == ['a', 'b']
+    assert lines[0]['news_title'] == '제목'
+    assert lines[0]['news_date'] == '2020-03-24 15:05:00+09:00'
+    assert pipeline.stats.get_value('jsonl/items') == 2
+    assert pipeline.stats.get_value('jsonl/files') == 1
+
+
+def test_rotates_by_size_and_hour(tmp_path, monkeypatch):
+    pipeline = open_pipeline(tmp_path, compression='none', max_file_size=1)
+    pipeline.process_item(item('a'), FakeSpider)
+    pipeline.process_item(item('b'), FakeSpider)
+    assert pipeline.file_no == 2
+
+    pipeline.max_file_size = 0
+    pipeline.process_item(item('c'), FakeSpider)
+    monkeypatch.setattr(feed.time, 'time', lambda: pipeline.rotate_at)
+    pipeline.process_item(item('d'), FakeSpider)
+    pipeline.close_spider(FakeSpider)
+
+    paths = sorted(tmp_path.iterdir())
+    assert [path.name[-7:] for path in paths] == ['0001.jl', '0002.jl', '0003.jl']
+    assert [[line['news_id'] for line in read_lines(path)] for path in paths] == [['a'], ['b', 'c'], ['d']]
+
+
+def test_zstd_compression(tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    pipeline = open_pipeline(tmp_path, compression='zstd')
+    pipeline.process_item(item('a'), FakeSpider)
+    pipeline.close_spider(FakeSpider)
+
+    [path] = tmp_path.iterdir()
+    assert path.name.endswith('.jl.zst')
+    assert [line['news_id'] for line in read_lines(path, zstandard.open)] == ['a']
+
+
+def test_unknown_compression_is_not_configured(tmp_path):
+    with pytest.raises(NotConfigured):
+        open_pipeline(tmp_path, compression='bz2')
@@ -0,0 +1,95 @@
+"""
+증분 크롤링 기록 (HighWaterMark)과 스파이더에서 기록을 갱신하는 시점
+배치 저장 파이프라인을 사용하면 items_stored로 저장이 확인된 기사로만 갱신한다.
+"""
+import datetime
+import json
+
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.http import HtmlResponse, Request
+
+from navernews.high_water import HighWaterMark
+from navernews.signals import items_stored
+from navernews.spiders.NewsSpider import News_manual_mongo
+from navernews.tools import KST
+
+DATE = datetime.datetime(2020, 3, 24, 15, 5, tzinfo=KST)
+
+
+def open_spider(**kwargs):
+    # News_manual_mongo는 MongodbPipeline(items_stored를 보내는 배치 파이프라인)을 사용하고, 생성할 때 DB에 연결하지 않는다.
+    crawler = Crawler(News_manual_mongo, {'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7'})
+    crawler._apply_settings()
+    spider = crawler._create_spider(category='001', **kwargs)
+    return crawler, spider
+
+
+def scrape(crawler, spider, aid, date=DATE):
+    url = f'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=001&aid={aid}'
+    response = HtmlResponse(url, request=Request(url), body=b'')
+    item = spider.article_item(response, 'general', {'news_id': aid, 'news_media_code': '001', 'news_date': date}, 0)
+    crawler.signals.send_catch_log(signals.item_scraped, item=item, response=response, spider=spider)
+
+
+def saved(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_mark_keeps_largest_id(tmp_path):
+    mark = HighWaterMark(str(tmp_path / 'high_water.json'))
+    mark.update('001', '0000000010', DATE)
+    mark.update('001', '0000000009', None)
+    mark.save()
+    assert saved(mark.path) == {'001': {'news_id': '0000000010', 'news_date': '2020-03-24 15:05'}}
+    assert HighWaterMark(mark.path).news_id('001') == 10
+    assert HighWaterMark(mark.path).date('001') == '20200324'
+
+
+def test_held_outlet_keeps_previous_mark(tmp_path):
+    path = str(tmp_path / 'high_water.json')
+    mark = HighWaterMark(path)
+    mark.update('001', '0000000010', DATE)
+    mark.save()
+
+    mark = HighWaterMark(path)
+    mark.update('001', '0000000020', DATE)
+    mark.update('003', '0000000030', DATE)
+    mark.hold('001')
+    mark.save()
+    assert saved(path)['001']['news_id'] == '0000000010'
+    assert saved(path)['003']['news_id'] == '0000000030'
+
+
+def test_mark_waits_for_items_stored(tmp_path):
+    path = str(tmp_path / 'high_water.json')
+    crawler, spider = open_spider(incremental=path)
+    assert spider.wait_for_storage
+
+    scrape(crawler, spider, '0000000010')
+    scrape(crawler, spider, '0000000011')
+    # 파이프라인을 지났지만 아직 commit되지 않은 기사로는 갱신하지 않는다.
+    assert spider.high_water.marks == {}
+
+    crawler.signals.send_catch_log(items_stored, stored=[('001', '0000000010')], failed=[])
+    assert spider.high_water.marks['001']['news_id'] == '0000000010'
+    assert spider.high_water.marks['001']['news_date'] == '2020-03-24 15:05'
+
+    spider.closed('finished')
+    assert saved(path)['001']['news_id'] == '0000000010'
+
+
+def test_failed_flush_does_not_advance_mark(tmp_path):
+    path = str(tmp_path / 'high_water.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'001': {'news_id': '0000000005', 'news_date': '2020-03-23 10:00'}}, f)
+    crawler, spider = open_spider(incremental=path)
+
+    scrape(crawler, spider, '0000000010')
+    scrape(crawler, spider, '0000000011')
+    crawler.signals.send_catch_log(items_stored, stored=[('001', '0000000011')], failed=[])
+    # 종료할 때 저장하지 못한 기사(0000000010)가 있으면 그보다 최신 기사가 저장되었어도 기록을 그대로 둔다.
+    crawler.signals.send_catch_log(items_stored, stored=[], failed=[('001', '0000000010')])
+    spider.closed('finished')
+    assert saved(path) == {'001': {'news_id': '0000000005', 'news_date': '2020-03-23 10:00'}}
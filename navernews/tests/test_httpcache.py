@@ -0,0 +1,57 @@
+"""
+NaverCacheStorage - 캐시 키와 리다이렉트, 목록 페이지 만료
+"""
+import pytest
+from scrapy.crawler import Crawler
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.spiders import Spider
+
+from navernews.httpcache import NaverCacheStorage, cache_key
+
+pytest.importorskip('zstandard')
+
+READ = 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid=109&aid=0004188437'
+SPORTS = 'https://sports.news.naver.com/news.nhn?oid=109&aid=0004188437'
+LIST = 'https://news.naver.com/main/list.nhn?mode=LPOD&mid=sec&listType=summary&oid=001&date={date}&page=2'
+
+
+def open_storage(tmp_path, **settings):
+    crawler = Crawler(Spider, dict({'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7',
+                                    'NAVER_HTTPCACHE_FILE': str(tmp_path / 'cache.sqlite3')}, **settings))
+    crawler._apply_settings()
+    spider = Spider.from_crawler(crawler, name='test')
+    storage = NaverCacheStorage(crawler.settings)
+    storage.open_spider(spider)
+    return storage, spider
+
+
+def test_cache_key():
+    assert cache_key(READ) == ('article', '109/0004188437')
+    assert cache_key(SPORTS) == ('article', '109/0004188437')
+    assert cache_key(LIST.format(date='20200323'), today='20200324') == ('list', '001/20200323/2')
+    assert cache_key(LIST.format(date='20200324'), today='20200324') == ('list_today', '001/20200324/2')
+    assert cache_key('https://news.naver.com/main/home.nhn') is None
+
+
+def test_article_redirect_is_not_stored(tmp_path):
+    storage, spider = open_storage(tmp_path)
+    redirect = Response(READ, status=302, headers={'Location': SPORTS})
+    storage.store_response(spider, Request(READ), redirect)
+    # 리다이렉트를 기사 키로 저장하면 이동한 주소의 요청에도 리다이렉트가 돌아와서 반복된다.
+    assert storage.retrieve_response(spider, Request(SPORTS)) is None
+
+    page = HtmlResponse(SPORTS, body='<html>기사</html>'.encode('utf-8'), encoding='utf-8')
+    storage.store_response(spider, Request(SPORTS), page)
+    cached = storage.retrieve_response(spider, Request(READ))
+    assert (cached.status, cached.url) == (200, SPORTS)
+    storage.close_spider(spider)
+
+
+def test_today_list_expires(tmp_path):
+    storage, spider = open_storage(tmp_path, NAVER_HTTPCACHE_EXPIRATION={'list_today': 600})
+    url = LIST.format(date='29991231')
+    storage.store_response(spider, Request(url), HtmlResponse(url, body=b'<html></html>'))
+    assert storage.retrieve_response(spider, Request(url)) is not None
+    storage.conn.execute('UPDATE pages SET stored = stored - 601')
+    assert storage.retrieve_response(spider, Request(url)) is None
+    storage.close_spider(spider)
@@ -0,0 +1,87 @@
+"""
+MongodbPipeline - 컬렉션별 배치 저장, 중복 news_id, 연결 에러 뒤 다시 저장 (mongomock)
+"""
+import logging
+
+import pymongo
+import pytest
+from scrapy.crawler import Crawler
+from scrapy.spiders import Spider
+from scrapy.statscollectors import MemoryStatsCollector
+
+from navernews.items import NewsItem
+from navernews.pipelines import MongodbPipeline
+from navernews.signals import items_stored
+
+mongomock = pytest.importorskip('mongomock')
+
+
+class FakeSpider:
+    logger = logging.getLogger('test')
+
+
+def open_pipeline():
+    crawler = Crawler(Spider)
+    signals = []
+    crawler.signals.connect(lambda stored, failed: signals.append((stored, failed)), signal=items_stored, weak=False)
+    pipeline = MongodbPipeline(MemoryStatsCollector(crawler), client_factory=mongomock.MongoClient, batch_size=2,
+                               flush_interval=0, signals=crawler.signals)
+    pipeline.open_spider(FakeSpider)
+    return pipeline, signals
+
+
+def item(aid, oid='001'):
+    return NewsItem(news_id=aid, news_media_code=oid, news_title='제목')
+
+
+def news_ids(pipeline, oid='001'):
+    return sorted(document['news_id'] for document in pipeline.client['news'][oid].find())
+
+
+def test_batches_per_collection_and_skips_duplicates():
+    pipeline, signals = open_pipeline()
+    for it in (item('a'), item('x', oid='003'), item('b')):
+        pipeline.process_item(it, FakeSpider)
+    assert signals == [([('001', 'a'), ('001', 'b')], [])]
+    assert news_ids(pipeline) == ['a', 'b']
+    assert list(pipeline.buffers) == ['003']
+
+    pipeline.process_item(item('a'), FakeSpider)
+    pipeline.flush_all(FakeSpider)
+    # 이미 저장된 news_id도 저장된 것으로 알린다.
+    assert signals[1:] == [([('003', 'x')], []), ([('001', 'a')], [])]
+    assert pipeline.stats.get_value('mongodb/items_inserted') == 3
+    assert pipeline.stats.get_value('mongodb/items_duplicate') == 1
+    assert pipeline.client['news']['001'].index_information()['news_id_1']['unique']
+    pipeline.close_spider(FakeSpider)
+
+
+def test_connection_failure_keeps_documents(monkeypatch):
+    pipeline, signals = open_pipeline()
+
+    def fail(name):
+        raise pymongo.errors.ConnectionFailure('connection refused')
+    monkeypatch.setattr(pipeline, 'get_collection', fail)
+    for it in (item('a'), item('b'), item('c')):
+        pipeline.process_item(it, FakeSpider)
+    # 실패한 배치는 남겨두고, retry_delay 동안은 배치 크기를 넘겨도 다시 시도하지 않는다.
+    assert signals == []
+    assert len(pipeline.buffers['001']) == 3
+    assert pipeline.stats.get_value('mongodb/flush_errors') == 1
+
+    monkeypatch.undo()
+    pipeline.flush_all(FakeSpider)
+    assert signals == [([('001', 'a'), ('001', 'b'), ('001', 'c')], [])]
+    assert news_ids(pipeline) == ['a', 'b', 'c']
+
+
+def test_unsaved_documents_are_reported_on_close(monkeypatch):
+    pipeline, signals = open_pipeline()
+    pipeline.process_item(item('a'), FakeSpider)
+
+    def fail(name):
+        raise pymongo.errors.ConnectionFailure('connection refused')
+    monkeypatch.setattr(pipeline, 'get_collection', fail)
+    pipeline.close_spider(FakeSpider)
+    assert signals == [([], [('001', 'a')])]
+    assert pipeline.stats.get_value('mongodb/items_failed') == 1
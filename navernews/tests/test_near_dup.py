@@ -0,0 +1,98 @@
+"""
+거의 같은 기사 찾기 (NearDuplicatePipeline)
+원본 기사는 저장 파이프라인이 저장을 확인한 다음에만 비교 대상이 된다.
+"""
+import logging
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.settings import Settings
+from scrapy.spiders import Spider
+
+from navernews.items import NewsItem
+from navernews.signals import items_stored
+from navernews.near_dup import NearDuplicatePipeline
+
+WIRE = ' '.join(f'통신사 기사 본문 {i}번째 문장입니다.' for i in range(30))
+
+
+class FakeSpider:
+    logger = logging.getLogger('test')
+
+
+def open_pipeline(tmp_path, pipelines, **settings):
+    crawler = Crawler(Spider, Settings(dict(settings, ITEM_PIPELINES=pipelines,
+                                            NEAR_DUP_INDEX=str(tmp_path / 'near_dup.sqlite3'),
+                                            REQUEST_FINGERPRINTER_IMPLEMENTATION='2.7')))
+    crawler._apply_settings()
+    pipeline = NearDuplicatePipeline.from_crawler(crawler)
+    pipeline.open_spider(FakeSpider)
+    return crawler, pipeline
+
+
+def item(oid, aid, content=WIRE):
+    return NewsItem(news_media_code=oid, news_id=aid, news_content=f'{oid} 기자 = {content}', news_date=None)
+
+
+def duplicate_of(item):
+    return ItemAdapter(item).get('news_duplicate_of')
+
+
+def batch_pipeline(tmp_path, **settings):
+    return open_pipeline(tmp_path, {'navernews.pipelines.MongodbPipeline': 300,
+                                    'navernews.near_dup.NearDuplicatePipeline': 250}, **settings)
+
+
+def test_copy_is_tagged_after_original_is_stored(tmp_path):
+    crawler, pipeline = batch_pipeline(tmp_path)
+    assert duplicate_of(pipeline.process_item(item('001', 'a'), FakeSpider)) is None
+    # 원본이 아직 commit되지 않았으므로 전재 기사도 원본으로 둔다.
+    assert duplicate_of(pipeline.process_item(item('003', 'b'), FakeSpider)) is None
+
+    crawler.signals.send_catch_log(items_stored, stored=[('001', 'a')], failed=[])
+    copy = pipeline.process_item(item('421', 'c'), FakeSpider)
+    assert duplicate_of(copy) == '001/a'
+    assert pipeline.index.get('001', 'a') == (None, None)
+    assert pipeline.index.get('421', 'c') == ('001', 'a')
+
+
+def test_collapse_never_uses_unstored_original(tmp_path):
+    crawler, pipeline = batch_pipeline(tmp_path, NEAR_DUP_MODE='collapse')
+    pipeline.process_item(item('001', 'a'), FakeSpider)
+    crawler.signals.send_catch_log(items_stored, stored=[], failed=[('001', 'a')])
+
+    copy = pipeline.process_item(item('003', 'b'), FakeSpider)
+    assert copy.news_content
+    assert duplicate_of(copy) is None
+    assert pipeline.index.get('001', 'a') is None
+
+    crawler.signals.send_catch_log(items_stored, stored=[('003', 'b')], failed=[])
+    copy = pipeline.process_item(item('421', 'c'), FakeSpider)
+    assert copy.news_content == ''
+    assert duplicate_of(copy) == '003/b'
+
+
+def test_unconfirmed_originals_are_not_indexed_on_close(tmp_path):
+    crawler, pipeline = batch_pipeline(tmp_path)
+    pipeline.process_item(item('001', 'a'), FakeSpider)
+    pipeline.close_spider(FakeSpider)
+    assert crawler.stats.get_value('near_dup/unconfirmed') == 1
+    pipeline.open_spider(FakeSpider)
+    assert pipeline.index.get('001', 'a') is None
+
+
+def test_item_scraped_confirms_without_batch_pipeline(tmp_path):
+    # 아이템마다 저장하는 경우(items_stored를 보내지 않는 파이프라인) 파이프라인을 모두 지나면 저장된 것으로 본다.
+    crawler, pipeline = open_pipeline(tmp_path, {'navernews.near_dup.NearDuplicatePipeline': 250})
+    original = pipeline.process_item(item('001', 'a'), FakeSpider)
+    crawler.signals.send_catch_log(signals.item_scraped, item=original, response=None, spider=FakeSpider)
+
+    # 뒤의 파이프라인에서 버린 원본 기사는 인덱스에 넣지 않는다.
+    other = ' '.join(f'다른 사건을 다룬 기사 {i}번째 문단입니다.' for i in range(30))
+    dropped = pipeline.process_item(item('003', 'b', other), FakeSpider)
+    crawler.signals.send_catch_log(signals.item_dropped, item=dropped, response=None, exception=None,
+                                   spider=FakeSpider)
+    assert duplicate_of(pipeline.process_item(item('421', 'c'), FakeSpider)) == '001/a'
+    assert pipeline.index.get('003', 'b') is None
+    assert pipeline.unconfirmed == {}
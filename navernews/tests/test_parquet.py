@@ -0,0 +1,34 @@
+"""
+ParquetPipeline이 쓴 폴더를 docstring의 방법으로 읽었을 때 언론사 코드가 문자열로 그대로 나오는지
+"""
+import datetime
+import logging
+
+import pytest
+from scrapy.crawler import Crawler
+from scrapy.spiders import Spider
+from scrapy.statscollectors import MemoryStatsCollector
+
+from navernews.pipelines import ParquetPipeline
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+
+
+class FakeSpider:
+    logger = logging.getLogger('test')
+
+
+def test_partitions_read_back_as_strings(tmp_path):
+    pipeline = ParquetPipeline(MemoryStatsCollector(Crawler(Spider)), directory=str(tmp_path))
+    for oid, aid, day in (('001', '0011494587', 24), ('001', '0011494100', 23), ('003', '0009770001', 24)):
+        pipeline.process_item({'news_media_code': oid, 'news_id': aid, 'news_title': '제목',
+                               'news_date': datetime.datetime(2020, 3, day, 15, 5)}, FakeSpider)
+    pipeline.close_spider(FakeSpider)
+
+    partitioning = ds.partitioning(pa.schema([('news_media_code', pa.string()), ('date', pa.string())]), flavor='hive')
+    dataset = ds.dataset(str(tmp_path), format='parquet', partitioning=partitioning)
+    table = dataset.to_table(filter=(ds.field('news_media_code') == '001') & (ds.field('date') >= '2020-03-24'))
+    assert table.column('news_id').to_pylist() == ['0011494587']
+    assert table.column('news_media_code').to_pylist() == ['001']
+    assert pipeline.stats.get_value('parquet/items_written') == 3
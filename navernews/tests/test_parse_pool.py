@@ -0,0 +1,37 @@
+"""
+ParsePool - 작업 프로세스에서 추출한 결과와 추출기 stats(news/date/missing 등)를 돌려받는지
+"""
+import queue
+from types import SimpleNamespace
+
+from scrapy.crawler import Crawler
+from scrapy.http import HtmlResponse
+from scrapy.spiders import Spider
+from scrapy.statscollectors import MemoryStatsCollector
+
+from navernews import parse_pool
+from navernews.extractor import ArticleExtractor
+from tests.test_extractor import ARTICLE, URL
+
+
+def test_worker_date_stats_reach_crawler_stats(monkeypatch):
+    # 결과 처리를 리액터 대신 테스트 스레드에서 실행한다.
+    calls = queue.Queue()
+    monkeypatch.setattr(parse_pool, 'reactor', SimpleNamespace(callFromThread=lambda f, *a: calls.put((f, a))))
+    stats = MemoryStatsCollector(Crawler(Spider))
+    pool = parse_pool.ParsePool(ArticleExtractor(), {'body': 'text'}, 1, stats=stats)
+    try:
+        results = []
+        for date in ('', '<span class="t11">어제 오후</span>', '<span class="t11">2020.03.24. 오후 3:05</span>'):
+            response = HtmlResponse(URL, body=ARTICLE.format(date=date).encode('utf-8'), encoding='utf-8')
+            pool.extract(response).addCallback(results.append)
+        for _ in range(3):
+            func, args = calls.get(timeout=60)
+            func(*args)
+    finally:
+        pool.close()
+
+    assert [fields['news_date'] is None for _, fields in results] == [True, True, False]
+    assert stats.get_value('news/date/missing') == 1
+    assert stats.get_value('news/date/unparsed') == 1
+    assert stats.get_value('parse_pool/inline') is None
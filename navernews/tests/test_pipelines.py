@@ -0,0 +1,133 @@
+"""
+MySQL 저장 파이프라인 (NewsBatchPipeline의 재시도, resolve_undated)
+DB는 conftest.py의 SQLite 대용품을 사용한다.
+"""
+import datetime
+import logging
+
+from itemadapter import ItemAdapter
+from scrapy.crawler import Crawler
+from scrapy.spiders import Spider
+from scrapy.statscollectors import MemoryStatsCollector
+
+from navernews import pipelines
+from navernews.db_schema import ARTICLES_TABLE, UNKNOWN_DATE
+from navernews.items import NewsItem
+from navernews.signals import items_stored
+from navernews.tools import KST
+
+DATE = datetime.datetime(2020, 3, 24, 15, 5, tzinfo=KST)
+
+
+class FakeSpider:
+    logger = logging.getLogger('test')
+
+
+def item(aid, date=DATE, oid='001'):
+    return NewsItem(news_id=aid, news_media_code=oid, news_title='제목', news_content='본문', news_date=date)
+
+
+def articles(mysql):
+    return mysql.rows(f"SELECT news_id, news_date FROM news.`{ARTICLES_TABLE}` ORDER BY news_id, news_date")
+
+
+def buffered(*items):
+    return [((it.news_media_code, it.news_id), pipelines.news_row(ItemAdapter(it), 'articles')[1]) for it in items]
+
+
+def insert_articles(cursor, *items):
+    for _, row in buffered(*items):
+        cursor.execute(f"INSERT INTO news.`{ARTICLES_TABLE}` ({', '.join(pipelines.ARTICLES_COLUMNS)}) "
+                       f"VALUES ({', '.join(['%s'] * len(row))})", row)
+
+
+def test_resolve_undated_replaces_placeholder_rows(mysql):
+    mysql.create_articles_table()
+    with mysql.cursor() as cursor:
+        insert_articles(cursor, item('a', None), item('b', None), item('d', None))
+        mysql.executed.clear()
+        kept = pipelines.resolve_undated(cursor, buffered(item('a'), item('b'), item('c', None)))
+    # 날짜가 있는 a, b는 저장하고 UNKNOWN_DATE 행은 지운다. 날짜가 없는 c는 저장된 적이 없으므로 그대로 저장한다.
+    assert [key for key, _ in kept] == [('001', 'a'), ('001', 'b'), ('001', 'c')]
+    assert articles(mysql) == [('d', str(UNKNOWN_DATE))]
+    # 배치 하나에 DELETE 한번, SELECT 한번
+    assert len(mysql.executed) == 2
+
+
+def test_resolve_undated_skips_rows_already_dated(mysql):
+    mysql.create_articles_table()
+    with mysql.cursor() as cursor:
+        insert_articles(cursor, item('a'))
+        # a는 DB에, b는 같은 배치에 날짜가 있는 행이 있으므로 날짜가 없는 행은 뺀다.
+        undated_b, dated_b = buffered(item('b', None), item('b'))
+        kept = pipelines.resolve_undated(cursor, buffered(item('a', None)) + [undated_b, dated_b])
+    assert kept == [dated_b]
+
+
+def test_batch_pipeline_articles_layout_keeps_one_row_per_article(mysql):
+    mysql.create_articles_table()
+    stats = MemoryStatsCollector(Crawler(Spider))
+    pipeline = pipelines.NewsBatchPipeline(stats, batch_size=100, flush_interval=0, layout='articles')
+    pipeline.open_spider(FakeSpider)
+    for it in (item('a', None), item('b'), item('c', None), item('c')):
+        pipeline.process_item(it, FakeSpider)
+    pipeline.flush_all(FakeSpider)
+    for it in (item('a'), item('b', None)):
+        pipeline.process_item(it, FakeSpider)
+    pipeline.close_spider(FakeSpider)
+    assert [news_id for news_id, news_date in articles(mysql)] == ['a', 'b', 'c']
+    assert str(UNKNOWN_DATE) not in [news_date for _, news_date in articles(mysql)]
+
+
+def open_batch_pipeline(mysql, **kwargs):
+    # 배치 크기를 채우면 저장하고, items_stored 시그널을 받아둔다.
+    crawler = Crawler(Spider)
+    stats = MemoryStatsCollector(crawler)
+    signals = []
+    crawler.signals.connect(lambda stored, failed: signals.append((stored, failed)),
+                            signal=items_stored, weak=False)
+    pipeline = pipelines.NewsBatchPipeline(stats, batch_size=2, flush_interval=0, signals=crawler.signals, **kwargs)
+    pipeline.open_spider(FakeSpider)
+    return pipeline, signals
+
+
+def test_batch_pipeline_reconnects_once_on_connection_error(mysql):
+    mysql.create_news_table('001')
+    pipeline, signals = open_batch_pipeline(mysql)
+    mysql.fail = 1  # ping이 실패하면 한번 더 시도한다.
+    for it in (item('a'), item('b')):
+        pipeline.process_item(it, FakeSpider)
+    assert signals == [([('001', 'a'), ('001', 'b')], [])]
+    assert mysql.rows('SELECT news_id FROM news.`001` ORDER BY news_id') == [('a',), ('b',)]
+    assert pipeline.stats.get_value('mysql/flush_errors') == 1
+
+
+def test_batch_pipeline_keeps_batch_until_retry(mysql, monkeypatch):
+    mysql.create_news_table('001')
+    pipeline, signals = open_batch_pipeline(mysql)
+    mysql.fail = 2
+    for it in (item('a'), item('b')):
+        pipeline.process_item(it, FakeSpider)
+    # 두 번 모두 실패하면 버리지 않고 남겨두고, 저장된 것으로 알리지 않는다.
+    assert signals == []
+    assert len(pipeline.buffers['001']) == 2
+    assert pipeline.retry_at > 0
+
+    # retry_delay 동안은 배치 크기를 넘겨도 다시 시도하지 않는다.
+    pipeline.process_item(item('c'), FakeSpider)
+    assert len(pipeline.buffers['001']) == 3
+    monkeypatch.setattr(pipelines.time, 'monotonic', lambda: pipeline.retry_at)
+    pipeline.process_item(item('d'), FakeSpider)
+    assert signals == [([('001', 'a'), ('001', 'b'), ('001', 'c'), ('001', 'd')], [])]
+    assert pipeline.buffers == {}
+
+
+def test_batch_pipeline_reports_unsaved_items_on_close(mysql):
+    mysql.create_news_table('001')
+    pipeline, signals = open_batch_pipeline(mysql)
+    pipeline.process_item(item('a'), FakeSpider)
+    mysql.fail = 2
+    pipeline.close_spider(FakeSpider)
+    # 끝까지 저장하지 못한 기사는 실패로 알려서 스파이더가 완료로 기록하지 않게 한다.
+    assert signals == [([], [('001', 'a')])]
+    assert pipeline.stats.get_value('mysql/items_failed') == 1
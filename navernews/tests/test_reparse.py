@@ -0,0 +1,61 @@
+"""
+reparse - HTTP 캐시에 저장된 기사 페이지를 작업 프로세스에서 다시 파싱해서 exporter로 저장
+"""
+import argparse
+import json
+
+import pytest
+from scrapy.exceptions import UsageError
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.project import get_project_settings
+
+from navernews.reparse import ItemSink, reparse
+from tests.test_extractor import ARTICLE
+from tests.test_httpcache import open_storage
+
+pytest.importorskip('zstandard')
+
+READ = 'https://news.naver.com/main/read.nhn?mode=LPOD&mid=sec&oid={oid}&aid={aid}'
+DATE = '<span class="t11">{}</span>'
+
+
+def store_articles(tmp_path, pages):
+    storage, spider = open_storage(tmp_path)
+    for oid, aid, date in pages:
+        url = READ.format(oid=oid, aid=aid)
+        storage.store_response(spider, Request(url), HtmlResponse(url, body=ARTICLE.format(date=date).encode('utf-8'),
+                                                                  encoding='utf-8'))
+    storage.close_spider(spider)
+    return str(tmp_path / 'cache.sqlite3')
+
+
+def reparse_args(path, output, **kwargs):
+    values = dict(path=path, oid=None, start=None, end=None, body='text', check_url=False, output=output,
+                  pipeline=None, set=None, workers=1, chunk_size=2, progress=1000)
+    values.update(kwargs)
+    return argparse.Namespace(**values)
+
+
+def test_reparse_exports_items_and_worker_stats(tmp_path, monkeypatch):
+    monkeypatch.setenv('SCRAPY_SETTINGS_MODULE', 'navernews.settings')
+    path = store_articles(tmp_path, [('001', '0000000001', DATE.format('2020.03.24. 오후 3:05')),
+                                     ('001', '0000000002', DATE.format('2020.03.20. 오전 9:41')),
+                                     ('001', '0000000003', ''),
+                                     ('003', '0000000004', DATE.format('2020.03.24. 오전 9:41'))])
+    output = str(tmp_path / 'items.jl')
+    stats = reparse(reparse_args(path, output, oid='001', start='20200324', end='20200322'))
+
+    with open(output, encoding='utf-8') as f:
+        items = [json.loads(line) for line in f]
+    # 날짜를 읽지 못한 기사는 기간으로 거르지 않는다.
+    assert sorted(item['news_id'] for item in items) == ['0000000001', '0000000003']
+    assert stats['reparse/pages'] == 3
+    assert stats['reparse/filtered'] == 1
+    assert stats['reparse/date_missing'] == 1
+    assert stats['news/date/missing'] == 1
+
+
+def test_sink_needs_a_destination(monkeypatch):
+    monkeypatch.setenv('SCRAPY_SETTINGS_MODULE', 'navernews.settings')
+    with pytest.raises(UsageError):
+        ItemSink(get_project_settings(), pipelines=[])
@@ -0,0 +1,77 @@
+"""
+이미 저장된 기사 인덱스 (SeenIndex) - DB에서 새로 저장된 기사만 읽어서 스냅샷에 합치기
+DB는 conftest.py의 SQLite 대용품을 사용한다.
+"""
+from navernews.db_schema import ARTICLES_TABLE
+from navernews.seen_index import SeenIndex
+
+
+def insert(mysql, table, *aids, media_code=None):
+    columns = ('media_code', 'news_id') if media_code else ('news_id',)
+    with mysql.cursor() as cursor:
+        for aid in aids:
+            values = (media_code, aid) if media_code else (aid,)
+            cursor.execute(f"INSERT INTO news.`{table}` ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(values))})",
+                           values)
+    mysql.commit()
+
+
+def test_refresh_reads_only_new_rows(mysql, tmp_path):
+    path = str(tmp_path / '001.idx')
+    mysql.create_news_table('001')
+    insert(mysql, '001', '0000000003', '0000000001')
+    index = SeenIndex.open(path)
+    assert index.refresh(mysql, '001') == 2
+    assert '0000000001' in index and '0000000002' not in index
+
+    insert(mysql, '001', '0000000002')
+    mysql.executed.clear()
+    index = SeenIndex.open(path)
+    assert index.refresh(mysql, '001') == 1
+    # 스냅샷에 저장한 마지막 inx 이후만 읽는다.
+    assert mysql.executed[-1].endswith('WHERE inx > 2')
+    assert [aid in index for aid in ('0000000001', '0000000002', '0000000003')] == [True, True, True]
+    assert len(SeenIndex.open(path)) == 3
+
+
+def test_refresh_spills_chunks_and_merges_with_crawled_ids(mysql, tmp_path, monkeypatch):
+    monkeypatch.setattr(SeenIndex, 'CHUNK_SIZE', 3)
+    monkeypatch.setattr(SeenIndex, 'FETCH_SIZE', 2)
+    monkeypatch.setattr(SeenIndex, 'MERGE_BLOCK', 2)
+    path = str(tmp_path / '001.idx')
+    mysql.create_news_table('001')
+    insert(mysql, '001', *(f'{aid:010d}' for aid in (9, 3, 7, 1, 5, 8)))
+    index = SeenIndex.open(path)
+    index.add('0000000004')
+    index.add('0000000005')  # DB에도 있는 기사
+    # 크롤링하면서 추가한 기사와 겹치지 않는 aid만 새로 읽어온 것으로 센다.
+    assert index.refresh(mysql, '001') == 5
+    assert len(index) == 7
+    assert list(index.snapshot) == [1, 3, 4, 5, 7, 8, 9]
+    assert not [name for name in tmp_path.iterdir() if '.run' in name.name or name.suffix == '.tmp']
+
+
+def test_recreated_table_is_read_again(mysql, tmp_path):
+    path = str(tmp_path / '001.idx')
+    mysql.create_news_table('001')
+    insert(mysql, '001', '0000000001', '0000000002', '0000000003')
+    index = SeenIndex.open(path)
+    index.refresh(mysql, '001')
+
+    mysql.create_table('DROP TABLE news.`001`')
+    mysql.create_news_table('001')
+    insert(mysql, '001', '0000000009')
+    index = SeenIndex.open(path)
+    # 새 테이블의 inx가 스냅샷의 마지막 inx보다 작으면 스냅샷을 버리고 처음부터 읽는다.
+    assert index.refresh(mysql, '001') == 1
+    assert '0000000009' in index and '0000000001' not in index
+    assert index.last_inx == 1
+
+
+def test_articles_table_reads_one_outlet(mysql, tmp_path):
+    mysql.create_articles_table()
+    insert(mysql, ARTICLES_TABLE, '0000000001', media_code='001')
+    insert(mysql, ARTICLES_TABLE, '0000000002', media_code='003')
+    index = SeenIndex.open(str(tmp_path / f'001.{ARTICLES_TABLE}.idx'))
+    assert index.refresh(mysql, ARTICLES_TABLE, media_code='001') == 1
+    assert '0000000001' in index and '0000000002' not in index
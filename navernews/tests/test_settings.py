@@ -0,0 +1,75 @@
+"""
+스파이더 custom_settings의 미들웨어 / 파이프라인 목록과 settings.py 목록 합치기 (NewsSpider.update_component_settings)
+"""
+from scrapy.crawler import Crawler
+from scrapy.settings import Settings
+
+from navernews.spiders.NewsSpider import News, News_manual, News_manual_mongo
+
+THROTTLE = 'navernews.throttle.AdaptiveThrottle'
+PARQUET = 'navernews.pipelines.ParquetPipeline'
+
+
+def crawler_settings(spidercls, values, priority='project'):
+    settings = Settings()
+    settings.setdict(values, priority=priority)
+    return Crawler(spidercls, settings).settings
+
+
+def test_project_components_are_merged():
+    for spidercls in (News, News_manual, News_manual_mongo):
+        settings = crawler_settings(spidercls, {'DOWNLOADER_MIDDLEWARES': {THROTTLE: 560},
+                                                'ITEM_PIPELINES': {PARQUET: 310}})
+        middlewares = settings.getdict('DOWNLOADER_MIDDLEWARES')
+        pipelines = settings.getdict('ITEM_PIPELINES')
+        assert middlewares[THROTTLE] == 560
+        assert middlewares['scrapy_fake_useragent.middleware.RandomUserAgentMiddleware'] == 400
+        assert pipelines[PARQUET] == 310
+        assert set(spidercls.custom_settings['ITEM_PIPELINES']) <= set(pipelines)
+
+
+def test_project_can_disable_spider_component():
+    spider_pipeline = next(iter(News_manual.custom_settings['ITEM_PIPELINES']))
+    settings = crawler_settings(News_manual, {'ITEM_PIPELINES': {spider_pipeline: None, PARQUET: 300}})
+    assert settings.getdict('ITEM_PIPELINES') == {spider_pipeline: None, PARQUET: 300}
+
+
+def test_command_line_replaces_spider_components():
+    settings = crawler_settings(News_manual, {'ITEM_PIPELINES': {PARQUET: 300}}, priority='cmdline')
+    assert settings.getdict('ITEM_PIPELINES') == {PARQUET: 300}
+
+
+def test_other_custom_settings_still_apply():
+    settings = crawler_settings(News_manual, {'DOWNLOAD_DELAY': 5})
+    assert settings.getfloat('DOWNLOAD_DELAY') == News_manual.custom_settings['DOWNLOAD_DELAY']
+
+
+def test_archive_middleware_is_built_from_project_settings(tmp_path):
+    # settings.py에서 켠 ArchiveMiddleware가 스파이더의 미들웨어와 함께 다운로더 체인에 들어가는지
+    from scrapy.core.downloader.middleware import DownloaderMiddlewareManager
+    crawler = Crawler(News_manual, Settings({
+        'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7',
+        'NAVER_ARCHIVE_ENABLED': True, 'NAVER_ARCHIVE_DIR': str(tmp_path),
+        'DOWNLOADER_MIDDLEWARES': {'navernews.archive.ArchiveMiddleware': 950,
+                                   'scrapy_fake_useragent.middleware.RandomUserAgentMiddleware': None}}))
+    crawler._apply_settings()
+    manager = DownloaderMiddlewareManager.from_crawler(crawler)
+    names = [type(middleware).__name__ for middleware in manager.middlewares]
+    assert 'ArchiveMiddleware' in names
+    assert 'UserAgentMiddleware' not in names
+
+
+def test_json_string_components_are_merged():
+    # -s나 custom_settings에 JSON 문자열로 넣은 목록도 Scrapy처럼 dict로 읽어서 합친다.
+    class JsonSpider(News_manual):
+        custom_settings = dict(News_manual.custom_settings, ITEM_PIPELINES='{"navernews.pipelines.MongodbPipeline": 300}')
+    settings = crawler_settings(JsonSpider, {'ITEM_PIPELINES': {PARQUET: 310}})
+    assert settings.getdict('ITEM_PIPELINES') == {'navernews.pipelines.MongodbPipeline': 300, PARQUET: 310}
+
+
+def test_news_manual_can_switch_back_to_news_pipeline():
+    # News_manual은 NewsBatchPipeline으로 저장하고, settings.py에서 아이템마다 저장하는 NewsPipeline으로 바꿀 수 있다.
+    batch, single = 'navernews.pipelines.NewsBatchPipeline', 'navernews.pipelines.NewsPipeline'
+    assert crawler_settings(News_manual, {}).getdict('ITEM_PIPELINES') == {batch: 300}
+    settings = crawler_settings(News_manual, {'ITEM_PIPELINES': {batch: None, single: 300}})
+    assert settings.getdict('ITEM_PIPELINES') == {batch: None, single: 300}
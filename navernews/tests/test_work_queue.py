@@ -0,0 +1,95 @@
+"""
+작업 큐 (SQLiteWorkQueue, RedisWorkQueue)와 스파이더에서 작업을 임대하는 수
+"""
+import pytest
+
+from navernews import work_queue
+from navernews.work_queue import RedisWorkQueue, SQLiteWorkQueue, open_work_queue
+from tests.test_high_water import open_spider
+
+UNITS = [('001', '20200324'), ('001', '20200323'), ('003', '20200324')]
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        queue = SQLiteWorkQueue(str(tmp_path / 'work.db'), lease_timeout=60, max_attempts=2)
+    else:
+        fakeredis = pytest.importorskip('fakeredis')
+        queue = RedisWorkQueue(fakeredis.FakeRedis(), key='test', lease_timeout=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def status(queue):
+    # SQLite 큐는 작업이 없는 상태를 돌려주지 않는다.
+    return {state: count for state, count in queue.status().items() if count}
+
+
+def test_units_are_leased_in_enqueue_order_once(queue):
+    assert queue.enqueue(UNITS) == 3
+    assert queue.enqueue(UNITS[:1]) == 0
+    assert queue.lease('a', 2) == UNITS[:2]
+    assert queue.lease('b', 5) == UNITS[2:]
+    assert queue.lease('b', 0) == []
+
+    queue.ack('a', *UNITS[0])
+    queue.ack('b', *UNITS[1])  # 다른 워커가 임대한 작업은 완료할 수 없다.
+    assert status(queue) == {'done': 1, 'leased': 2}
+    # 완료한 작업은 다시 등록해도 대기 상태가 되지 않는다.
+    assert queue.enqueue(UNITS[:1]) == 0
+
+
+def test_released_unit_fails_after_max_attempts(queue):
+    queue.enqueue(UNITS[:1])
+    queue.lease('a')
+    queue.release('a', *UNITS[0])
+    assert queue.lease('b') == UNITS[:1]
+    queue.release('a', *UNITS[0])  # 임대하지 않은 워커는 되돌릴 수 없다.
+    assert status(queue) == {'leased': 1}
+    queue.release('b', *UNITS[0])
+    assert status(queue) == {'failed': 1}
+
+
+def test_expired_lease_goes_back_to_pending(queue, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(work_queue.time, 'time', lambda: now)
+    queue.enqueue(UNITS[:2])
+    queue.lease('a', 2)
+    now += 40
+    queue.renew('a', *UNITS[1])
+    now += 30
+    # 임대 시간이 지난 작업은 다음 lease에서 다른 워커가 가져간다. 연장한 작업은 그대로 둔다.
+    assert queue.lease('b', 2) == UNITS[:1]
+    queue.ack('a', *UNITS[0])
+    queue.ack('b', *UNITS[0])
+    queue.ack('a', *UNITS[1])
+    assert status(queue) == {'done': 2}
+
+
+def test_open_work_queue(tmp_path):
+    queue = open_work_queue(f'sqlite:///{tmp_path / "work.db"}', lease_timeout=30)
+    assert isinstance(queue, SQLiteWorkQueue) and queue.lease_timeout == 30
+    queue.close()
+    with pytest.raises(ValueError):
+        open_work_queue('mysql://localhost/work')
+
+
+def test_article_phase_units_count_toward_max_dates(tmp_path):
+    uri = f'sqlite:///{tmp_path / "work.db"}'
+    queue = open_work_queue(uri)
+    queue.enqueue([('001', date) for date in ('20200324', '20200323', '20200322', '20200321')])
+    crawler, spider = open_spider(queue=uri, max_dates=3)
+
+    requests = list(spider.next_dates())
+    assert len(requests) == 3
+    # 20200324는 목록 페이지를 다 보고 기사 저장을 기다리는 중
+    del spider.open_dates[('001', '20200324')]
+    spider.open_articles[('001', '20200324')] = 5
+    assert list(spider.next_dates()) == []
+    assert queue.status() == {'pending': 1, 'leased': 3}
+
+    spider.open_articles.clear()
+    assert len(list(spider.next_dates())) == 1
+    spider.closed('finished')
+    queue.close()